@@ -23,15 +23,31 @@ async def list_profile_searches(profile_id: str):
     return searches
 
 from app.db.crud import delete_profile, delete_search
+from app.services.job_matrix_cache import job_matrix_cache
 
 @router.delete("/profiles/{profile_id}")
 async def remove_profile(profile_id: str):
     # Delete a profile and all its history permanently.
-    delete_profile(profile_id)
+    job_matrix_cache.invalidate(*delete_profile(profile_id))
     return {"status": "success", "message": "Profile deleted"}
 
 @router.delete("/searches/{search_id}")
 async def remove_search(search_id: str):
     # Delete a specific search record permanently.
     delete_search(search_id)
+    job_matrix_cache.invalidate(search_id)
     return {"status": "success", "message": "Search deleted"}
+
+from app.db.crud import delete_jobs
+
+@router.delete("/searches/{search_id}/jobs/{job_id}")
+async def remove_search_job(search_id: str, job_id: int):
+    # Delete one job from a search; its materialized analytics are updated in place.
+    from app.services.analytics_service import update_search_analytics
+
+    deleted = delete_jobs(search_id, [job_id])
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Job not found")
+    update_search_analytics(search_id, removed=deleted)
+    job_matrix_cache.invalidate(search_id)
+    return {"status": "success", "message": "Job deleted"}
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Any
 import uuid
@@ -6,8 +7,9 @@ import os
 import json
 import logging
 
-from app.services.scraper_engine import run_scraper_engine, task_registry
-from app.models.job import SearchRequest, SimulationRequest
+from app.services.search_scheduler import search_scheduler
+from app.services.task_registry import task_registry
+from app.models.job import SearchRequest, SimulationRequest, SkillRankingRequest
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +17,7 @@ router = APIRouter()
 
 
 @router.post("/search", tags=["Jobs"], summary="Start a Job Search")
-async def search_jobs(request: SearchRequest, background_tasks: BackgroundTasks):
+async def search_jobs(request: SearchRequest):
     task_id = str(uuid.uuid4())
     logger.info(f"Received search request: {request.query} in {request.location} on {request.portals}. Task ID: {task_id}")
 
@@ -28,28 +30,33 @@ async def search_jobs(request: SearchRequest, background_tasks: BackgroundTasks)
     elif request.profile_id:
         from app.db.crud import get_profile
         profile = get_profile(request.profile_id)
-        if profile and profile.get("global_vector") and profile.get("skill_vector"):
+        if profile and profile.get("global_vector") is not None and profile.get("skill_vector") is not None:
             user_vectors_dict = {
                 "global_vector": profile["global_vector"],
                 "skill_vector": profile["skill_vector"],
             }
 
-    background_tasks.add_task(
-        run_scraper_engine,
-        task_id,
-        request.query,
-        request.location,
-        request.portals,
-        request.serp_api_config,
-        user_vectors_dict,
-        request.profile_id,  # Pass profile_id for history association
-    )
+    # Queued behind the global / per-portal concurrency caps; persisted so it survives a restart
+    return search_scheduler.submit(task_id, {
+        "query": request.query,
+        "location": request.location,
+        "portals": request.portals,
+        "serp_api_config": request.serp_api_config,
+        "user_vectors": user_vectors_dict,
+        "profile_id": request.profile_id,  # Pass profile_id for history association
+        "extraction_mode": request.skill_extraction_mode,
+        "use_cache": request.use_cache,
+    })
+
 
-    return {"task_id": task_id, "status": "processing"}
+@router.get("/queue", tags=["Jobs"], summary="Search Queue Stats")
+async def get_queue_stats():
+    # Running / queued searches and current per-portal slot usage.
+    return search_scheduler.stats()
 
 
 @router.get("/status/{task_id}", tags=["Jobs"], summary="Check Task Status")
-async def get_task_status(task_id: str):
+async def get_task_status(task_id: str, log_offset: int = Query(0, ge=0)):
     task = task_registry.get(task_id)
     
     if not task:
@@ -63,11 +70,45 @@ async def get_task_status(task_id: str):
             
         raise HTTPException(status_code=404, detail="Task not found")
 
-    return {
-        "task_id": task_id,
-        "status": task.get("status"),
-        "logs": task.get("logs", [])
-    }
+    # Pollers can pass back `log_offset` to receive only the new lines
+    return task.to_status(log_offset)
+
+
+@router.get("/stream/{task_id}", tags=["Jobs"], summary="Stream Task Events (SSE)")
+async def stream_task_events(
+    task_id: str,
+    request: Request,
+    log_offset: int = Query(0, ge=0),
+    job_offset: int = Query(0, ge=0),
+):
+
+    # Server-sent events: new log lines, per-portal progress and newly scored jobs as deltas.
+    # Reconnecting clients resume from the Last-Event-ID header ("<log offset>:<job offset>").
+    from app.services.stream_service import iter_task_events, parse_event_id
+
+    if task_id not in task_registry:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id:
+        log_offset, job_offset = parse_event_id(last_event_id)
+
+    return StreamingResponse(
+        iter_task_events(lambda: task_registry.get(task_id), log_offset, job_offset),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/partial/{task_id}", tags=["Jobs"], summary="Get Live Ranked Results")
+async def get_partial_results(task_id: str, limit: int = Query(20, ge=1, le=500)):
+
+    # Top jobs scored so far, while the portals are still being scraped.
+    task = task_registry.get(task_id)
+    if not task or task.stream is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return {"task_id": task_id, "status": task.status, **task.stream.snapshot(limit=limit)}
 
 
 @router.get("/results/{task_id}", tags=["Jobs"], summary="Get Aggregated Results")
@@ -87,7 +128,7 @@ async def get_task_results(task_id: str):
     if not task:
         raise HTTPException(status_code=404, detail="Task results not found")
 
-    if task.get("status") != "completed":
+    if task.status != "completed":
         raise HTTPException(status_code=400, detail="Task is still in progress")
 
     # Path: endpoints/ → v1/ → api/ → app/ → backend/ → project_root/scraper/results/
@@ -107,13 +148,14 @@ async def get_task_results(task_id: str):
             data = json.load(f)
         return data
 
-    return {"error": "Result file not found", "logs": task.get("logs")}
+    return {"error": "Result file not found", "logs": task.logs.since(0)[0]}
 
 
 @router.get("/analytics/{task_id}", tags=["Jobs"], summary="Get Dashboard Analytics")
 async def get_analytics(task_id: str):
     """
-    Compute aggregated analytics for a completed search task.
+    Aggregated analytics for a completed search task (materialized when the search
+    finished; older searches are computed once here and stored).
     Returns chart-ready JSON with:
     - Top Skills (standardized, deduplicated)
     - Top Locations (normalized cities)
@@ -122,11 +164,24 @@ async def get_analytics(task_id: str):
     - Score Distribution
     - Portal Breakdown
     """
-    from app.services.analytics_service import compute_analytics, get_analytics_from_db
+    from app.services.analytics_service import (
+        compute_analytics, get_analytics_from_db, get_materialized_analytics, materialize_search_analytics,
+    )
 
     task = task_registry.get(task_id)
 
-    # Strategy 1: Load from JSON file (fastest, works even if DB is empty)
+    # Strategy 0: Precomputed search_analytics row (O(1), no job rows are read)
+    try:
+        analytics = get_materialized_analytics(task_id)
+    except Exception as e:
+        logger.warning(f"Materialized analytics lookup failed for {task_id}: {e}")
+        analytics = None
+    if analytics is not None:
+        analytics["source"] = "materialized"
+        analytics["task_id"] = task_id
+        return analytics
+
+    # Strategy 1: Load from JSON file (works even if DB is empty)
     scraper_result_file = os.path.join(
         os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../../scraper/results")),
         f"{task_id}_final_results.json"
@@ -136,7 +191,11 @@ async def get_analytics(task_id: str):
         with open(scraper_result_file, "r", encoding="utf-8") as f:
             data = json.load(f)
         jobs = data.get("jobs", [])
-        analytics = compute_analytics(jobs)
+        try:
+            # Backfill so the next request is served from the table
+            analytics = materialize_search_analytics(task_id, jobs)
+        except Exception:
+            analytics = compute_analytics(jobs)
         analytics["source"] = "file"
         analytics["task_id"] = task_id
         return analytics
@@ -151,7 +210,7 @@ async def get_analytics(task_id: str):
         pass
 
     # Strategy 3: Check registry for ongoing status (if strategy 1 & 2 failed)
-    if task and task.get("status") != "completed":
+    if task and task.status != "completed":
         raise HTTPException(status_code=400, detail="Task is still in progress")
 
     raise HTTPException(status_code=404, detail="No analytics found for this task")
@@ -179,6 +238,61 @@ async def simulate_job_impact(search_id: str, request: SimulationRequest):
         logger.error(f"Simulation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
 
+@router.post("/simulate/{search_id}/rank", tags=["Jobs"], summary="Rank Skills by Marginal Value")
+async def rank_skills_for_search(search_id: str, request: SkillRankingRequest):
+
+    # Rank candidate skills by how much each one alone would raise reach / average score.
+    from app.services.simulation_service import MAX_SKILL_CANDIDATES, rank_skill_candidates
+
+    if not request.profile_id:
+        raise HTTPException(status_code=400, detail="Profile ID required")
+    if request.candidate_skills and len(request.candidate_skills) > MAX_SKILL_CANDIDATES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SKILL_CANDIDATES} candidate skills per request")
+
+    try:
+        return rank_skill_candidates(
+            search_id=search_id,
+            profile_id=request.profile_id,
+            candidate_skills=request.candidate_skills,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Skill ranking failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Skill ranking failed: {str(e)}")
+
+@router.get("/similar/profile/{profile_id}", tags=["Jobs"], summary="Best Jobs Across All Searches")
+async def similar_jobs_for_profile(profile_id: str, k: int = Query(20, ge=1, le=200)):
+
+    # Top-k jobs for a profile across every past search (sqlite-vec KNN + hybrid re-weighting).
+    from app.services.retrieval_service import find_jobs_for_profile
+
+    try:
+        jobs = find_jobs_for_profile(profile_id, k=k)
+        return {"profile_id": profile_id, "k": k, "jobs": jobs}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"KNN retrieval failed: {e}")
+        raise HTTPException(status_code=500, detail=f"KNN retrieval failed: {str(e)}")
+
+
+@router.get("/similar/job/{job_id}", tags=["Jobs"], summary="Find Similar Jobs")
+async def similar_jobs_for_job(job_id: int, k: int = Query(20, ge=1, le=200)):
+
+    # Jobs most similar to a stored job, across every past search.
+    from app.services.retrieval_service import find_similar_jobs
+
+    try:
+        jobs = find_similar_jobs(job_id, k=k)
+        return {"job_id": job_id, "k": k, "jobs": jobs}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"KNN retrieval failed: {e}")
+        raise HTTPException(status_code=500, detail=f"KNN retrieval failed: {str(e)}")
+
+
 class ComparisonRequest(BaseModel):
     resume_text: Optional[str] = None
     profile_id: Optional[str] = None
@@ -117,8 +117,8 @@ async def embed_user_profile(profile: UserProfile):
 
         return {
             "profile_id": profile.profile_id,
-            "global_vector": user_vectors["global_vector"],
-            "skill_vector": user_vectors["skill_vector"],
+            "global_vector": user_vectors["global_vector"].tolist(),
+            "skill_vector": user_vectors["skill_vector"].tolist(),
             "skills_used": profile.confirmed_skills,
             "metadata": {
                 "vector_dim": 384,
@@ -141,4 +141,9 @@ async def get_profile_by_id(profile_id: str):
     profile = get_profile(profile_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
+
+    # float32 arrays -> JSON lists
+    for key in ("global_vector", "skill_vector"):
+        if profile.get(key) is not None:
+            profile[key] = profile[key].tolist()
     return profile
@@ -45,3 +45,21 @@ async def calculate_score(request: VectorScoreRequest):
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/cache-stats", tags=["Vector Operations"], summary="Embedding Cache Statistics")
+async def embedding_cache_stats():
+
+    # Hit/miss counters for the embedding cache and the encoder time it saved.
+
+    from ml.embeddings.vectorizer import vector_engine
+    return vector_engine.cache_stats()
+
+
+@router.get("/matrix-cache-stats", tags=["Vector Operations"], summary="Job Matrix Cache Statistics")
+async def job_matrix_cache_stats():
+
+    # Searches held in the in-memory job matrix cache, their size and hit/miss counters.
+
+    from app.services.job_matrix_cache import job_matrix_cache
+    return job_matrix_cache.stats()
@@ -20,6 +20,72 @@ class Settings:
         "*",
     ]
 
+    # Database (SQLite tuning pragmas, applied once per pooled connection)
+    DB_SYNCHRONOUS: str = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+    DB_MMAP_SIZE: int = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))  # 256 MB
+    DB_CACHE_SIZE: int = int(os.getenv("DB_CACHE_SIZE", "-65536"))  # negative = KiB (64 MB)
+    DB_BUSY_TIMEOUT_MS: int = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+
+    # Skill extraction (spaCy nlp.pipe batching for job enrichment)
+    NER_BATCH_SIZE: int = int(os.getenv("NER_BATCH_SIZE", "32"))
+    NER_N_PROCESS: int = int(os.getenv("NER_N_PROCESS", "1"))
+    # "ner" = spaCy model + dictionary layer, "fast" = dictionary-only token trie
+    JOB_SKILL_EXTRACTION_MODE: str = os.getenv("JOB_SKILL_EXTRACTION_MODE", "ner")
+
+    # Scraper runtime (in-process worker pool)
+    SCRAPER_MAX_WORKERS: int = int(os.getenv("SCRAPER_MAX_WORKERS", "10"))
+    SCRAPER_TIMEOUT_SECONDS: int = int(os.getenv("SCRAPER_TIMEOUT_SECONDS", "600"))
+    SCRAPER_PORTAL_TIMEOUTS: dict = {
+        "glassdoor": 900,   # Browser-based portals are slower
+        "naukri": 900,
+    }
+    SCRAPER_CANCEL_GRACE_SECONDS: int = 30
+    # Launch the shared Playwright browser (Glassdoor / Naukri) at startup instead of on first use
+    BROWSER_POOL_PREWARM: bool = os.getenv("BROWSER_POOL_PREWARM", "false").lower() == "true"
+
+    # Streaming pipeline (jobs are enriched + scored in micro-batches while scraping)
+    STREAM_BATCH_SIZE: int = int(os.getenv("STREAM_BATCH_SIZE", "16"))
+    STREAM_MAX_WAIT_SECONDS: float = float(os.getenv("STREAM_MAX_WAIT_SECONDS", "0.5"))
+    STREAM_POLL_INTERVAL_SECONDS: float = 0.5  # SSE delta check interval
+    STREAM_SUMMARY_TOP_N: int = int(os.getenv("STREAM_SUMMARY_TOP_N", "50"))  # Jobs a finished task keeps for /jobs/partial
+
+    # Cross-portal dedup (same posting from several portals is enriched / scored once)
+    DEDUP_ENABLED: bool = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    DEDUP_JACCARD_THRESHOLD: float = float(os.getenv("DEDUP_JACCARD_THRESHOLD", "0.8"))  # Description word-shingle overlap
+    DEDUP_EMBEDDING_THRESHOLD: float = float(os.getenv("DEDUP_EMBEDDING_THRESHOLD", "0"))  # Cosine; 0 disables
+
+    # Search scheduler (admission control for /jobs/search)
+    SEARCH_MAX_CONCURRENT: int = int(os.getenv("SEARCH_MAX_CONCURRENT", "2"))
+    SEARCH_PORTAL_CONCURRENCY: dict = {
+        "glassdoor": 1,     # Each run drives a headful Chromium
+        "naukri": 1,
+    }
+
+    # Search result cache (identical query + location + portals reuse stored jobs)
+    SEARCH_CACHE_TTL_SECONDS: int = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "900"))  # 0 disables
+
+    # Long-text embeddings (resumes / job descriptions): split into token windows and pool,
+    # instead of letting the model truncate at 256 tokens
+    EMBED_CHUNKING: bool = os.getenv("EMBED_CHUNKING", "false").lower() == "true"
+    EMBED_MAX_CHUNKS: int = int(os.getenv("EMBED_MAX_CHUNKS", "4"))       # Windows encoded per text
+    EMBED_CHUNK_POOLING: str = os.getenv("EMBED_CHUNK_POOLING", "max")    # "max" or "mean"
+
+    # Cross-encoder re-ranking (precision pass over the top results at the end of a search)
+    RERANK_ENABLED: bool = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_TOP_K: int = int(os.getenv("RERANK_TOP_K", "20"))
+    RERANK_BATCH_SIZE: int = int(os.getenv("RERANK_BATCH_SIZE", "8"))
+    RERANK_BUDGET_SECONDS: float = float(os.getenv("RERANK_BUDGET_SECONDS", "5"))  # Stage is truncated past this
+    RERANK_WEIGHT: float = float(os.getenv("RERANK_WEIGHT", "0.5"))  # Cross-encoder share of the blended score
+    RERANK_MAX_CHUNKS: int = int(os.getenv("RERANK_MAX_CHUNKS", "1"))  # JD windows per pair (1 = first 1500 chars)
+
+    # Job matrix cache (per-search ids / scores / vectors kept in memory for what-ifs and rescoring)
+    JOB_MATRIX_CACHE_SIZE: int = int(os.getenv("JOB_MATRIX_CACHE_SIZE", "32"))  # Searches; 0 disables
+
+    # Task registry (in-memory state of running / recently finished searches)
+    TASK_LOG_MAX_LINES: int = int(os.getenv("TASK_LOG_MAX_LINES", "2000"))  # Ring buffer per task
+    TASK_TTL_SECONDS: int = int(os.getenv("TASK_TTL_SECONDS", "3600"))      # Finished tasks are evicted after this
+    TASK_REGISTRY_MAX_TASKS: int = int(os.getenv("TASK_REGISTRY_MAX_TASKS", "200"))
+
     # Cleanup
     CLEANUP_INTERVAL_SECONDS: int = 3600       # 1 hour
     CLEANUP_MAX_AGE_SECONDS: int = 3600 * 24   # 24 hours
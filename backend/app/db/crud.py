@@ -4,9 +4,10 @@
 import json
 import uuid
 import logging
-from typing import Dict, List, Any, Optional
+import numpy as np
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
-from app.db.database import get_connection, serialize_vector, deserialize_vector
+from app.db.database import transaction, serialize_vector, deserialize_vector, VECTOR_DIM
 
 logger = logging.getLogger(__name__)
 
@@ -21,14 +22,12 @@ def save_profile(
 ) -> str:
     """Save a new user profile after resume upload. Returns profile_id."""
     profile_id = str(uuid.uuid4())
-    conn = get_connection()
-    conn.execute(
-        """INSERT INTO profiles (id, filename, raw_text, extracted_skills, experience, resume_path)
-           VALUES (?, ?, ?, ?, ?, ?)""",
-        (profile_id, filename, raw_text, json.dumps(extracted_skills), json.dumps(experience), resume_path),
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(
+            """INSERT INTO profiles (id, filename, raw_text, extracted_skills, experience, resume_path)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (profile_id, filename, raw_text, json.dumps(extracted_skills), json.dumps(experience), resume_path),
+        )
     logger.info(f"Profile saved: {profile_id} ({filename})")
     return profile_id
 
@@ -36,38 +35,33 @@ def save_profile(
 def update_profile_vectors(
     profile_id: str,
     confirmed_skills: List[str],
-    global_vector: List[float],
-    skill_vector: List[float],
+    global_vector: np.ndarray,
+    skill_vector: np.ndarray,
 ):
     """Update a profile with confirmed skills and computed vectors."""
-    conn = get_connection()
-
-    # Update the profiles table
-    conn.execute(
-        """UPDATE profiles
-           SET confirmed_skills = ?, global_vector = ?, skill_vector = ?, updated_at = CURRENT_TIMESTAMP
-           WHERE id = ?""",
-        (json.dumps(confirmed_skills), serialize_vector(global_vector), serialize_vector(skill_vector), profile_id),
-    )
-
-    # Upsert into vec_profiles virtual table
-    # Delete old entry if exists, then insert new
-    conn.execute("DELETE FROM vec_profiles WHERE profile_id = ?", (profile_id,))
-    conn.execute(
-        "INSERT INTO vec_profiles (profile_id, global_vector, skill_vector) VALUES (?, ?, ?)",
-        (profile_id, serialize_vector(global_vector), serialize_vector(skill_vector)),
-    )
+    with transaction() as conn:
+        # Update the profiles table
+        conn.execute(
+            """UPDATE profiles
+               SET confirmed_skills = ?, global_vector = ?, skill_vector = ?, updated_at = CURRENT_TIMESTAMP
+               WHERE id = ?""",
+            (json.dumps(confirmed_skills), serialize_vector(global_vector), serialize_vector(skill_vector), profile_id),
+        )
 
-    conn.commit()
-    conn.close()
+        # Upsert into vec_profiles virtual table
+        # Delete old entry if exists, then insert new
+        conn.execute("DELETE FROM vec_profiles WHERE profile_id = ?", (profile_id,))
+        conn.execute(
+            "INSERT INTO vec_profiles (profile_id, global_vector, skill_vector) VALUES (?, ?, ?)",
+            (profile_id, serialize_vector(global_vector), serialize_vector(skill_vector)),
+        )
     logger.info(f"Profile vectors updated: {profile_id}")
 
 
 def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
     """Retrieve a profile by ID."""
-    conn = get_connection()
-    row = conn.execute("SELECT * FROM profiles WHERE id = ?", (profile_id,)).fetchone()
-    conn.close()
+    with transaction() as conn:
+        row = conn.execute("SELECT * FROM profiles WHERE id = ?", (profile_id,)).fetchone()
 
     if not row:
         return None
@@ -88,9 +82,8 @@ def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
 
 def get_latest_profile() -> Optional[Dict[str, Any]]:
     """Get the most recently created profile."""
-    conn = get_connection()
-    row = conn.execute("SELECT * FROM profiles ORDER BY created_at DESC LIMIT 1").fetchone()
-    conn.close()
+    with transaction() as conn:
+        row = conn.execute("SELECT * FROM profiles ORDER BY created_at DESC LIMIT 1").fetchone()
 
     if not row:
         return None
@@ -110,9 +103,8 @@ def get_latest_profile() -> Optional[Dict[str, Any]]:
 
 def get_all_profiles() -> List[Dict[str, Any]]:
     """Get all user profiles ordered by creation time."""
-    conn = get_connection()
-    rows = conn.execute("SELECT * FROM profiles ORDER BY created_at DESC").fetchall()
-    conn.close()
+    with transaction() as conn:
+        rows = conn.execute("SELECT * FROM profiles ORDER BY created_at DESC").fetchall()
 
     results = []
     for row in rows:
@@ -140,16 +132,15 @@ def save_search(
     query: str,
     location: str,
     portals: List[str],
+    cache_key: Optional[str] = None,
 ):
-    """Save a new search entry."""
-    conn = get_connection()
-    conn.execute(
-        """INSERT INTO searches (id, profile_id, query, location, portals)
-           VALUES (?, ?, ?, ?, ?)""",
-        (search_id, profile_id, query, location, json.dumps(portals)),
-    )
-    conn.commit()
-    conn.close()
+    """Save a new search entry. `cache_key` makes its jobs reusable by later identical searches."""
+    with transaction() as conn:
+        conn.execute(
+            """INSERT INTO searches (id, profile_id, query, location, portals, cache_key)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (search_id, profile_id, query, location, json.dumps(portals), cache_key),
+        )
     logger.info(f"Search saved: {search_id} — '{query}' in '{location}'")
 
 
@@ -161,22 +152,33 @@ def update_search_scores(
     high_match_jobs: int,
 ):
     """Update a search with scoring results."""
-    conn = get_connection()
-    conn.execute(
-        """UPDATE searches
-           SET total_jobs = ?, market_reach = ?, average_score = ?, high_match_jobs = ?
-           WHERE id = ?""",
-        (total_jobs, market_reach, average_score, high_match_jobs, search_id),
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(
+            """UPDATE searches
+               SET total_jobs = ?, market_reach = ?, average_score = ?, high_match_jobs = ?
+               WHERE id = ?""",
+            (total_jobs, market_reach, average_score, high_match_jobs, search_id),
+        )
     logger.info(f"Search scores updated: {search_id}")
 
 
+def find_cached_search(cache_key: str, max_age_seconds: int) -> Optional[str]:
+    """Most recent search with this cache key, newer than `max_age_seconds` and with stored jobs."""
+    with transaction() as conn:
+        row = conn.execute(
+            """SELECT s.id FROM searches s
+               WHERE s.cache_key = ?
+                 AND s.created_at >= datetime('now', ?)
+                 AND EXISTS (SELECT 1 FROM jobs j WHERE j.search_id = s.id)
+               ORDER BY s.created_at DESC, s.rowid DESC
+               LIMIT 1""",
+            (cache_key, f"-{int(max_age_seconds)} seconds"),
+        ).fetchone()
+    return row["id"] if row else None
+
+
 def get_search_history(limit: int = 50, profile_id: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get recent search history, optionally filtered by profile."""
-    conn = get_connection()
-    
     query = "SELECT * FROM searches"
     params = []
     
@@ -187,8 +189,8 @@ def get_search_history(limit: int = 50, profile_id: Optional[str] = None) -> Lis
     query += " ORDER BY created_at DESC LIMIT ?"
     params.append(limit)
     
-    rows = conn.execute(query, tuple(params)).fetchall()
-    conn.close()
+    with transaction() as conn:
+        rows = conn.execute(query, tuple(params)).fetchall()
 
     results = []
     for row in rows:
@@ -201,109 +203,142 @@ def get_search_history(limit: int = 50, profile_id: Optional[str] = None) -> Lis
     return results
 
 
-def delete_search(search_id: str):
-    """Delete a search and all its associated jobs."""
-    conn = get_connection()
-    
-    # 1. Get job IDs to delete from vec_jobs
-    job_ids = conn.execute("SELECT id FROM jobs WHERE search_id = ?", (search_id,)).fetchall()
-    for row in job_ids:
-        conn.execute("DELETE FROM vec_jobs WHERE job_id = ?", (row[0],))
+def clear_search_results(search_id: str):
+    """Delete the stored search row, jobs, vectors and analytics of a search (its task row stays)."""
+    with transaction() as conn:
+        # 1. Get job IDs to delete from vec_jobs
+        job_ids = conn.execute("SELECT id FROM jobs WHERE search_id = ?", (search_id,)).fetchall()
+        for row in job_ids:
+            conn.execute("DELETE FROM vec_jobs WHERE job_id = ?", (row[0],))
         
-    # 2. Delete jobs
-    conn.execute("DELETE FROM jobs WHERE search_id = ?", (search_id,))
+        # 2. Delete jobs
+        conn.execute("DELETE FROM jobs WHERE search_id = ?", (search_id,))
     
-    # 3. Delete search
-    conn.execute("DELETE FROM searches WHERE id = ?", (search_id,))
-    conn.commit()
-    conn.close()
+        # 3. Delete search
+        conn.execute("DELETE FROM searches WHERE id = ?", (search_id,))
+        conn.execute("DELETE FROM search_analytics WHERE search_id = ?", (search_id,))
 
 
-def delete_profile(profile_id: str):
-    """Delete a profile and all its associated searches/jobs."""
-    conn = get_connection()
-    
-    # 1. Get searches to delete
-    searches = conn.execute("SELECT id FROM searches WHERE profile_id = ?", (profile_id,)).fetchall()
-    
-    for row in searches:
-        sid = row[0]
-        # Delete jobs for this search
-        job_ids = conn.execute("SELECT id FROM jobs WHERE search_id = ?", (sid,)).fetchall()
-        for jrow in job_ids:
-            conn.execute("DELETE FROM vec_jobs WHERE job_id = ?", (jrow[0],))
-        conn.execute("DELETE FROM jobs WHERE search_id = ?", (sid,))
-        conn.execute("DELETE FROM searches WHERE id = ?", (sid,))
-
-    # 2. Delete from vec_profiles
-    conn.execute("DELETE FROM vec_profiles WHERE profile_id = ?", (profile_id,))
+def delete_search(search_id: str):
+    """Delete a search and all its associated jobs."""
+    with transaction() as conn:
+        clear_search_results(search_id)
+        conn.execute("DELETE FROM search_tasks WHERE id = ?", (search_id,))
+
+
+def delete_profile(profile_id: str) -> List[str]:
+    """Delete a profile and all its associated searches/jobs. Returns the deleted search ids."""
+    with transaction() as conn:
+        # 1. Get searches to delete
+        searches = conn.execute("SELECT id FROM searches WHERE profile_id = ?", (profile_id,)).fetchall()
     
-    # 3. Delete profile
-    conn.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
+        for row in searches:
+            sid = row[0]
+            # Delete jobs for this search
+            job_ids = conn.execute("SELECT id FROM jobs WHERE search_id = ?", (sid,)).fetchall()
+            for jrow in job_ids:
+                conn.execute("DELETE FROM vec_jobs WHERE job_id = ?", (jrow[0],))
+            conn.execute("DELETE FROM jobs WHERE search_id = ?", (sid,))
+            conn.execute("DELETE FROM searches WHERE id = ?", (sid,))
+            conn.execute("DELETE FROM search_analytics WHERE search_id = ?", (sid,))
+            conn.execute("DELETE FROM search_tasks WHERE id = ?", (sid,))
+
+        # Tasks still queued / running for this profile carry its vectors in their payload
+        conn.execute(
+            "DELETE FROM search_tasks WHERE json_extract(payload, '$.profile_id') = ?",
+            (profile_id,),
+        )
+
+        # 2. Delete from vec_profiles
+        conn.execute("DELETE FROM vec_profiles WHERE profile_id = ?", (profile_id,))
     
-    conn.commit()
-    conn.close()
+        # 3. Delete profile
+        conn.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
+
+    return [row[0] for row in searches]
+
+# Job keys stored in dedicated columns (everything else goes into `metadata`)
+_JOB_COLUMN_KEYS = frozenset((
+    "title", "company", "location", "description", "skills",
+    "url", "portal", "match_score",
+    "jd_global_vector", "jd_skill_vector",
+))
+
+
+def _job_row(job_id: int, search_id: str, job: Dict[str, Any], dumps) -> tuple:
+    return (
+        job_id,
+        search_id,
+        job.get("title", ""),
+        job.get("company", ""),
+        job.get("location", ""),
+        job.get("description", ""),
+        dumps(job.get("skills", [])),
+        job.get("link") or job.get("url") or "",
+        job.get("portal", ""),
+        job.get("match_score", 0),
+        dumps({k: v for k, v in job.items() if k not in _JOB_COLUMN_KEYS}),
+    )
+
 
 def save_jobs_batch(
     search_id: str,
     jobs: List[Dict[str, Any]],
-    job_vectors: Optional[List[Dict[str, List[float]]]] = None,
-):
+    job_vectors: Optional[List[Dict[str, np.ndarray]]] = None,
+) -> List[int]:
     """
-    Batch-save all jobs for a search.
+    Batch-save all jobs for a search in one transaction.
+    Job ids are assigned as a contiguous range under the write lock, so rows and
+    their vec_jobs entries are both inserted with a single executemany each.
     Optionally saves vectors to vec_jobs for future similarity queries.
+    Returns the assigned job ids (in input order).
     """
-    conn = get_connection()
+    if not jobs:
+        return []
 
-    for i, job in enumerate(jobs):
-        cursor = conn.execute(
-            """INSERT INTO jobs (search_id, title, company, location, description, skills, url, portal, match_score, metadata)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                search_id,
-                job.get("title", ""),
-                job.get("company", ""),
-                job.get("location", ""),
-                job.get("description", ""),
-                json.dumps(job.get("skills", [])),
-                job.get("link") or job.get("url") or "",
-                job.get("portal", ""),
-                job.get("match_score", 0),
-                json.dumps({k: v for k, v in job.items() if k not in (
-                    "title", "company", "location", "description", "skills",
-                    "url", "portal", "match_score",
-                    "jd_global_vector", "jd_skill_vector"
-                )}),
-            ),
+    dumps = json.JSONEncoder().encode
+
+    with transaction(immediate=True) as conn:
+        # AUTOINCREMENT never reuses ids, so start after the highest ever issued
+        row = conn.execute(
+            """SELECT MAX(
+                   COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'jobs'), 0),
+                   COALESCE((SELECT MAX(id) FROM jobs), 0)
+               )"""
+        ).fetchone()
+        first_id = row[0] + 1
+        job_ids = list(range(first_id, first_id + len(jobs)))
+
+        rows = [_job_row(job_id, search_id, job, dumps) for job_id, job in zip(job_ids, jobs)]
+        conn.executemany(
+            """INSERT INTO jobs (id, search_id, title, company, location, description, skills, url, portal, match_score, metadata)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            rows,
         )
 
         # Save vectors if provided
-        if job_vectors and i < len(job_vectors):
-            job_id = cursor.lastrowid
-            vecs = job_vectors[i]
-            if vecs.get("global_vector") and vecs.get("skill_vector"):
-                conn.execute(
-                    "INSERT INTO vec_jobs (job_id, global_vector, skill_vector) VALUES (?, ?, ?)",
-                    (
-                        job_id,
-                        serialize_vector(vecs["global_vector"]),
-                        serialize_vector(vecs["skill_vector"]),
-                    ),
-                )
-
-    conn.commit()
-    conn.close()
+        if job_vectors:
+            vector_rows = [
+                (job_id, serialize_vector(vecs["global_vector"]), serialize_vector(vecs["skill_vector"]))
+                for job_id, vecs in zip(job_ids, job_vectors)
+                if vecs.get("global_vector") is not None and vecs.get("skill_vector") is not None
+            ]
+            conn.executemany(
+                "INSERT INTO vec_jobs (job_id, global_vector, skill_vector) VALUES (?, ?, ?)",
+                vector_rows,
+            )
+
     logger.info(f"Saved {len(jobs)} jobs for search {search_id}")
+    return job_ids
 
 
 def get_jobs_by_search(search_id: str) -> List[Dict[str, Any]]:
     """Get all jobs for a given search, sorted by match_score descending."""
-    conn = get_connection()
-    rows = conn.execute(
-        "SELECT * FROM jobs WHERE search_id = ? ORDER BY match_score DESC",
-        (search_id,),
-    ).fetchall()
-    conn.close()
+    with transaction() as conn:
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE search_id = ? ORDER BY match_score DESC",
+            (search_id,),
+        ).fetchall()
 
     results = []
     for row in rows:
@@ -317,11 +352,10 @@ def get_jobs_by_search(search_id: str) -> List[Dict[str, Any]]:
 
 def get_all_jobs(limit: int = 100) -> List[Dict[str, Any]]:
     """Get all jobs across all searches."""
-    conn = get_connection()
-    rows = conn.execute(
-        "SELECT * FROM jobs ORDER BY match_score DESC LIMIT ?", (limit,)
-    ).fetchall()
-    conn.close()
+    with transaction() as conn:
+        rows = conn.execute(
+            "SELECT * FROM jobs ORDER BY match_score DESC LIMIT ?", (limit,)
+        ).fetchall()
 
     results = []
     for row in rows:
@@ -335,18 +369,16 @@ def get_all_jobs(limit: int = 100) -> List[Dict[str, Any]]:
 
 def get_job_vectors_by_search(search_id: str) -> List[Dict[str, Any]]:
     """Get job vectors for a search from the vec_jobs virtual table."""
-    conn = get_connection()
     # Join jobs table to filter by search_id
     try:
-        rows = conn.execute(
-            "SELECT j.id, vj.global_vector, vj.skill_vector FROM jobs j JOIN vec_jobs vj ON j.id = vj.job_id WHERE j.search_id = ?",
-            (search_id,),
-        ).fetchall()
+        with transaction() as conn:
+            rows = conn.execute(
+                "SELECT j.id, vj.global_vector, vj.skill_vector FROM jobs j JOIN vec_jobs vj ON j.id = vj.job_id WHERE j.search_id = ?",
+                (search_id,),
+            ).fetchall()
     except Exception as e:
         logger.error(f"Vector fetch failed: {e}")
         return []
-    finally:
-        conn.close()
 
     results = []
     for row in rows:
@@ -360,3 +392,236 @@ def get_job_vectors_by_search(search_id: str) -> List[Dict[str, Any]]:
             continue
 
     return results
+
+
+def get_search_job_matrix(search_id: str) -> Dict[str, Any]:
+    """
+    All vectorized jobs of a search as contiguous float32 matrices (one query, no per-row lists).
+    Returns {"ids", "titles", "companies", "skills", "match_scores", "global_vectors", "skill_vectors",
+    "total_jobs"}; row i of every entry describes the same job. match_scores are bi-encoder scores
+    (before any cross-encoder blend), so they compare with freshly computed ones.
+    total_jobs counts every job of the search, including those stored without vectors.
+    """
+    with transaction() as conn:
+        rows = conn.execute(
+            """SELECT j.id, j.title, j.company, j.skills,
+                      COALESCE(json_extract(j.metadata, '$.bi_encoder_score'), j.match_score) AS match_score,
+                      vj.global_vector, vj.skill_vector
+               FROM jobs j JOIN vec_jobs vj ON j.id = vj.job_id
+               WHERE j.search_id = ?
+               ORDER BY j.id""",
+            (search_id,),
+        ).fetchall()
+        total_jobs = conn.execute("SELECT COUNT(*) FROM jobs WHERE search_id = ?", (search_id,)).fetchone()[0]
+
+    return {
+        "ids": [row["id"] for row in rows],
+        "titles": [row["title"] for row in rows],
+        "companies": [row["company"] for row in rows],
+        "skills": [json.loads(row["skills"]) for row in rows],
+        "match_scores": np.array([row["match_score"] or 0 for row in rows], dtype=np.float64),
+        "global_vectors": np.frombuffer(b"".join(row["global_vector"] for row in rows), dtype=np.float32).reshape(-1, VECTOR_DIM),
+        "skill_vectors": np.frombuffer(b"".join(row["skill_vector"] for row in rows), dtype=np.float32).reshape(-1, VECTOR_DIM),
+        "total_jobs": total_jobs,
+    }
+
+# VECTOR SEARCH (sqlite-vec KNN)
+
+def knn_jobs(
+    column: str,
+    query_vector: np.ndarray,
+    k: int,
+) -> List[Dict[str, Any]]:
+    """
+    Nearest-neighbour lookup over vec_jobs using sqlite-vec's KNN index.
+    `column` is either 'global_vector' or 'skill_vector'.
+    Returns [{"job_id", "distance"}] ordered by ascending L2 distance.
+    """
+    if column not in ("global_vector", "skill_vector"):
+        raise ValueError(f"Unknown vector column: {column}")
+
+    with transaction() as conn:
+        rows = conn.execute(
+            f"""SELECT job_id, distance FROM vec_jobs
+                WHERE {column} MATCH ? AND k = ?
+                ORDER BY distance""",
+            (serialize_vector(query_vector), k),
+        ).fetchall()
+
+    return [{"job_id": row["job_id"], "distance": row["distance"]} for row in rows]
+
+
+def get_job_vectors_by_ids(job_ids: List[int]) -> List[Dict[str, Any]]:
+    """Get vectors for specific job ids from vec_jobs."""
+    if not job_ids:
+        return []
+
+    placeholders = ",".join("?" * len(job_ids))
+    with transaction() as conn:
+        rows = conn.execute(
+            f"SELECT job_id, global_vector, skill_vector FROM vec_jobs WHERE job_id IN ({placeholders})",
+            tuple(job_ids),
+        ).fetchall()
+
+    return [
+        {
+            "id": row["job_id"],
+            "global_vector": deserialize_vector(row["global_vector"]),
+            "skill_vector": deserialize_vector(row["skill_vector"]),
+        }
+        for row in rows
+    ]
+
+
+def get_jobs_by_ids(job_ids: List[int]) -> List[Dict[str, Any]]:
+    """Get job rows (with their search's query) for specific job ids."""
+    if not job_ids:
+        return []
+
+    placeholders = ",".join("?" * len(job_ids))
+    with transaction() as conn:
+        rows = conn.execute(
+            f"""SELECT j.*, s.query AS search_query, s.profile_id AS search_profile_id
+                FROM jobs j LEFT JOIN searches s ON s.id = j.search_id
+                WHERE j.id IN ({placeholders})""",
+            tuple(job_ids),
+        ).fetchall()
+
+    results = []
+    for row in rows:
+        r = dict(row)
+        r["skills"] = json.loads(r["skills"])
+        r["metadata"] = json.loads(r["metadata"])
+        r["link"] = r.get("url") # Standardize for frontend
+        results.append(r)
+    return results
+
+
+def delete_jobs(search_id: str, job_ids: List[int]) -> List[Dict[str, Any]]:
+    """Delete some jobs of a search (and their vectors). Returns the deleted rows."""
+    if not job_ids:
+        return []
+    placeholders = ",".join("?" * len(job_ids))
+    with transaction(immediate=True) as conn:
+        rows = conn.execute(
+            f"SELECT * FROM jobs WHERE search_id = ? AND id IN ({placeholders})",
+            (search_id, *job_ids),
+        ).fetchall()
+        deleted_ids = [row["id"] for row in rows]
+        conn.executemany("DELETE FROM vec_jobs WHERE job_id = ?", [(job_id,) for job_id in deleted_ids])
+        conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in deleted_ids])
+
+    results = []
+    for row in rows:
+        r = dict(row)
+        r["skills"] = json.loads(r["skills"])
+        r["metadata"] = json.loads(r["metadata"])
+        results.append(r)
+    return results
+
+
+# SEARCH ANALYTICS (materialized)
+
+def save_search_analytics(search_id: str, counters: Dict[str, Any], response: Dict[str, Any]):
+    """Store (or replace) the analytics counters and rendered response for a search."""
+    with transaction() as conn:
+        conn.execute(
+            """INSERT OR REPLACE INTO search_analytics (search_id, counters, response, updated_at)
+               VALUES (?, ?, ?, CURRENT_TIMESTAMP)""",
+            (search_id, json.dumps(counters), json.dumps(response)),
+        )
+
+
+def get_search_analytics(search_id: str) -> Optional[Dict[str, Any]]:
+    """Stored analytics response for a search, or None if it was never materialized."""
+    with transaction() as conn:
+        row = conn.execute(
+            "SELECT response FROM search_analytics WHERE search_id = ?", (search_id,)
+        ).fetchone()
+    return json.loads(row["response"]) if row else None
+
+
+def modify_search_analytics(
+    search_id: str,
+    apply: Callable[[Dict[str, Any]], Tuple[Dict[str, Any], Dict[str, Any]]],
+) -> Optional[Dict[str, Any]]:
+    """
+    Read-modify-write the counters of a search in one write transaction.
+    `apply(counters)` returns (new_counters, new_response). Returns the new response,
+    or None if the search has no materialized analytics.
+    """
+    with transaction(immediate=True) as conn:
+        row = conn.execute(
+            "SELECT counters FROM search_analytics WHERE search_id = ?", (search_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        counters, response = apply(json.loads(row["counters"]))
+        conn.execute(
+            """UPDATE search_analytics SET counters = ?, response = ?, updated_at = CURRENT_TIMESTAMP
+               WHERE search_id = ?""",
+            (json.dumps(counters), json.dumps(response), search_id),
+        )
+    return response
+
+
+# SEARCH TASKS (durable queue)
+
+def save_search_task(task_id: str, payload: Dict[str, Any]):
+    """Persist a newly queued search."""
+    with transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO search_tasks (id, status, payload) VALUES (?, 'queued', ?)",
+            (task_id, json.dumps(payload)),
+        )
+
+
+def update_search_task_status(task_id: str, status: str, error: Optional[str] = None):
+    """
+    Move a search task to running / completed / failed (timestamps are set automatically).
+    A finished task no longer needs its payload for recovery, so the payload (SerpAPI key,
+    user vectors) is wiped as soon as a terminal status is recorded.
+    """
+    with transaction() as conn:
+        if status == "running":
+            conn.execute(
+                "UPDATE search_tasks SET status = ?, started_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (status, task_id),
+            )
+        else:
+            conn.execute(
+                """UPDATE search_tasks SET status = ?, error = ?, payload = '{}', finished_at = CURRENT_TIMESTAMP
+                   WHERE id = ?""",
+                (status, error, task_id),
+            )
+
+
+def delete_finished_search_tasks(max_age_seconds: int) -> int:
+    """Prune completed / failed search tasks older than `max_age_seconds`. Returns rows deleted."""
+    with transaction() as conn:
+        cursor = conn.execute(
+            """DELETE FROM search_tasks
+               WHERE status NOT IN ('queued', 'running')
+                 AND COALESCE(finished_at, created_at) < datetime('now', ?)""",
+            (f"-{int(max_age_seconds)} seconds",),
+        )
+        # Rows finished before payloads were wiped on completion
+        conn.execute("UPDATE search_tasks SET payload = '{}' WHERE status NOT IN ('queued', 'running') AND payload != '{}'")
+    return cursor.rowcount
+
+
+def get_unfinished_search_tasks() -> List[Dict[str, Any]]:
+    """Queued and running search tasks, oldest first (used to resume after a restart)."""
+    with transaction() as conn:
+        rows = conn.execute(
+            """SELECT id, status, payload, created_at FROM search_tasks
+               WHERE status IN ('queued', 'running')
+               ORDER BY created_at, rowid"""
+        ).fetchall()
+
+    tasks = []
+    for row in rows:
+        task = dict(row)
+        task["payload"] = json.loads(task["payload"] or "{}")
+        tasks.append(task)
+    return tasks
@@ -6,8 +6,12 @@ import sqlite_vec
 import os
 import json
 import logging
-import struct
-from typing import List
+import threading
+import numpy as np
+from contextlib import contextmanager
+from typing import Iterator, List, Sequence, Union
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -18,40 +22,135 @@ DB_PATH = os.path.join(DB_DIR, "skillfit.db")
 VECTOR_DIM = 384  # all-MiniLM-L6-v2 output dimension
 
 
-def serialize_vector(vec: List[float]) -> bytes:
-    # Convert a Python list of floats to a compact binary blob for sqlite-vec.
-    return struct.pack(f"{len(vec)}f", *vec)
+def serialize_vector(vec: Union[np.ndarray, Sequence[float]]) -> bytes:
+    # Convert a float32 array (or list of floats) to a compact binary blob for sqlite-vec.
+    # float32 ndarrays are written straight from their buffer, no per-element conversion.
+    return np.ascontiguousarray(vec, dtype=np.float32).tobytes()
 
 
-def deserialize_vector(blob: bytes) -> List[float]:
-    # Convert a binary blob back to a Python list of floats.
-    n = len(blob) // 4  
-    return list(struct.unpack(f"{n}f", blob))
+def deserialize_vector(blob: bytes) -> np.ndarray:
+    # View a binary blob as a read-only float32 array (zero-copy).
+    # Convert with .tolist() only at the JSON boundary.
+    return np.frombuffer(blob, dtype=np.float32)
 
 
-def get_connection() -> sqlite3.Connection:
-    # Get a connection to the local SQLite database with sqlite-vec loaded.
+# Per-thread connection pool: each worker thread opens one connection, configures it
+# (pragmas + sqlite-vec) once, and reuses it for every CRUD call afterwards.
+# Short-lived threads (one per search) must release theirs with close_thread_connection().
+_local = threading.local()
+_pool_lock = threading.Lock()
+_all_connections: List[sqlite3.Connection] = []
+_pool_generation = 0  # Bumped by close_all_connections() so threads reopen lazily
+_db_dir_ready = False
+
+
+def _open_connection() -> sqlite3.Connection:
+    # Open and configure a new connection to the local SQLite database.
     # Creates the data/ directory and database file if they don't exist.
-    os.makedirs(DB_DIR, exist_ok=True)
+    global _db_dir_ready
+    if not _db_dir_ready:
+        os.makedirs(DB_DIR, exist_ok=True)
+        _db_dir_ready = True
 
-    conn = sqlite3.connect(DB_PATH)
+    # check_same_thread=False only so close_all_connections() can close it at shutdown;
+    # each connection is otherwise used exclusively by the thread that opened it.
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=settings.DB_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+    )
     conn.row_factory = sqlite3.Row  
     conn.execute("PRAGMA journal_mode=WAL")  
     conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute(f"PRAGMA synchronous={settings.DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA mmap_size={int(settings.DB_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA cache_size={int(settings.DB_CACHE_SIZE)}")
 
     conn.enable_load_extension(True)
     sqlite_vec.load(conn)
     conn.enable_load_extension(False)
 
+    with _pool_lock:
+        _all_connections.append(conn)
+    return conn
+
+
+def get_connection() -> sqlite3.Connection:
+    # Get this thread's reusable connection (sqlite-vec already loaded).
+    # Do not close it — use transaction() for scoped work.
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.generation != _pool_generation:
+        conn = _open_connection()
+        _local.conn = conn
+        _local.generation = _pool_generation
+        _local.depth = 0
     return conn
 
 
+@contextmanager
+def transaction(immediate: bool = False) -> Iterator[sqlite3.Connection]:
+    # Scoped unit of work on the thread's pooled connection.
+    # Commits on success, rolls back on error. Nested blocks join the outer transaction.
+    # immediate=True takes the write lock up front (BEGIN IMMEDIATE), for callers that
+    # read-then-write and must not race other writers.
+    conn = get_connection()
+    if immediate and _local.depth == 0 and not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    _local.depth += 1
+    try:
+        yield conn
+    except Exception:
+        _local.depth -= 1
+        if _local.depth == 0:
+            conn.rollback()
+        raise
+    else:
+        _local.depth -= 1
+        if _local.depth == 0:
+            conn.commit()
+
+
+def close_thread_connection():
+    # Close the calling thread's pooled connection (end of a per-search thread).
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        return
+    _local.conn = None
+    with _pool_lock:
+        try:
+            _all_connections.remove(conn)
+        except ValueError:
+            pass  # Already closed by close_all_connections()
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def close_all_connections():
+    # Close every pooled connection (application shutdown).
+    global _pool_generation
+    with _pool_lock:
+        _pool_generation += 1
+        for conn in _all_connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _all_connections.clear()
+
+
 def init_db():
     
     # Create all tables if they don't exist.
 
-    conn = get_connection()
-    cursor = conn.cursor()
+    with transaction() as conn:
+        _create_tables(conn.cursor())
+
+    logger.info(f"Database initialized at: {DB_PATH}")
+
+
+def _create_tables(cursor: sqlite3.Cursor):
 
     # ── 1. Profiles Table ──
     cursor.execute("""
@@ -125,28 +224,56 @@ def init_db():
         )
     """)
 
+    # ── 5. Search Task Queue ──
+    # Durable state for /jobs/search so queued / in-flight searches survive a restart
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS search_tasks (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'queued',
+            payload TEXT NOT NULL DEFAULT '{}',
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_search_tasks_status ON search_tasks(status, created_at)")
+
+    # ── 6. Materialized Search Analytics ──
+    # Dashboard counters computed once per search (kept in sync as its jobs change)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS search_analytics (
+            search_id TEXT PRIMARY KEY,
+            counters TEXT NOT NULL DEFAULT '{}',
+            response TEXT NOT NULL DEFAULT '{}',
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
     # Migrations
     try:
         cursor.execute("ALTER TABLE profiles ADD COLUMN resume_path TEXT")
     except sqlite3.OperationalError:
         pass # Column already exists
-    
-    conn.commit()
-    conn.close()
 
-    logger.info(f"Database initialized at: {DB_PATH}")
+    try:
+        # Normalized (query, location, portals) key for the search-result cache
+        cursor.execute("ALTER TABLE searches ADD COLUMN cache_key TEXT")
+    except sqlite3.OperationalError:
+        pass # Column already exists
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_searches_cache_key ON searches(cache_key, created_at)")
 
 
 def reset_db():
     """Drop all tables and recreate them. Use for development only."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DROP TABLE IF EXISTS jobs")
-    cursor.execute("DROP TABLE IF EXISTS searches")
-    cursor.execute("DROP TABLE IF EXISTS profiles")
-    cursor.execute("DROP TABLE IF EXISTS vec_jobs")
-    cursor.execute("DROP TABLE IF EXISTS vec_profiles")
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DROP TABLE IF EXISTS jobs")
+        cursor.execute("DROP TABLE IF EXISTS searches")
+        cursor.execute("DROP TABLE IF EXISTS profiles")
+        cursor.execute("DROP TABLE IF EXISTS vec_jobs")
+        cursor.execute("DROP TABLE IF EXISTS vec_profiles")
+        cursor.execute("DROP TABLE IF EXISTS search_analytics")
+        cursor.execute("DROP TABLE IF EXISTS search_tasks")
     init_db()
     logger.info("Database reset complete.")
@@ -12,6 +12,9 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"
 from app.core.config import settings
 from app.api.v1.router import api_router
 from app.services.cleanup import cleanup_stale_files
+from app.services.task_registry import task_registry
+from app.services.search_scheduler import search_scheduler
+from app.services.scraper_runtime import warm_browser_pool, shutdown_browser_pool
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -62,13 +65,39 @@ app.include_router(api_router, prefix=settings.API_PREFIX)
 async def root():
     return {"message": f"{settings.PROJECT_NAME} is running "}
 
-from app.db.database import init_db
+from app.db.database import init_db, close_all_connections
+from app.db.crud import delete_finished_search_tasks
 
 # Background Cleanup
 @app.on_event("startup")
 async def startup_event():
     init_db()  # Create tables if they don't exist
+    search_scheduler.recover()  # Resume searches queued / running before a restart
     asyncio.create_task(periodic_cleanup())
+    if settings.BROWSER_POOL_PREWARM:
+        asyncio.create_task(prewarm_browser_pool())
+    if settings.RERANK_ENABLED:
+        asyncio.create_task(prewarm_cross_encoder())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    close_all_connections()  # Release pooled SQLite connections
+    shutdown_browser_pool()  # Close the shared Playwright browser
+
+async def prewarm_browser_pool():
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, warm_browser_pool)
+        logger.info("Shared scraper browser launched.")
+    except Exception as e:
+        logger.error(f"Browser pool prewarm failed (will launch on first use): {e}")
+
+async def prewarm_cross_encoder():
+    # Load the re-ranking model now so the first search's latency budget isn't spent on it
+    try:
+        from ml.embeddings.vectorizer import cross_encoder_engine
+        await asyncio.get_running_loop().run_in_executor(None, cross_encoder_engine.load_model)
+    except Exception as e:
+        logger.error(f"Cross-encoder prewarm failed (will load on first use): {e}")
 
 async def periodic_cleanup():
     import sys  # Import inside function is fine, but indentation matters
@@ -83,6 +112,8 @@ async def periodic_cleanup():
                 scraper_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../scraper"))
 
             cleanup_stale_files(scraper_dir, max_age_seconds=settings.CLEANUP_MAX_AGE_SECONDS)
+            task_registry.evict_expired()  # Finished searches past their TTL
+            delete_finished_search_tasks(settings.CLEANUP_MAX_AGE_SECONDS)  # Old search_tasks rows
         except Exception as e:
             logger.error(f"Cleanup error: {e}")
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 class SerpApiConfig(BaseModel):
     api_key: str = Field(..., description="Your SerpAPI Key for Google Jobs search")
@@ -23,6 +23,12 @@ class SearchRequest(BaseModel):
     serp_api_config: Optional[SerpApiConfig] = Field(None, description="Configuration for Google Jobs (SerpAPI)")
     user_vectors: Optional[UserVectors] = Field(None, description="Pre-computed user vectors from /embed endpoint")
     profile_id: Optional[str] = Field(None, description="Profile ID to fetch vectors from DB")
+    skill_extraction_mode: Optional[Literal["ner", "fast"]] = Field(
+        None, description="Job skill extraction: 'ner' (spaCy model) or 'fast' (dictionary-only). Defaults to server setting."
+    )
+    use_cache: bool = Field(
+        True, description="Reuse jobs from an identical search run within the cache window (rescored for this profile)"
+    )
 
 class Job(BaseModel):
     title: str
@@ -36,3 +42,9 @@ class Job(BaseModel):
 class SimulationRequest(BaseModel):
     profile_id: str
     added_skills: List[str]
+
+class SkillRankingRequest(BaseModel):
+    profile_id: str
+    candidate_skills: Optional[List[str]] = Field(
+        None, description="Skills to rank; defaults to the search's top skills missing from the profile"
+    )
@@ -5,7 +5,8 @@ import re
 import json
 import logging
 from collections import Counter
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +79,26 @@ CITY_ALIASES = {
 }
 
 
+# COMPILED NORMALIZERS
+# Patterns are compiled once at import; titles and locations repeat heavily across jobs
+# (and searches), so both normalizers are memoized on the raw string.
+
+_PARENS_RE = re.compile(r"\(.*?\)")
+_LOCATION_NOISE_RE = re.compile(r"dely|west|east|north|south|sector")
+
+_TITLE_SUFFIX_RE = re.compile(r"\s*[-–—]\s*(Bang|Hyd|Chennai|Hybrid|MNC|Immediate|Across|Python).*$", re.IGNORECASE)
+_TITLE_VP_PREFIX_RE = re.compile(r"^(vice\s+president|vp)\s*[-–—]\s*", re.IGNORECASE)
+_TITLE_SENIOR_RE = re.compile(r"\bSr\.?\s", re.IGNORECASE)
+_TITLE_JUNIOR_RE = re.compile(r"\bJr\.?\s", re.IGNORECASE)
+_TITLE_AIML_RE = re.compile(r"\bAI\s*/?\s*ML\b", re.IGNORECASE)  # Also covers "AIML"
+_TITLE_DS_PREFIX_RE = re.compile(r"^Data\s+Science\s*[-–—]\s*", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+_PERIOD_SPACE_RE = re.compile(r"\.\s")
+_TITLE_ACRONYMS = (("Ai/Ml", "AI/ML"), ("Ai ", "AI "), ("Ml ", "ML "), ("Llm", "LLM"), ("Nlp", "NLP"))
+
+NORMALIZER_CACHE_SIZE = 8192
+
+
 # LOCATION NORMALIZATION
 
 def normalize_locations(raw_location: str) -> List[str]:
@@ -90,34 +111,33 @@ def normalize_locations(raw_location: str) -> List[str]:
     #     "India"                              → ["India (Remote/Pan-India)"]
     if not raw_location or raw_location == "N/A":
         return ["Unknown"]
+    return list(_normalize_locations_cached(raw_location))
+
 
-    cleaned = re.sub(r"\(.*?\)", "", raw_location).strip()
-    
-    parts = [p.strip() for p in cleaned.split(",") if p.strip()]
+@lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+def _normalize_locations_cached(raw_location: str) -> Tuple[str, ...]:
+    cleaned = _PARENS_RE.sub("", raw_location)
 
     cities = []
-    for part in parts:
-        lower = part.lower().strip()
+    for part in cleaned.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lower = part.lower()
 
         if lower in INDIAN_STATES:
             continue
 
         # Map known aliases
-        if lower in CITY_ALIASES:
-            cities.append(CITY_ALIASES[lower])
-        else:
-            if any(noise in lower for noise in ["dely", "west", "east", "north", "south", "sector"]):
+        city = CITY_ALIASES.get(lower)
+        if city is None:
+            if _LOCATION_NOISE_RE.search(lower):
                 continue
-            cities.append(part.strip().title())
-
-    seen = set()
-    unique = []
-    for c in cities:
-        if c not in seen:
-            seen.add(c)
-            unique.append(c)
+            city = part.title()
+        if city not in cities:
+            cities.append(city)
 
-    return unique if unique else ["Unknown"]
+    return tuple(cities) if cities else ("Unknown",)
 
 
 # TITLE NORMALIZATION
@@ -130,26 +150,27 @@ def normalize_title(raw_title: str) -> str:
     #     "Vice President - Lead Data Scientist (...)"    → "Lead Data Scientist"
     if not raw_title:
         return "Unknown"
+    return _normalize_title_cached(raw_title)
+
 
+@lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+def _normalize_title_cached(raw_title: str) -> str:
     title = raw_title.strip()
 
-    title = re.sub(r"\s*[-–—]\s*(Bang|Hyd|Chennai|Hybrid|MNC|Immediate|Across|Python).*$", "", title, flags=re.IGNORECASE)
-    
-    title = re.sub(r"\(.*?\)", "", title).strip()
-    
-    title = re.sub(r"^(vice\s+president|vp)\s*[-–—]\s*", "", title, flags=re.IGNORECASE).strip()
-
-    title = re.sub(r"\bSr\.?\s", "Senior ", title, flags=re.IGNORECASE)
-    title = re.sub(r"\bJr\.?\s", "Junior ", title, flags=re.IGNORECASE)
-    title = re.sub(r"\bAI\s*/?\s*ML\b", "AI/ML", title, flags=re.IGNORECASE)
-    title = re.sub(r"\bAIML\b", "AI/ML", title, flags=re.IGNORECASE)
-    
+    title = _TITLE_SUFFIX_RE.sub("", title)
+    title = _PARENS_RE.sub("", title).strip()
+    title = _TITLE_VP_PREFIX_RE.sub("", title).strip()
+
+    title = _TITLE_SENIOR_RE.sub("Senior ", title)
+    title = _TITLE_JUNIOR_RE.sub("Junior ", title)
+    title = _TITLE_AIML_RE.sub("AI/ML", title)
+
     # Remove "Data Science - " prefix if followed by a role
-    title = re.sub(r"^Data\s+Science\s*[-–—]\s*", "", title, flags=re.IGNORECASE).strip()
+    title = _TITLE_DS_PREFIX_RE.sub("", title).strip()
 
     # Clean up extra whitespace and periods
-    title = re.sub(r"\s+", " ", title).strip()
-    title = re.sub(r"\.\s", " ", title)  # "Senior. Data" -> "Senior Data"
+    title = _WHITESPACE_RE.sub(" ", title).strip()
+    title = _PERIOD_SPACE_RE.sub(" ", title)  # "Senior. Data" -> "Senior Data"
 
     # Remove trailing dashes or noise
     title = title.rstrip("- .").strip()
@@ -157,135 +178,211 @@ def normalize_title(raw_title: str) -> str:
     # Title case normalization for consistent grouping
     title = title.title()
     # Fix known acronyms that title() breaks
-    title = title.replace("Ai/Ml", "AI/ML")
-    title = title.replace("Ai ", "AI ")
-    title = title.replace("Ml ", "ML ")
-    title = title.replace("Llm", "LLM")
-    title = title.replace("Nlp", "NLP")
+    for broken, fixed in _TITLE_ACRONYMS:
+        title = title.replace(broken, fixed)
 
     return title if title else "Unknown"
 
 
 # MAIN ANALYTICS ENGINE
 
-def compute_analytics(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+SCORE_BUCKETS = ["90-100", "80-89", "70-79", "60-69", "50-59", "0-49"]
+
+
+def _score_bucket(score: float) -> str:
+    if score >= 90: return "90-100"
+    elif score >= 80: return "80-89"
+    elif score >= 70: return "70-79"
+    elif score >= 60: return "60-69"
+    elif score >= 50: return "50-59"
+    return "0-49"
+
+
+@lru_cache(maxsize=4)
+def _skill_canonicalizer(standardizer: Any):
+    # Memoized skill -> counted name (or None for noise), equivalent to
+    # standardizer.standardize([skill]) followed by the SKILL_NOISE filter.
+    alias_map = getattr(standardizer, "alias_map", None) if standardizer else None
+
+    @lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+    def canonical(skill: str) -> Optional[str]:
+        clean = skill.lower().strip()
+        if alias_map is not None:
+            clean = alias_map.get(clean, clean).lower().strip()
+        if clean and clean not in SKILL_NOISE and len(clean) > 1:
+            return clean
+        return None
+
+    return canonical
+
+
+class AnalyticsAccumulator:
+
+    # Full (untruncated) counters for one search, filled in a single pass over the jobs.
+    # Jobs can be added or removed, and the state round-trips through to_dict() / from_dict()
+    # for the search_analytics table.
+
+    _COUNTERS = ("skills", "locations", "companies", "roles", "scores", "portals", "work_modes")
+
+    def __init__(self):
+        self.total_jobs = 0
+        self.total_score = 0.0
+        for name in self._COUNTERS:
+            setattr(self, name, Counter())
+
+    def _apply(self, jobs: List[Dict[str, Any]], sign: int):
+        from ml.utils.skill_standardizer import standardizer
+
+        canonical_skill = _skill_canonicalizer(standardizer)
+        skills_c, locations_c, companies_c, roles_c = self.skills, self.locations, self.companies, self.roles
+        scores_c, portals_c, work_modes_c = self.scores, self.portals, self.work_modes
+
+        for job in jobs:
+            skills = job.get("skills") or []
+            if isinstance(skills, str):
+                skills = json.loads(skills)
+            # None / empty entries are skipped, as standardize() does
+            skills = [skill for skill in skills if skill]
+            if standardizer:
+                # standardize() de-duplicates per job and returns the names sorted
+                names = sorted({name for name in map(canonical_skill, skills) if name})
+            else:
+                names = [name for name in map(canonical_skill, skills) if name]
+            for name in names:
+                skills_c[name] += sign
+
+            location = job.get("location", "")
+            for city in normalize_locations(location):
+                locations_c[city] += sign
+
+            company = (job.get("company") or "").strip()
+            if company and company != "N/A":
+                companies_c[company] += sign
+
+            title = job.get("title", "")
+            role = normalize_title(title)
+            if role != "Unknown":
+                roles_c[role] += sign
+
+            score = job.get("match_score", 0) or 0
+            scores_c[_score_bucket(score)] += sign
+            portals_c[job.get("portal", "unknown")] += sign
+
+            text = ((location or "") + " " + (title or "") + " " + (job.get("description") or "")[:500]).lower()
+            work_modes_c["Remote" if "remote" in text else "Hybrid" if "hybrid" in text else "On-site"] += sign
+
+            self.total_jobs += sign
+            self.total_score += sign * score
+
+        if sign < 0:
+            # Drop keys whose last job was removed
+            for name in self._COUNTERS:
+                counter = getattr(self, name)
+                for key in [key for key, count in counter.items() if count <= 0]:
+                    del counter[key]
+
+    def add(self, jobs: List[Dict[str, Any]]) -> "AnalyticsAccumulator":
+        self._apply(jobs, 1)
+        return self
+
+    def remove(self, jobs: List[Dict[str, Any]]) -> "AnalyticsAccumulator":
+        self._apply(jobs, -1)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        state = {"total_jobs": self.total_jobs, "total_score": self.total_score}
+        state.update({name: dict(getattr(self, name)) for name in self._COUNTERS})
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "AnalyticsAccumulator":
+        acc = cls()
+        acc.total_jobs = state.get("total_jobs", 0)
+        acc.total_score = state.get("total_score", 0.0)
+        for name in cls._COUNTERS:
+            setattr(acc, name, Counter(state.get(name, {})))
+        return acc
+
+    def to_response(self) -> Dict[str, Any]:
+        # Chart-ready JSON served by /jobs/analytics.
+        if self.total_jobs <= 0:
+            return {
+                "total_jobs": 0,
+                "top_skills": [],
+                "top_locations": [],
+                "top_companies": [],
+                "top_roles": [],
+                "score_distribution": [],
+                "portal_breakdown": [],
+            }
 
-    if not jobs:
         return {
-            "total_jobs": 0,
-            "top_skills": [],
-            "top_locations": [],
-            "top_companies": [],
-            "top_roles": [],
-            "score_distribution": [],
-            "portal_breakdown": [],
+            "total_jobs": self.total_jobs,
+            "avg_match_score": round(self.total_score / self.total_jobs, 1),
+            "work_mode_distribution": [
+                {"name": k, "count": v} for k, v in self.work_modes.items() if v > 0
+            ],
+            "top_skills": [
+                {"name": name, "count": count}
+                for name, count in self.skills.most_common(20)
+            ],
+            "top_locations": [
+                {"name": name, "count": count}
+                for name, count in self.locations.most_common(15)
+            ],
+            "top_companies": [
+                {"name": name, "count": count}
+                for name, count in self.companies.most_common(15)
+            ],
+            "top_roles": [
+                {"name": name, "count": count}
+                for name, count in self.roles.most_common(10)
+            ],
+            "score_distribution": [
+                {"range": bucket, "count": self.scores.get(bucket, 0)}
+                for bucket in SCORE_BUCKETS
+            ],
+            "portal_breakdown": [
+                {"name": name, "count": count}
+                for name, count in self.portals.most_common()
+            ],
         }
 
-    #  Skill Aggregation (with standardization) 
-    from ml.utils.skill_standardizer import standardizer
-
-    skill_counter = Counter()
-    for job in jobs:
-        skills = job.get("skills", [])
-        if isinstance(skills, str):
-            skills = json.loads(skills)
-        if standardizer:
-            skills = standardizer.standardize(skills)
-        for skill in skills:
-            clean = skill.lower().strip()
-            if clean and clean not in SKILL_NOISE and len(clean) > 1:
-                skill_counter[clean] += 1
-
-    # Location Aggregation 
-    location_counter = Counter()
-    for job in jobs:
-        raw_loc = job.get("location", "")
-        cities = normalize_locations(raw_loc)
-        for city in cities:
-            location_counter[city] += 1
-
-    # Company Aggregation 
-    company_counter = Counter()
-    for job in jobs:
-        company = job.get("company", "").strip()
-        if company and company != "N/A":
-            company_counter[company] += 1
-
-    # Role/Title Aggregation 
-    role_counter = Counter()
-    for job in jobs:
-        raw_title = job.get("title", "")
-        normalized = normalize_title(raw_title)
-        if normalized and normalized != "Unknown":
-            role_counter[normalized] += 1
-
-    # Score Distribution 
-    score_buckets = {
-        "90-100": 0, "80-89": 0, "70-79": 0,
-        "60-69": 0, "50-59": 0, "0-49": 0,
-    }
-    for job in jobs:
-        score = job.get("match_score", 0)
-        if score >= 90: score_buckets["90-100"] += 1
-        elif score >= 80: score_buckets["80-89"] += 1
-        elif score >= 70: score_buckets["70-79"] += 1
-        elif score >= 60: score_buckets["60-69"] += 1
-        elif score >= 50: score_buckets["50-59"] += 1
-        else: score_buckets["0-49"] += 1
-
-    # Portal Breakdown
-    portal_counter = Counter()
-    for job in jobs:
-        portal = job.get("portal", "unknown")
-        portal_counter[portal] += 1
-
-    # Statistics 
-    total_score = sum(job.get("match_score", 0) for job in jobs)
-    avg_match_score = round(total_score / len(jobs), 1) if jobs else 0
-
-    # Work Mode Aggregation 
-    work_mode_counter = Counter()
-    for job in jobs:
-        text = (job.get("location", "") + " " + job.get("title", "") + " " + job.get("description", "")[:500]).lower()
-        if "remote" in text:
-            work_mode_counter["Remote"] += 1
-        elif "hybrid" in text:
-            work_mode_counter["Hybrid"] += 1
-        else:
-            work_mode_counter["On-site"] += 1
-
-    # Build Response
-    return {
-        "total_jobs": len(jobs),
-        "avg_match_score": avg_match_score,
-        "work_mode_distribution": [
-            {"name": k, "count": v} for k, v in work_mode_counter.items() if v > 0
-        ],
-        "top_skills": [
-            {"name": name, "count": count}
-            for name, count in skill_counter.most_common(20)
-        ],
-        "top_locations": [
-            {"name": name, "count": count}
-            for name, count in location_counter.most_common(15)
-        ],
-        "top_companies": [
-            {"name": name, "count": count}
-            for name, count in company_counter.most_common(15)
-        ],
-        "top_roles": [
-            {"name": name, "count": count}
-            for name, count in role_counter.most_common(10)
-        ],
-        "score_distribution": [
-            {"range": bucket, "count": count}
-            for bucket, count in score_buckets.items()
-        ],
-        "portal_breakdown": [
-            {"name": name, "count": count}
-            for name, count in portal_counter.most_common()
-        ],
-    }
+
+def compute_analytics(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return AnalyticsAccumulator().add(jobs).to_response()
+
+
+# MATERIALIZED ANALYTICS (search_analytics table)
+
+def materialize_search_analytics(search_id: str, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Compute once (when the search completes) and store counters + response.
+    from app.db.crud import save_search_analytics
+
+    acc = AnalyticsAccumulator().add(jobs)
+    response = acc.to_response()
+    save_search_analytics(search_id, acc.to_dict(), response)
+    return response
+
+
+def update_search_analytics(
+    search_id: str,
+    added: Optional[List[Dict[str, Any]]] = None,
+    removed: Optional[List[Dict[str, Any]]] = None,
+) -> Optional[Dict[str, Any]]:
+    # Apply job additions / deletions to the stored counters (no-op if never materialized).
+    from app.db.crud import modify_search_analytics
+
+    def apply(state: Dict[str, Any]):
+        acc = AnalyticsAccumulator.from_dict(state).add(added or []).remove(removed or [])
+        return acc.to_dict(), acc.to_response()
+
+    return modify_search_analytics(search_id, apply)
+
+
+def get_materialized_analytics(search_id: str) -> Optional[Dict[str, Any]]:
+    from app.db.crud import get_search_analytics
+    return get_search_analytics(search_id)
 
 
 def get_analytics_from_file(file_path: str) -> Dict[str, Any]:
@@ -305,6 +402,8 @@ def get_analytics_from_db(search_id: str) -> Dict[str, Any]:
     try:
         from app.db.crud import get_jobs_by_search
         jobs = get_jobs_by_search(search_id)
+        if jobs:
+            return materialize_search_analytics(search_id, jobs)  # Stored for next time
         return compute_analytics(jobs)
     except Exception as e:
         logger.error(f"Failed to compute analytics from DB: {e}")
@@ -0,0 +1,236 @@
+# Cross-portal Deduplication — collapse the same posting scraped from several portals.
+
+# 1. Key: normalize_title(title) + company with legal suffixes / punctuation dropped.
+# 2. Description signature: the set of word 2-shingles (hashed), plus a 64-value MinHash of it.
+#    Near-duplicates are found through 16 x 4-row LSH bands (pairs at Jaccard 0.8 collide
+#    in some band with probability > 0.999) and confirmed on the exact shingle Jaccard.
+# 3. Duplicate = same company, no conflicting cities, AND
+#      - descriptions with Jaccard >= DEDUP_JACCARD_THRESHOLD, or
+#      - same title key and Jaccard >= TITLE_MATCH_MIN_JACCARD, or
+#      - same title key, no comparable description, and either the same link or a
+#        different portal with the same known city.
+# 4. Duplicates are merged into the first copy seen ("sources" keeps every portal's link)
+#    and never reach NER / the encoder. Optionally, embedding proximity
+#    (DEDUP_EMBEDDING_THRESHOLD) catches the rest after encoding.
+
+
+import re
+import hashlib
+import logging
+import numpy as np
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.analytics_service import normalize_title, normalize_locations
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+_COMPANY_NOISE = {
+    "pvt", "private", "ltd", "limited", "inc", "llc", "llp", "corp", "corporation",
+    "co", "company", "plc", "gmbh", "india", "the",
+}
+_WILDCARD_LOCATIONS = {"Unknown", "India (Remote/Pan-India)"}
+
+SHINGLE_SIZE = 2
+MIN_DESCRIPTION_WORDS = 20    # Shorter descriptions are too generic to fingerprint
+TITLE_MATCH_MIN_JACCARD = 0.5  # Same title + company: descriptions only need to broadly agree
+
+MINHASH_PERMUTATIONS = 64
+MINHASH_BAND_ROWS = 4         # 16 bands of 4 rows
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(0x5EED)
+_MINHASH_A = _rng.integers(1, _MERSENNE_PRIME, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_MINHASH_B = _rng.integers(0, _MERSENNE_PRIME, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_HASH_MASK = np.uint64(0xFFFFFFFF)
+
+
+def normalize_company(raw_company: str) -> str:
+    # "Accenture Solutions Pvt. Ltd." -> "accenture solutions", "N/A" -> ""
+    if not raw_company or raw_company == "N/A":
+        return ""
+    words = _WORD_RE.findall(raw_company.lower())
+    return " ".join(w for w in words if w not in _COMPANY_NOISE)
+
+
+def shingle_hashes(text: str) -> Optional[np.ndarray]:
+    # Sorted unique 32-bit hashes of the description's word shingles (None if too short).
+    words = _WORD_RE.findall((text or "").lower())
+    if len(words) < MIN_DESCRIPTION_WORDS:
+        return None
+    shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.unique(np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles],
+        dtype=np.uint64,
+    ))
+
+
+def minhash(hashes: np.ndarray) -> np.ndarray:
+    # MINHASH_PERMUTATIONS-value signature. (a * h + b) wraps modulo 2**64 on purpose;
+    # with full-width a / b the permutations are close enough to min-wise independent.
+    permuted = ((hashes[None, :] * _MINHASH_A[:, None] + _MINHASH_B[:, None]) % _MERSENNE_PRIME) & _HASH_MASK
+    return permuted.min(axis=1)
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    shared = np.intersect1d(a, b, assume_unique=True).size
+    return shared / (a.size + b.size - shared)
+
+
+def _bands(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    rows = MINHASH_BAND_ROWS
+    return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(len(signature) // rows)]
+
+
+class _Entry:
+    __slots__ = ("job", "title_key", "company_key", "shingles", "signature", "cities", "vector")
+
+    def __init__(self, job, title_key, company_key, shingles, cities):
+        self.job = job
+        self.title_key = title_key
+        self.company_key = company_key
+        self.shingles = shingles
+        self.signature = minhash(shingles) if shingles is not None else None
+        self.cities = cities
+        self.vector: Optional[np.ndarray] = None
+
+
+def _cities_conflict(a: _Entry, b: _Entry) -> bool:
+    # Same role, different offices
+    return bool(a.cities and b.cities and not (a.cities & b.cities))
+
+
+def _portals(job: Dict[str, Any]) -> Set[str]:
+    return {source.get("portal") for source in JobDeduplicator._sources(job)}
+
+
+def _links(job: Dict[str, Any]) -> Set[str]:
+    return {source.get("link") for source in JobDeduplicator._sources(job) if source.get("link")}
+
+
+class JobDeduplicator:
+
+    # Index of the distinct jobs of one search. Not thread-safe: the caller serializes add().
+
+    def __init__(
+        self,
+        jaccard_threshold: float = settings.DEDUP_JACCARD_THRESHOLD,
+        embedding_threshold: float = settings.DEDUP_EMBEDDING_THRESHOLD,
+    ):
+        self.jaccard_threshold = jaccard_threshold
+        self.embedding_threshold = embedding_threshold
+        self._by_key: Dict[Tuple[str, str], List[_Entry]] = defaultdict(list)
+        self._by_band: Dict[Tuple[int, bytes], List[_Entry]] = defaultdict(list)
+        self._by_company: Dict[str, List[_Entry]] = defaultdict(list)
+        self._entries: Dict[int, _Entry] = {}  # id(job) -> entry
+        self.merged = 0
+
+    def fingerprint(self, job: Dict[str, Any]) -> _Entry:
+        # The expensive part (shingles + MinHash); safe to compute outside the caller's lock.
+        return _Entry(
+            job,
+            normalize_title(job.get("title", "")).lower(),
+            normalize_company(job.get("company", "")),
+            shingle_hashes(job.get("description", "")),
+            set(normalize_locations(job.get("location", ""))) - _WILDCARD_LOCATIONS,
+        )
+
+    def _same_posting(self, a: _Entry, b: _Entry, same_title: bool) -> bool:
+        if _cities_conflict(a, b):
+            return False
+        if a.shingles is not None and b.shingles is not None:
+            similarity = jaccard(a.shingles, b.shingles)
+            return similarity >= (min(TITLE_MATCH_MIN_JACCARD, self.jaccard_threshold) if same_title else self.jaccard_threshold)
+        if not same_title:
+            return False
+        # No comparable description: only the link, or the same office on another portal, can tell
+        if _links(a.job) & _links(b.job):
+            return True
+        return bool(a.cities & b.cities) and not (_portals(a.job) & _portals(b.job))
+
+    def _find(self, entry: _Entry) -> Optional[_Entry]:
+        for other in self._by_key.get((entry.title_key, entry.company_key), ()):
+            if self._same_posting(entry, other, same_title=True):
+                return other
+        if entry.signature is not None:
+            seen = set()
+            for band in _bands(entry.signature):
+                for other in self._by_band.get(band, ()):
+                    if id(other) in seen or other.company_key != entry.company_key:
+                        continue
+                    seen.add(id(other))
+                    if self._same_posting(entry, other, same_title=False):
+                        return other
+        return None
+
+    @staticmethod
+    def _sources(job: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return job.get("sources") or [{"portal": job.get("portal"), "link": job.get("link")}]
+
+    def _merge(self, kept: Dict[str, Any], duplicate: Dict[str, Any]):
+        # Keep the first copy; remember every portal / link the posting was seen on
+        sources = kept.setdefault("sources", self._sources(kept))
+        for source in self._sources(duplicate):
+            if source not in sources:
+                sources.append(source)
+        self.merged += 1
+
+    def add(self, entry: _Entry) -> Optional[Dict[str, Any]]:
+        # Index a fingerprinted job. Returns the kept job it was merged into, or None if it's new.
+        if not entry.company_key or entry.title_key == "unknown":
+            return None  # Not enough identity to compare; keep it
+
+        match = self._find(entry)
+        if match is not None:
+            self._merge(match.job, entry.job)
+            return match.job
+
+        self._by_key[(entry.title_key, entry.company_key)].append(entry)
+        self._by_company[entry.company_key].append(entry)
+        if entry.signature is not None:
+            for band in _bands(entry.signature):
+                self._by_band[band].append(entry)
+        self._entries[id(entry.job)] = entry
+        return None
+
+    def merge_by_embedding(self, jobs: List[Dict[str, Any]], global_vectors: np.ndarray) -> np.ndarray:
+
+        # Second pass after encoding: a job whose global vector is within the cosine threshold
+        # of a kept job from the same company is merged into it. Returns the keep mask.
+
+        keep = np.ones(len(jobs), dtype=bool)
+        if self.embedding_threshold <= 0 or not len(jobs):
+            return keep
+
+        norms = np.linalg.norm(global_vectors, axis=1, keepdims=True)
+        units = global_vectors / np.where(norms == 0, 1, norms)
+
+        for i, job in enumerate(jobs):
+            entry = self._entries.get(id(job))
+            if entry is None:
+                continue
+            for other in self._by_company.get(entry.company_key, ()):
+                if other is entry or other.vector is None:
+                    continue
+                if _cities_conflict(entry, other):
+                    continue
+                if float(units[i] @ other.vector) >= self.embedding_threshold:
+                    self._merge(other.job, job)
+                    self._forget(entry)
+                    keep[i] = False
+                    break
+            else:
+                entry.vector = units[i]
+        return keep
+
+    def _forget(self, entry: _Entry):
+        self._entries.pop(id(entry.job), None)
+        for index, key in (
+            (self._by_key, (entry.title_key, entry.company_key)),
+            (self._by_company, entry.company_key),
+        ):
+            index[key].remove(entry)
+        if entry.signature is not None:
+            for band in _bands(entry.signature):
+                self._by_band[band].remove(entry)
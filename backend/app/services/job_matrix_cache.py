@@ -0,0 +1,183 @@
+# Job Matrix Cache — per-search columnar view of the stored jobs, kept in memory.
+
+# 1. One SearchMatrix per search_id: job ids, bi-encoder match scores, the normalized float32
+#    [global | skill] matrix and interned skill lists (plus titles / companies for display).
+#    total_jobs also counts the search's jobs stored without vectors (they have no row).
+# 2. LRU over JOB_MATRIX_CACHE_SIZE searches. Filled by run_scraper_engine from the
+#    in-memory results (no read-back), otherwise loaded from SQLite on the first miss.
+# 3. Entries are read-only and shared between requests; deleting a search / profile / job
+#    invalidates them (the DB stays the source of truth).
+
+
+import sys
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+class SearchMatrix:
+
+    # Row i of every column describes the same job (ordered by job id).
+
+    __slots__ = ("search_id", "ids", "titles", "companies", "skills", "match_scores", "job_matrix", "total_jobs", "_rows")
+
+    def __init__(
+        self,
+        search_id: str,
+        ids: Iterable[int],
+        titles: List[str],
+        companies: List[str],
+        skills: List[List[str]],
+        match_scores: Iterable[float],
+        global_vectors: np.ndarray,
+        skill_vectors: np.ndarray,
+        total_jobs: Optional[int] = None,
+    ):
+        from app.services.vector_service import build_job_matrix
+
+        self.search_id = search_id
+        self.ids = _readonly(np.asarray(list(ids), dtype=np.int64))
+        self.titles = titles
+        self.companies = companies
+        # Skill names repeat across postings; intern them so each string is stored once
+        self.skills = [tuple(sys.intern(s) for s in job_skills) for job_skills in skills]
+        self.match_scores = _readonly(np.asarray(match_scores, dtype=np.float64))
+        self.job_matrix = _readonly(build_job_matrix(global_vectors, skill_vectors).astype(np.float32, copy=False))
+        self.total_jobs = len(self.ids) if total_jobs is None else int(total_jobs)
+        self._rows: Optional[Dict[int, int]] = None
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+    @property
+    def global_vectors(self) -> np.ndarray:
+        return self.job_matrix[:, : self.job_matrix.shape[1] // 2]
+
+    @property
+    def skill_vectors(self) -> np.ndarray:
+        return self.job_matrix[:, self.job_matrix.shape[1] // 2:]
+
+    def row_of(self, job_id: int) -> Optional[int]:
+        # Row index of a job id (None if the job has no stored vectors).
+        if self._rows is None:
+            self._rows = {int(job_id): i for i, job_id in enumerate(self.ids.tolist())}
+        return self._rows.get(int(job_id))
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.match_scores.nbytes + self.job_matrix.nbytes
+
+
+def load_search_matrix_from_db(search_id: str) -> SearchMatrix:
+    from app.db.crud import get_search_job_matrix
+
+    data = get_search_job_matrix(search_id)
+    return SearchMatrix(search_id, **data)
+
+
+def build_search_matrix(
+    search_id: str,
+    job_ids: List[int],
+    jobs: List[Dict[str, Any]],
+    job_vectors: List[Dict[str, Any]],
+) -> SearchMatrix:
+
+    # Same view as load_search_matrix_from_db, built from the rows just saved by the engine.
+    # Jobs without vectors are left out, exactly as the vec_jobs JOIN would.
+
+    from app.services.vector_service import stack_vectors
+
+    # save_jobs_batch assigns ascending ids in input order, so rows are already id-ordered
+    rows = [
+        (job_id, job, vecs)
+        for job_id, job, vecs in zip(job_ids, jobs, job_vectors or [])
+        if vecs.get("global_vector") is not None and vecs.get("skill_vector") is not None
+    ]
+
+    return SearchMatrix(
+        search_id,
+        ids=[job_id for job_id, _, _ in rows],
+        titles=[job.get("title") for _, job, _ in rows],
+        companies=[job.get("company") for _, job, _ in rows],
+        skills=[job.get("skills") or [] for _, job, _ in rows],
+        match_scores=[job.get("bi_encoder_score", job.get("match_score")) or 0 for _, job, _ in rows],
+        global_vectors=stack_vectors([vecs["global_vector"] for _, _, vecs in rows]),
+        skill_vectors=stack_vectors([vecs["skill_vector"] for _, _, vecs in rows]),
+        total_jobs=len(jobs),
+    )
+
+
+class JobMatrixCache:
+
+    # Thread-safe LRU of SearchMatrix views keyed by search_id.
+
+    def __init__(self, max_items: int = settings.JOB_MATRIX_CACHE_SIZE):
+        self.max_items = max_items
+        self._entries: "OrderedDict[str, SearchMatrix]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped by invalidate(); a load that raced with it is not stored
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, search_id: str) -> SearchMatrix:
+        # Cached view of a search, loaded from SQLite on a miss.
+        with self._lock:
+            entry = self._entries.get(search_id)
+            if entry is not None:
+                self._entries.move_to_end(search_id)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            generation = self._generation
+
+        # Load outside the lock so other searches aren't blocked on this one's DB read
+        entry = load_search_matrix_from_db(search_id)
+        with self._lock:
+            if generation == self._generation:
+                self._store(search_id, entry)
+        return entry
+
+    def put(self, entry: SearchMatrix):
+        with self._lock:
+            self._store(entry.search_id, entry)
+
+    def _store(self, search_id: str, entry: SearchMatrix):
+        # Caller must hold the lock.
+        if self.max_items <= 0:
+            return
+        self._entries[search_id] = entry
+        self._entries.move_to_end(search_id)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *search_ids: str):
+        with self._lock:
+            self._generation += 1
+            for search_id in search_ids:
+                self._entries.pop(search_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "searches": len(self._entries),
+                "max_searches": self.max_items,
+                "bytes": sum(entry.nbytes for entry in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+job_matrix_cache = JobMatrixCache()
@@ -2,54 +2,101 @@
 # Job Skill Extraction Service.
 
 # Enriches scraped job data with extracted skills.
+# Modes: "ner" (spaCy model + dictionary layer) or "fast" (dictionary-only token trie).
 
 
+import time
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from ml.ner.inference import resume_parser
+from ml.ner.dictionary_matcher import dictionary_matcher
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-def extract_skills_from_job(job: Dict[str, Any]) -> Dict[str, Any]:
+def _needs_extraction(job: Dict[str, Any]) -> bool:
+    # Tag the skill source for jobs that don't need NER; True if the job does.
+    if job.get("skills", []):
+        # If the scraper already provided skills, trust them but standardize
+        job["skills_source"] = "scraper"
+        return False
 
-    existing_skills = job.get("skills", [])
+    description = job.get("description", "")
+    if not description or description == "N/A":
+        job["skills_source"] = "none"
+        return False
+
+    return True
+
+
+def _standardize_job_skills(job: Dict[str, Any]) -> Dict[str, Any]:
+    # Standardize skills (Critical for vector matching)
+    from ml.utils.skill_standardizer import standardizer
+    if standardizer and job.get("skills"):
+        job["skills"] = standardizer.standardize(job["skills"])
+    return job
 
-    # If the scraper already provided skills, trust them but standardize
-    if existing_skills:
-        job["skills_source"] = "scraper"
-    else:
-        # Otherwise, extract from the job description
-        description = job.get("description", "")
-        if not description or description == "N/A":
-            job["skills_source"] = "none"
-            return job
 
+def extract_skills_from_job(job: Dict[str, Any]) -> Dict[str, Any]:
+
+    if _needs_extraction(job):
+        # Otherwise, extract from the job description
         try:
-            result = resume_parser.extract_skills(description)
+            result = resume_parser.extract_skills(job["description"])
             job["skills"] = result.get("skills", [])
             job["skills_source"] = "ml_extracted"
         except Exception as e:
             logger.warning(f"Skill extraction failed for '{job.get('title', 'Unknown')}': {e}")
             job["skills_source"] = "error"
 
-    # Standardize skills (Critical for vector matching)
-    from ml.utils.skill_standardizer import standardizer
-    if standardizer and job.get("skills"):
-        job["skills"] = standardizer.standardize(job["skills"])
+    return _standardize_job_skills(job)
 
-    return job
 
+def enrich_job_listings(
+    jobs: List[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    n_process: Optional[int] = None,
+    mode: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+
+    # All descriptions that need extraction go through one batched call
+    # (nlp.pipe for "ner", the compiled dictionary matcher for "fast").
+    mode = (mode or settings.JOB_SKILL_EXTRACTION_MODE).lower()
+    logger.info(f"Enriching {len(jobs)} jobs with skill extraction (mode={mode})...")
+    start = time.perf_counter()
 
-def enrich_job_listings(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    pending = [job for job in jobs if _needs_extraction(job)]
 
-    logger.info(f"Enriching {len(jobs)} jobs with skill extraction...")
+    if pending:
+        descriptions = [job["description"] for job in pending]
+        try:
+            if mode == "fast":
+                extracted = dictionary_matcher.match_batch(descriptions)
+                source = "dictionary"
+            else:
+                extracted = resume_parser.extract_skills_batch(
+                    descriptions,
+                    batch_size=batch_size or settings.NER_BATCH_SIZE,
+                    n_process=n_process or settings.NER_N_PROCESS,
+                )
+                source = "ml_extracted"
+            for job, skills in zip(pending, extracted):
+                job["skills"] = skills
+                job["skills_source"] = source
+        except Exception as e:
+            logger.warning(f"Batch skill extraction failed for {len(pending)} jobs: {e}")
+            for job in pending:
+                job["skills_source"] = "error"
 
-    for i, job in enumerate(jobs):
-        jobs[i] = extract_skills_from_job(job)
+    for job in jobs:
+        _standardize_job_skills(job)
 
-    extracted_count = sum(1 for j in jobs if j.get("skills_source") == "ml_extracted")
+    extracted_count = sum(1 for j in jobs if j.get("skills_source") in ("ml_extracted", "dictionary"))
     scraper_count = sum(1 for j in jobs if j.get("skills_source") == "scraper")
-    logger.info(f"Enrichment complete: {scraper_count} from scraper, {extracted_count} from ML.")
+    logger.info(
+        f"Enrichment complete: {scraper_count} from scraper, {extracted_count} from ML "
+        f"({time.perf_counter() - start:.2f}s)."
+    )
 
     return jobs
@@ -0,0 +1,86 @@
+# Re-ranking Service — cross-encoder precision pass over the head of a search's ranking.
+
+# 1. Only the bi-encoder top-k jobs (RERANK_TOP_K) are re-scored, as (JD, resume) pairs
+#    sent through cross_encoder_engine.predict in batches of RERANK_BATCH_SIZE
+#    (long JDs can be scored per token window, see RERANK_MAX_CHUNKS).
+# 2. match_score becomes a blend of both scores (RERANK_WEIGHT = cross-encoder share).
+#    The bi-encoder score is kept as bi_encoder_score; what-if deltas are measured against it.
+# 3. RERANK_BUDGET_SECONDS bounds the stage: a batch is only started if the previous one
+#    suggests it will finish in time, so the pass is truncated (or skipped) instead of
+#    holding the search back.
+
+
+import time
+import logging
+from typing import Any, Dict, List
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-job keys written by this stage (they describe one ranking, never reused across searches)
+RERANK_SCORE_KEYS = ("bi_encoder_score", "cross_encoder_score")
+
+
+def _job_text(job: Dict[str, Any]) -> str:
+    return f"{job.get('title', '')}\n{job.get('description', '')}"
+
+
+def rerank_top_jobs(
+    jobs: List[Dict[str, Any]],
+    resume_text: str,
+    top_k: int = settings.RERANK_TOP_K,
+    batch_size: int = settings.RERANK_BATCH_SIZE,
+    budget_seconds: float = settings.RERANK_BUDGET_SECONDS,
+    weight: float = settings.RERANK_WEIGHT,
+) -> Dict[str, Any]:
+
+    # Blend cross-encoder scores into the match_score of the top_k jobs, in place.
+    # The list order is left alone; callers re-sort. Returns stats for the task log.
+
+    stats: Dict[str, Any] = {"status": "skipped", "candidates": 0, "reranked": 0, "seconds": 0.0}
+    if top_k <= 0 or budget_seconds <= 0 or not resume_text or not jobs:
+        return stats
+
+    from ml.embeddings.vectorizer import cross_encoder_engine
+
+    start = time.perf_counter()
+    deadline = start + budget_seconds
+
+    # A cold model load is paid out of the budget too
+    cross_encoder_engine.load_model()
+    if cross_encoder_engine.model is None:
+        stats["status"] = "unavailable"  # predict() would return zeros; keep the bi-encoder ranking
+        return stats
+
+    head = sorted(jobs, key=lambda job: job.get("match_score", 0), reverse=True)[:top_k]
+    stats["candidates"] = len(head)
+    batch_size = max(1, batch_size)
+
+    last_batch_seconds = 0.0
+    for i in range(0, len(head), batch_size):
+        batch_start = time.perf_counter()
+        if batch_start + last_batch_seconds > deadline:
+            break
+
+        batch = head[i:i + batch_size]
+        scores = cross_encoder_engine.predict(
+            [(_job_text(job), resume_text) for job in batch], max_chunks=settings.RERANK_MAX_CHUNKS
+        )
+        last_batch_seconds = time.perf_counter() - batch_start
+
+        for job, score in zip(batch, scores):
+            bi_score = float(job.get("match_score", 0))
+            job["bi_encoder_score"] = bi_score
+            job["cross_encoder_score"] = round(float(score), 1)
+            job["match_score"] = round((1 - weight) * bi_score + weight * float(score), 1)
+        stats["reranked"] += len(batch)
+
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    if stats["reranked"] == len(head):
+        stats["status"] = "completed"
+    elif stats["reranked"]:
+        stats["status"] = "truncated"
+    else:
+        stats["status"] = "budget_exhausted"
+    return stats
@@ -0,0 +1,104 @@
+# Retrieval Service — cross-search job retrieval over the sqlite-vec index.
+
+# 1. KNN candidates from vec_jobs on both skill_vector and global_vector.
+# 2. Exact hybrid re-weighting (60% Skill + 40% Global) of the candidate pool.
+# 3. Supports "jobs for this profile" and "jobs similar to this job".
+
+
+import logging
+import numpy as np
+from typing import Dict, List, Any, Iterable
+
+from app.db.crud import get_profile, knn_jobs, get_job_vectors_by_ids, get_jobs_by_ids
+from app.services.vector_service import build_job_matrix, stack_vectors, score_job_matrix
+
+logger = logging.getLogger(__name__)
+
+KNN_OVERSAMPLE = 4  # Candidates fetched per column = k * KNN_OVERSAMPLE
+MAX_KNN_K = 4096    # sqlite-vec's upper bound for `k`
+
+
+def hybrid_knn(
+    query_vectors: Dict[str, Any],
+    k: int = 20,
+    exclude_ids: Iterable[int] = (),
+    exclude_links: Iterable[str] = (),
+) -> List[Dict[str, Any]]:
+
+    # Top-k jobs across all past searches for a (global, skill) query vector pair.
+    # Each vector column is queried with the KNN index, the union is re-scored with
+    # the hybrid weights, and duplicate postings (same link) are collapsed.
+
+    exclude = set(exclude_ids)
+    pool_size = min(MAX_KNN_K, k * KNN_OVERSAMPLE + len(exclude))
+
+    candidate_ids = set()
+    for column in ("skill_vector", "global_vector"):
+        for hit in knn_jobs(column, query_vectors[column], pool_size):
+            candidate_ids.add(hit["job_id"])
+    candidate_ids -= exclude
+
+    if not candidate_ids:
+        return []
+
+    vectors = get_job_vectors_by_ids(sorted(candidate_ids))
+    job_matrix = build_job_matrix(
+        stack_vectors([v["global_vector"] for v in vectors]),
+        stack_vectors([v["skill_vector"] for v in vectors]),
+    )
+    scores = score_job_matrix(query_vectors, job_matrix)
+    order = np.argsort(-scores, kind="stable")
+
+    ranked_ids = [vectors[i]["id"] for i in order]
+    score_by_id = {vectors[i]["id"]: float(scores[i]) for i in order}
+
+    # Only the head of the ranking can make the cut (duplicates aside)
+    jobs_by_id = {job["id"]: job for job in get_jobs_by_ids(ranked_ids[:pool_size])}
+
+    results = []
+    seen_links = set(exclude_links)
+    for job_id in ranked_ids[:pool_size]:
+        job = jobs_by_id.get(job_id)
+        if not job:
+            continue
+
+        # The same posting is stored once per search that found it
+        key = job.get("url") or f"{job.get('title')}@{job.get('company')}"
+        if key in seen_links:
+            continue
+        seen_links.add(key)
+
+        job["similarity_score"] = score_by_id[job_id]
+        results.append(job)
+        if len(results) >= k:
+            break
+
+    return results
+
+
+def find_jobs_for_profile(profile_id: str, k: int = 20) -> List[Dict[str, Any]]:
+    # Best-matching jobs for a profile across every search ever run.
+    profile = get_profile(profile_id)
+    if not profile:
+        raise ValueError("Profile not found")
+    if profile.get("global_vector") is None or profile.get("skill_vector") is None:
+        raise ValueError("Profile has no vectors. Call /profile/embed first.")
+
+    logger.info(f"KNN retrieval for profile {profile_id} (k={k})")
+    return hybrid_knn(
+        {"global_vector": profile["global_vector"], "skill_vector": profile["skill_vector"]},
+        k=k,
+    )
+
+
+def find_similar_jobs(job_id: int, k: int = 20) -> List[Dict[str, Any]]:
+    # Jobs most similar to a stored job, using its own vectors as the query.
+    vectors = get_job_vectors_by_ids([job_id])
+    if not vectors:
+        raise ValueError("Job vectors not found")
+
+    source = get_jobs_by_ids([job_id])
+    source_links = [source[0]["url"]] if source and source[0].get("url") else []
+
+    logger.info(f"KNN retrieval for jobs similar to {job_id} (k={k})")
+    return hybrid_knn(vectors[0], k=k, exclude_ids=[job_id], exclude_links=source_links)
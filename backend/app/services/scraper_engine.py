@@ -1,21 +1,146 @@
-
-import subprocess
 import os
 import json
-import uuid
-from typing import List, Dict, Optional, Any
-import time
+import numpy as np
+from typing import List, Dict, Optional, Any, Tuple
 import logging
-import threading
-from app.services.job_service import enrich_job_listings
+from app.services.stream_service import IncrementalScorer
+from app.services.scraper_runtime import SCRAPER_DIR, get_scraper_runtime
+from app.services.task_registry import task_registry
+from app.services.search_cache import make_cache_key, load_cached_results
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-task_registry = {}
+def _serp_option(serp_api_config: Optional[Any], key: str) -> Optional[Any]:
+    # SerpApiConfig model or plain dict
+    if serp_api_config is None:
+        return None
+    if hasattr(serp_api_config, key):
+        return getattr(serp_api_config, key)
+    if isinstance(serp_api_config, dict):
+        return serp_api_config.get(key)
+    return None
+
+
+def _portal_limits(portals: List[str], serp_api_config: Optional[Any]) -> Dict[str, int]:
+    # Jobs requested per portal (Google's comes from the SerpAPI config).
+    limits = {portal.lower(): 10 for portal in portals}
+    num_jobs = _serp_option(serp_api_config, "num_jobs")
+    if num_jobs:
+        limits["google"] = int(num_jobs)
+    return limits
+
+
+def _scrape_and_score(
+    task,
+    query: str,
+    location: str,
+    portals: List[str],
+    serp_api_config: Optional[Any],
+    user_vectors: Optional[Dict[str, Any]],
+    extraction_mode: Optional[str],
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any], List[Dict[str, Any]], bool]:
+
+    # Scrape every portal, streaming jobs through enrichment + scoring.
+    # Returns (jobs, scoring_metadata, job_vectors, all_portals_completed).
+
+    log = task.log
+    limits = _portal_limits(portals, serp_api_config)
+
+    # Jobs flow into enrichment + scoring as soon as a scraper yields them
+    scorer = IncrementalScorer(user_vectors, extraction_mode=extraction_mode).start()
+    task.stream = scorer
+
+    def on_job(portal: str, job: Dict[str, Any]):
+        task.record_job(portal, job)
+        scorer.submit(portal, job)
+
+    for portal in portals:
+        task.start_portal(portal.lower())
+
+    # Run all portals in-process on the shared scraper pool (blocks until done / timed out)
+    portal_results = get_scraper_runtime().run(
+        query,
+        location,
+        portals,
+        log=log,
+        limits=limits,
+        google_api_key=_serp_option(serp_api_config, "api_key"),
+        on_job=on_job,
+        on_portal_done=task.finish_portal,
+    )
+
+    for portal, result in portal_results.items():
+        if result["status"] != "completed":
+            log(f"{portal} finished with status {result['status']}")
+        log(f"Loaded {len(result['jobs'])} jobs from {portal}")
+    all_completed = len(portal_results) == len(portals) and all(
+        result["status"] == "completed" for result in portal_results.values()
+    )
+
+    # Wait for the last micro-batch, then collect the full ranking
+    scored = scorer.finalize()
+    aggregated_results = scored["jobs"]
+    if scorer.duplicates:
+        log(f"Merged {scorer.duplicates} duplicate postings found on more than one portal")
+    if scorer.first_result_seconds is not None:
+        log(f"First results were ready after {scorer.first_result_seconds}s")
+    if scorer.scoring_error:
+        log(f"Scoring error: {scorer.scoring_error}")
+    # Keep only counters + the top jobs for the rest of the task's life in the registry
+    task.stream = scorer.summary()
+
+    scoring_metadata = {}
+    job_vectors = []  # Store vectors for DB
+
+    if user_vectors is not None and not scorer.scoring_error:
+        # Extract vectors for DB and remove from object to keep JSON small
+        for job in aggregated_results:
+            g_vec = job.pop("jd_global_vector", None)
+            s_vec = job.pop("jd_skill_vector", None)
+            if g_vec is not None and s_vec is not None:
+                job_vectors.append({"global_vector": g_vec, "skill_vector": s_vec})
+            else:
+                job_vectors.append({})
+
+        scoring_metadata = {
+            "market_reach": scored.get("market_reach", 0),
+            "average_score": scored.get("average_score", 0),
+            "total_jobs": scored.get("total_jobs", len(aggregated_results)),
+            "high_match_jobs": scored.get("high_match_jobs", 0),
+        }
+        logger.info(f"Scoring complete: {scoring_metadata}")
+
+    return aggregated_results, scoring_metadata, job_vectors, all_completed
+
+
+def _rerank(
+    task,
+    jobs: List[Dict[str, Any]],
+    job_vectors: List[Dict[str, Any]],
+    profile_id: Optional[str],
+    scoring_metadata: Dict[str, Any],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+
+    # Cross-encoder pass over the top of the ranking; returns (jobs, job_vectors) re-sorted.
+    from app.db.crud import get_profile
+    from app.services.rerank_service import rerank_top_jobs
+    from app.services.vector_service import summarize_scores
 
-import sys
+    profile = get_profile(profile_id) if profile_id else None
+    resume_text = (profile or {}).get("raw_text")
+    if not resume_text:
+        return jobs, job_vectors
 
-SCRAPER_DIR = os.path.join(sys._MEIPASS, "scraper") if getattr(sys, 'frozen', False) else os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../scraper"))
+    stats = rerank_top_jobs(jobs, resume_text)
+    task.log(f"Re-ranking {stats['status']}: {stats['reranked']}/{stats['candidates']} top jobs in {stats['seconds']}s")
+    if not stats["reranked"]:
+        return jobs, job_vectors
+
+    scores = np.array([job.get("match_score", 0) for job in jobs], dtype=np.float64)
+    order = np.argsort(-scores, kind="stable")
+    scoring_metadata.update(summarize_scores(scores))
+    return [jobs[i] for i in order], [job_vectors[i] for i in order] if job_vectors else job_vectors
 
 
 def run_scraper_engine(
@@ -25,155 +150,50 @@ def run_scraper_engine(
     portals: List[str], 
     serp_api_config: Optional[Any] = None,
     user_vectors: Optional[Dict[str, List[float]]] = None,
-    profile_id: Optional[str] = None
+    profile_id: Optional[str] = None,
+    extraction_mode: Optional[str] = None,
+    use_cache: bool = True,
 ):
 
-    task_registry[task_id] = {"status": "processing", "results": [], "logs": []}
+    task = task_registry.get(task_id) or task_registry.create(task_id)
+    task.start()
+    log = task.log
     
     # Create results directory if it doesn't exist
     RESULTS_DIR = os.path.join(SCRAPER_DIR, "results")
     os.makedirs(RESULTS_DIR, exist_ok=True)
-    
-    processes = []
-    temp_files = {}
-
-    def stream_logs(pipe, logs_list):
-        """Read lines from a pipe and append to logs list."""
-        for line in iter(pipe.readline, b''):
-            decoded = line.decode('utf-8', errors='replace').strip()
-            if decoded:
-                logs_list.append(decoded)
-        pipe.close()
-
-    for portal in portals:
-        portal_map = {
-            "linkedin": "linkedin.py",
-            "indeed": "Indeed.py",
-            "glassdoor": "Glassdoor.py",
-            "naukri": "Naukri.py",
-            "google": "google_jobs.py"
-        }
-        
-        script_name = portal_map.get(portal.lower())
-        if not script_name:
-             task_registry[task_id]["logs"].append(f"Unknown portal: {portal}")
-             continue
-
-        script_path = os.path.join(SCRAPER_DIR, script_name)
-        
-        if not os.path.exists(script_path):
-             task_registry[task_id]["logs"].append(f"Script not found: {script_name}")
-             continue
-             
-        output_filename = f"{task_id}_{portal}_results.json"
-        output_path = os.path.join(RESULTS_DIR, output_filename)
-        temp_files[portal] = output_path
-
-        limit = "10"
-        
-        if portal == "google" and serp_api_config:
-            if hasattr(serp_api_config, "num_jobs"):
-                 limit = str(serp_api_config.num_jobs)
-            elif isinstance(serp_api_config, dict) and "num_jobs" in serp_api_config:
-                 limit = str(serp_api_config["num_jobs"])
-            
-        relative_output_path = os.path.join("results", output_filename)
-        cmd = ["python", script_path, query, location, limit, relative_output_path]
-        
-        env = os.environ.copy()
-        # Ensure outputs are flushed immediately and encoding is UTF-8 for Windows
-        env["PYTHONUNBUFFERED"] = "1"
-        env["PYTHONIOENCODING"] = "utf-8"
-        
-        if portal == "google" and serp_api_config:
-             api_key = None
-             if hasattr(serp_api_config, "api_key"):
-                 api_key = serp_api_config.api_key
-             elif isinstance(serp_api_config, dict) and "api_key" in serp_api_config:
-                 api_key = serp_api_config["api_key"]
-                 
-             if api_key:
-                env["SERP_API_KEY"] = api_key
 
+    cache_key = make_cache_key(query, location, portals, _portal_limits(portals, serp_api_config), extraction_mode)
+    cached = None
+    if use_cache:
         try:
-            # Redirect stdout/stderr to PIPE
-            p = subprocess.Popen(
-                cmd, 
-                env=env, 
-                cwd=SCRAPER_DIR, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.STDOUT
-            )
-            processes.append((portal, p))
-            
-            # Start a daemon thread to read output
-            t = threading.Thread(target=stream_logs, args=(p.stdout, task_registry[task_id]["logs"]))
-            t.daemon = True
-            t.start()
-            
+            cached = load_cached_results(cache_key, user_vectors)
         except Exception as e:
-             task_registry[task_id]["logs"].append(f"Failed to start {portal}: {str(e)}")
-
-    # Wait for all scrapers to finish
-    for portal, p in processes:
-        p.wait()
-        if p.returncode != 0:
-             task_registry[task_id]["logs"].append(f"{portal} finished with return code {p.returncode}")
+            logger.warning(f"Search cache lookup failed (scraping instead): {e}")
 
-    # Aggregate results from all scrapers
-    aggregated_results = []
-    
-    for portal, output_path in temp_files.items():
-        if os.path.exists(output_path):
-            try:
-                with open(output_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    count = len(data)
-                    task_registry[task_id]["logs"].append(f"Loaded {count} jobs from {portal}")
-                    for job in data:
-                        job["portal"] = portal
-                    aggregated_results.extend(data)
-                os.remove(output_path) 
-            except Exception as e:
-                task_registry[task_id]["logs"].append(f"Error reading results for {portal}: {str(e)}")
-        else:
-             task_registry[task_id]["logs"].append(f"No results file found for {portal}")
-
-    # Step 1: Enrich jobs with extracted skills
-    aggregated_results = enrich_job_listings(aggregated_results)
-
-    # Step 2: Score jobs against user profile 
-    scoring_metadata = {}
-    job_vectors = []  # Store vectors for DB
+    if cached is not None:
+        # Same query / location / portals scraped recently: reuse its jobs, only rescore
+        log(f"Reusing {len(cached['jobs'])} jobs from search {cached['source_search_id']} (cached)")
+        aggregated_results = cached["jobs"]
+        job_vectors = cached["job_vectors"]
+        scoring_metadata = {k: cached[k] for k in ("market_reach", "average_score", "total_jobs", "high_match_jobs") if k in cached}
+        # Only fresh scrapes are cache sources, so reuse can't extend a result set's lifetime
+        cache_key = None
+    else:
+        aggregated_results, scoring_metadata, job_vectors, all_completed = _scrape_and_score(
+            task, query, location, portals, serp_api_config, user_vectors, extraction_mode
+        )
+        if not all_completed:
+            cache_key = None  # Partial (timed out / failed) results are not worth reusing
 
-    if user_vectors:
+    if settings.RERANK_ENABLED and scoring_metadata:
         try:
-            from app.services.vector_service import score_jobs_against_user
-            # Keep vectors for DB extraction
-            scored = score_jobs_against_user(user_vectors, aggregated_results, keep_vectors=True)
-            aggregated_results = scored["jobs"]
-            
-            # Extract vectors for DB and remove from object to keep JSON small
-            for job in aggregated_results:
-                g_vec = job.pop("jd_global_vector", None)
-                s_vec = job.pop("jd_skill_vector", None)
-                if g_vec and s_vec:
-                    job_vectors.append({"global_vector": g_vec, "skill_vector": s_vec})
-                else:
-                    job_vectors.append({})
-            
-            scoring_metadata = {
-                "market_reach": scored["market_reach"],
-                "average_score": scored["average_score"],
-                "total_jobs": scored["total_jobs"],
-                "high_match_jobs": scored["high_match_jobs"],
-            }
-            logger.info(f"Scoring complete: {scoring_metadata}")
+            aggregated_results, job_vectors = _rerank(task, aggregated_results, job_vectors, profile_id, scoring_metadata)
         except Exception as e:
-            logger.error(f"Scoring failed (returning unscored results): {e}")
-            task_registry[task_id]["logs"].append(f"Scoring error: {str(e)}")
+            logger.warning(f"Re-ranking failed (keeping bi-encoder ranking): {e}")
+            log(f"Re-ranking error: {str(e)}")
 
-    task_registry[task_id]["status"] = "completed"
+    task.finish("completed")
     
     final_output = {
         "task_id": task_id,
@@ -189,33 +209,49 @@ def run_scraper_engine(
     with open(final_output_path, "w") as f:
         json.dump(final_output, f, indent=2)
         
-    task_registry[task_id]["results_file"] = final_output_path
+    task.results_file = final_output_path
 
     # Save to database
     try:
-        from app.db.crud import save_search, save_jobs_batch, update_search_scores
-
-        save_search(
-            search_id=task_id,
-            profile_id=profile_id,
-            query=query,
-            location=location,
-            portals=portals,
-        )
+        from app.db.database import transaction
+        from app.db.crud import save_search, save_jobs_batch, update_search_scores, clear_search_results
+        from app.services.analytics_service import materialize_search_analytics
 
-        save_jobs_batch(search_id=task_id, jobs=aggregated_results, job_vectors=job_vectors)
+        # One write transaction, so a crash leaves either the whole search or nothing; a task
+        # re-run by recover() first drops whatever an earlier attempt committed under its id.
+        with transaction(immediate=True):
+            clear_search_results(task_id)
 
-        if scoring_metadata:
-            update_search_scores(
+            save_search(
                 search_id=task_id,
-                total_jobs=scoring_metadata.get("total_jobs", len(aggregated_results)),
-                market_reach=scoring_metadata.get("market_reach", 0),
-                average_score=scoring_metadata.get("average_score", 0),
-                high_match_jobs=scoring_metadata.get("high_match_jobs", 0),
+                profile_id=profile_id,
+                query=query,
+                location=location,
+                portals=portals,
+                cache_key=cache_key,
             )
 
+            job_ids = save_jobs_batch(search_id=task_id, jobs=aggregated_results, job_vectors=job_vectors)
+
+            if scoring_metadata:
+                update_search_scores(
+                    search_id=task_id,
+                    total_jobs=scoring_metadata.get("total_jobs", len(aggregated_results)),
+                    market_reach=scoring_metadata.get("market_reach", 0),
+                    average_score=scoring_metadata.get("average_score", 0),
+                    high_match_jobs=scoring_metadata.get("high_match_jobs", 0),
+                )
+
+            # Dashboard analytics are computed once here and served from search_analytics
+            materialize_search_analytics(task_id, aggregated_results)
+
+        # Keep the scored matrix in memory: what-ifs / rescoring on this search skip SQLite
+        if job_vectors:
+            from app.services.job_matrix_cache import job_matrix_cache, build_search_matrix
+            job_matrix_cache.put(build_search_matrix(task_id, job_ids, aggregated_results, job_vectors))
+
         logger.info(f"Results saved to database for task {task_id}")
     except Exception as e:
         logger.error(f"DB save failed (JSON file still available): {e}")
-        task_registry[task_id]["logs"].append(f"DB save error: {str(e)}")
+        log(f"DB save error: {str(e)}")
 
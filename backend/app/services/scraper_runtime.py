@@ -0,0 +1,297 @@
+# Scraper Runtime — runs portal scrapers in-process on a managed worker pool.
+
+# 1. Portal modules (linkedin.py, Indeed.py, ...) are imported once and reused.
+# 2. Each portal runs on a pooled worker thread; jobs come back as Python objects.
+# 3. Scraper print() output is routed per thread into the task's log list.
+# 4. Per-portal timeouts, counted from when a worker picks the portal up (not from submit):
+#    the scraper is cancelled at its next log line / job, and whatever it produced so far is kept.
+#    A portal still waiting for a worker after a full budget is cancelled before it starts.
+# 5. The shared Playwright browser (scraper/browser_pool.py) lives as long as the process;
+#    warm_browser_pool() / shutdown_browser_pool() are called from app startup / shutdown.
+
+
+import os
+import sys
+import time
+import logging
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCRAPER_DIR = os.path.join(sys._MEIPASS, "scraper") if getattr(sys, 'frozen', False) else os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../scraper"))
+
+# portal -> (script, entry point)
+PORTAL_SCRAPERS = {
+    "linkedin": ("linkedin.py", "scrape_linkedin"),
+    "indeed": ("Indeed.py", "scrape_indeed"),
+    "glassdoor": ("Glassdoor.py", "scrape_glassdoor"),
+    "naukri": ("Naukri.py", "scrape_naukri"),
+    "google": ("google_jobs.py", "scrape_google_jobs"),
+}
+
+
+class ScrapeCancelled(BaseException):
+    # BaseException so the scrapers' broad `except Exception` blocks don't swallow it.
+    pass
+
+
+class _PortalRun:
+    # Per-portal state shared between the worker thread and the orchestrator.
+
+    def __init__(self, portal: str, log: Callable[[str], None], timeout: float,
+                 on_job: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self.portal = portal
+        self.log = log
+        self.timeout = timeout
+        self.on_job = on_job
+        self.jobs: List[Dict[str, Any]] = []
+        self.submitted_at = time.monotonic()
+        # Set by start() on the worker thread; time spent queued for a worker doesn't count
+        self.started_at: Optional[float] = None
+        self.deadline: Optional[float] = None
+        self._partial_line = ""
+        self.on_done: Optional[Callable[[str, str, float], None]] = None
+        self._reported = False
+        self._done_lock = threading.Lock()
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + self.timeout
+
+    def elapsed(self) -> float:
+        return round(time.monotonic() - (self.started_at or self.submitted_at), 1)
+
+    def check_deadline(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise ScrapeCancelled(f"{self.portal} exceeded its time budget")
+
+    def write(self, text: str):
+        self._partial_line += text
+        *lines, self._partial_line = self._partial_line.split("\n")
+        for line in lines:
+            line = line.strip()
+            if line:
+                self.log(line)
+        self.check_deadline()
+
+    def flush(self):
+        # Emit any trailing output that didn't end with a newline.
+        line, self._partial_line = self._partial_line.strip(), ""
+        if line:
+            self.log(line)
+
+    def done(self, status: str):
+        # Report the final status once (a worker abandoned by the orchestrator may finish later).
+        with self._done_lock:
+            if self._reported:
+                return
+            self._reported = True
+        if self.on_done:
+            self.on_done(self.portal, status, self.elapsed())
+
+    def add_job(self, job: Dict[str, Any]):
+        job["portal"] = self.portal
+        self.jobs.append(job)
+        if self.on_job:
+            self.on_job(self.portal, job)
+        self.check_deadline()
+
+
+_current = threading.local()
+
+
+class _ThreadRoutedStdout:
+    # sys.stdout proxy: writes from a scraper worker go to that portal's log,
+    # everything else passes through to the real stream.
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text: str):
+        run = getattr(_current, "run", None)
+        if run is None:
+            return self._stream.write(text)
+        run.write(text)
+        return len(text)
+
+    def flush(self):
+        if getattr(_current, "run", None) is None:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_stdout_lock = threading.Lock()
+
+
+def _install_stdout_router():
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _ThreadRoutedStdout):
+            sys.stdout = _ThreadRoutedStdout(sys.stdout)
+
+
+_module_cache: Dict[str, Any] = {}
+_module_lock = threading.Lock()
+
+
+def _add_scraper_dir_to_path():
+    # Scrapers import shared helpers (scraper_http, browser_pool) as top-level modules
+    if SCRAPER_DIR not in sys.path:
+        sys.path.append(SCRAPER_DIR)
+
+
+def load_scraper(portal: str) -> Callable[..., List[Dict[str, Any]]]:
+    # Import a portal's scraper module once and return its entry point.
+    script_name, entry_point = PORTAL_SCRAPERS[portal]
+    with _module_lock:
+        module = _module_cache.get(portal)
+        if module is None:
+            _add_scraper_dir_to_path()
+            script_path = os.path.join(SCRAPER_DIR, script_name)
+            if not os.path.exists(script_path):
+                raise FileNotFoundError(f"Script not found: {script_name}")
+            spec = importlib.util.spec_from_file_location(f"skillfit_scraper_{portal}", script_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _module_cache[portal] = module
+    return getattr(module, entry_point)
+
+
+class ScraperRuntime:
+
+    # Managed pool of scraper workers shared by every search in this process.
+
+    def __init__(self, max_workers: int = settings.SCRAPER_MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scraper")
+        _install_stdout_router()
+
+    @staticmethod
+    def timeout_for(portal: str) -> float:
+        return settings.SCRAPER_PORTAL_TIMEOUTS.get(portal, settings.SCRAPER_TIMEOUT_SECONDS)
+
+    def _run_portal(self, run: _PortalRun, scrape: Callable, args: tuple, kwargs: dict) -> str:
+        run.start()
+        _current.run = run
+        error = None
+        try:
+            scrape(*args, filename=None, on_job=run.add_job, **kwargs)
+            status = "completed"
+        except ScrapeCancelled:
+            status = "timeout"
+        except Exception as e:
+            status, error = "failed", e
+        finally:
+            _current.run = None
+
+        run.flush()
+        if status == "timeout":
+            run.log(f"{run.portal} timed out after {time.monotonic() - run.started_at:.0f}s; keeping {len(run.jobs)} jobs")
+        elif status == "failed":
+            run.log(f"{run.portal} failed: {error}")
+        run.done(status)
+        return status
+
+    def run(
+        self,
+        query: str,
+        location: str,
+        portals: List[str],
+        log: Callable[[str], None],
+        limits: Optional[Dict[str, int]] = None,
+        google_api_key: Optional[str] = None,
+        on_job: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        on_portal_done: Optional[Callable[[str, str, float], None]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+
+        # Scrape all portals concurrently and block until each finishes or times out.
+        # Returns {portal: {"jobs", "status", "elapsed"}}.
+        # on_portal_done(portal, status, elapsed) fires as soon as each portal stops.
+
+        limits = limits or {}
+        runs: Dict[str, _PortalRun] = {}
+        futures = {}
+
+        for portal in portals:
+            portal = portal.lower()
+            if portal not in PORTAL_SCRAPERS:
+                log(f"Unknown portal: {portal}")
+                continue
+            try:
+                scrape = load_scraper(portal)
+            except Exception as e:
+                log(f"Failed to start {portal}: {str(e)}")
+                continue
+
+            kwargs = {"api_key": google_api_key} if portal == "google" and google_api_key else {}
+            run = _PortalRun(portal, log, self.timeout_for(portal), on_job)
+            run.on_done = on_portal_done
+            runs[portal] = run
+            futures[portal] = self._executor.submit(
+                self._run_portal, run, scrape, (query, location, limits.get(portal, 10)), kwargs
+            )
+
+        results = {}
+        for portal, future in futures.items():
+            run = runs[portal]
+            status = self._wait(run, future, log)
+            results[portal] = {
+                "jobs": list(run.jobs),
+                "status": status,
+                "elapsed": run.elapsed(),
+            }
+        return results
+
+    @staticmethod
+    def _wait(run: _PortalRun, future, log: Callable[[str], None]) -> str:
+        # Block until the portal finishes, its budget (+ grace) runs out, or it has waited a
+        # whole budget for a worker without starting.
+        queue_deadline = time.monotonic() + run.timeout
+        while True:
+            if run.deadline is not None:
+                # Grace period: a scraper blocked in I/O only notices cancellation at its next checkpoint
+                wait_until = run.deadline + settings.SCRAPER_CANCEL_GRACE_SECONDS
+            else:
+                wait_until = queue_deadline
+            try:
+                return future.result(timeout=max(0.0, wait_until - time.monotonic()))
+            except FutureTimeoutError:
+                if future.cancel():
+                    log(f"{run.portal} never got a free scraper worker; skipped")
+                elif run.deadline is None or time.monotonic() < wait_until:
+                    continue  # Picked up meanwhile: wait on its own deadline
+                else:
+                    log(f"{run.portal} did not stop within its time budget; abandoning with {len(run.jobs)} jobs")
+                run.done("timeout")
+                return "timeout"
+
+
+_runtime: Optional[ScraperRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_scraper_runtime() -> ScraperRuntime:
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = ScraperRuntime()
+        return _runtime
+
+
+def warm_browser_pool():
+    # Launch the shared Chromium now so the first Glassdoor / Naukri search doesn't pay for it.
+    _add_scraper_dir_to_path()
+    from browser_pool import get_browser_pool
+    get_browser_pool().warm()
+
+
+def shutdown_browser_pool():
+    # Close the shared Chromium, if a scraper ever started it.
+    module = sys.modules.get("browser_pool")
+    if module is not None:
+        module.shutdown_browser_pool()
@@ -0,0 +1,110 @@
+# Search Result Cache — serve repeated searches from already-stored jobs.
+
+# 1. Searches are keyed on the normalized (query, location, portals, per-portal limits,
+#    skill extraction mode) tuple — anything that changes which jobs / skills get stored.
+# 2. A search that finished cleanly within SEARCH_CACHE_TTL_SECONDS is a hit.
+# 3. On a hit, its stored jobs are loaded and only rescored against the new user vectors
+#    (no scraping, no NER, no encoding); the vectors come from job_matrix_cache.
+
+
+import re
+import hashlib
+import logging
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.rerank_service import RERANK_SCORE_KEYS
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Per-search columns that must not be carried over into the new search
+_SEARCH_LOCAL_KEYS = ("id", "search_id", "created_at", "metadata", "match_score")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", (text or "").strip().lower())
+
+
+def make_cache_key(
+    query: str,
+    location: str,
+    portals: List[str],
+    limits: Optional[Dict[str, int]] = None,
+    extraction_mode: Optional[str] = None,
+) -> str:
+    # Case / whitespace / portal-order insensitive key for a search.
+    # A larger job limit or a different extraction mode ("ner" vs "fast") is a different search.
+    selected = sorted({_normalize(p) for p in portals if p})
+    limits = {_normalize(p): int(n) for p, n in (limits or {}).items()}
+    normalized = "\0".join([
+        _normalize(query),
+        _normalize(location),
+        ",".join(selected),
+        ",".join(f"{p}={limits[p]}" for p in selected if p in limits),
+        _normalize(extraction_mode or settings.JOB_SKILL_EXTRACTION_MODE),
+    ])
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _job_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    # Rebuild the scraper-shaped job dict from a stored jobs row.
+    # Scrapers emit "link"; the url column is only the stored copy of it.
+    job = {k: v for k, v in row.items() if k not in _SEARCH_LOCAL_KEYS and k != "url"}
+    job.update(row.get("metadata") or {})
+    for key in RERANK_SCORE_KEYS:
+        job.pop(key, None)  # Re-ranking scores belong to the source search's profile
+    job.setdefault("link", row.get("url"))
+    return job
+
+
+def load_cached_results(
+    cache_key: str,
+    user_vectors: Optional[Dict[str, Any]] = None,
+    max_age_seconds: int = settings.SEARCH_CACHE_TTL_SECONDS,
+) -> Optional[Dict[str, Any]]:
+
+    # Jobs of the freshest matching search, rescored for `user_vectors`.
+    # Returns {"source_search_id", "jobs", "job_vectors", **summary} or None on a miss.
+
+    from app.db.crud import find_cached_search, get_jobs_by_search
+    from app.services.job_matrix_cache import job_matrix_cache
+
+    if max_age_seconds <= 0:
+        return None
+
+    source_id = find_cached_search(cache_key, max_age_seconds)
+    if source_id is None:
+        return None
+
+    rows = get_jobs_by_search(source_id)
+    matrix = job_matrix_cache.get(source_id)
+    job_rows = [matrix.row_of(row["id"]) for row in rows]
+    jobs = [_job_from_row(row) for row in rows]
+    job_vectors = [
+        {"global_vector": matrix.global_vectors[i], "skill_vector": matrix.skill_vectors[i]} if i is not None else {}
+        for i in job_rows
+    ]
+
+    summary: Dict[str, Any] = {}
+    if user_vectors is not None:
+        if not all(job_vectors):
+            # Stored without vectors (e.g. an unscored search) — can't rescore, so scrape again
+            return None
+
+        from app.services.vector_service import score_job_matrix, summarize_scores
+
+        # The cached matrix is in job-id order; put it in this ranking's row order
+        scores = score_job_matrix(user_vectors, matrix.job_matrix[job_rows])
+        for job, score in zip(jobs, scores.tolist()):
+            job["match_score"] = score
+
+        order = np.argsort(-scores, kind="stable")
+        jobs = [jobs[i] for i in order]
+        job_vectors = [job_vectors[i] for i in order]
+        summary = summarize_scores(scores)
+
+    logger.info(f"Search cache hit: {len(jobs)} jobs reused from search {source_id}")
+    return {"source_search_id": source_id, "jobs": jobs, "job_vectors": job_vectors, **summary}
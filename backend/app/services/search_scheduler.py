@@ -0,0 +1,180 @@
+# Search Scheduler — admission control for /jobs/search.
+
+# 1. Every search is persisted to `search_tasks` (SQLite) and queued FIFO.
+# 2. A search starts only when the global cap and every per-portal cap it needs have room
+#    (first-fit in queue order, so a Glassdoor search waiting on its browser slot
+#    doesn't hold back a LinkedIn-only search behind it).
+# 3. Queued / in-flight searches are re-queued on startup (in-flight ones restart from scratch).
+# 4. Queue position is reported through the task registry (/jobs/status).
+
+
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.task_registry import task_registry
+
+logger = logging.getLogger(__name__)
+
+
+def _to_jsonable(value: Any) -> Any:
+    # Search payloads go into SQLite as JSON (vectors arrive as ndarrays or lists).
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {k: _to_jsonable(v) for k, v in value.items()}
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return value
+
+
+class SearchScheduler:
+
+    # FIFO queue of searches with a global concurrency cap and per-portal caps.
+
+    def __init__(
+        self,
+        max_concurrent: int = settings.SEARCH_MAX_CONCURRENT,
+        portal_limits: Optional[Dict[str, int]] = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.portal_limits = portal_limits if portal_limits is not None else settings.SEARCH_PORTAL_CONCURRENCY
+        self._queue: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # task_id -> payload
+        self._running: Dict[str, List[str]] = {}                          # task_id -> portals
+        self._portal_usage: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    # Public API
+
+    def submit(self, task_id: str, payload: Dict[str, Any], persist: bool = True) -> Dict[str, Any]:
+        # Queue a search (payload = run_scraper_engine kwargs) and start it if there is room.
+        payload = _to_jsonable(payload)
+        if persist:
+            from app.db.crud import save_search_task
+            try:
+                save_search_task(task_id, payload)
+            except Exception as e:
+                # Still run it; it just won't survive a restart
+                logger.error(f"Failed to persist search task {task_id}: {e}")
+
+        task = task_registry.create(task_id, status="queued")
+        with self._lock:
+            self._queue[task_id] = payload
+        self._dispatch()
+
+        return {"task_id": task_id, "status": task.status, "queue_position": self.queue_position(task_id)}
+
+    def queue_position(self, task_id: str) -> Optional[int]:
+        # 1-based position among waiting searches, None once it has started.
+        with self._lock:
+            for position, queued_id in enumerate(self._queue, start=1):
+                if queued_id == task_id:
+                    return position
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": len(self._running),
+                "queued": len(self._queue),
+                "max_concurrent": self.max_concurrent,
+                "portal_usage": dict(self._portal_usage),
+                "portal_limits": dict(self.portal_limits),
+            }
+
+    def recover(self) -> int:
+        # Re-queue searches left queued or running by a previous process.
+        from app.db.crud import get_unfinished_search_tasks
+        try:
+            pending = get_unfinished_search_tasks()
+        except Exception as e:
+            logger.error(f"Could not load unfinished search tasks: {e}")
+            return 0
+
+        for row in pending:
+            logger.info(f"Resuming search task {row['id']} (was {row['status']})")
+            self.submit(row["id"], row["payload"], persist=False)
+        return len(pending)
+
+    # Internals
+
+    def _fits(self, portals: List[str]) -> bool:
+        # Caller must hold the lock.
+        for portal in set(portals):
+            limit = self.portal_limits.get(portal)
+            if limit is not None and self._portal_usage.get(portal, 0) >= limit:
+                return False
+        return True
+
+    def _dispatch(self):
+        # Start as many queued searches as the caps allow (first-fit, queue order).
+        to_start = []
+        with self._lock:
+            for task_id in list(self._queue):
+                if len(self._running) >= self.max_concurrent:
+                    break
+                portals = [p.lower() for p in self._queue[task_id].get("portals", [])]
+                if not self._fits(portals):
+                    continue
+                payload = self._queue.pop(task_id)
+                self._running[task_id] = portals
+                for portal in set(portals):
+                    self._portal_usage[portal] = self._portal_usage.get(portal, 0) + 1
+                to_start.append((task_id, payload))
+
+            # Keep the reported positions of everything still waiting up to date
+            for position, queued_id in enumerate(self._queue, start=1):
+                task = task_registry.get(queued_id)
+                if task is not None:
+                    task.queue_position = position
+
+        for task_id, payload in to_start:
+            task = task_registry.get(task_id)
+            if task is not None:
+                task.start()
+            threading.Thread(
+                target=self._run, args=(task_id, payload), name=f"search-{task_id[:8]}", daemon=True
+            ).start()
+
+    def _release(self, task_id: str):
+        with self._lock:
+            for portal in set(self._running.pop(task_id, [])):
+                self._portal_usage[portal] = max(0, self._portal_usage.get(portal, 0) - 1)
+
+    def _run(self, task_id: str, payload: Dict[str, Any]):
+        from app.db.crud import update_search_task_status
+        from app.db.database import close_thread_connection
+        from app.services.scraper_engine import run_scraper_engine
+
+        try:
+            update_search_task_status(task_id, "running")
+        except Exception as e:
+            logger.error(f"Failed to mark search task {task_id} as running: {e}")
+
+        status, error = "completed", None
+        try:
+            run_scraper_engine(task_id, **payload)
+        except Exception as e:
+            status, error = "failed", str(e)
+            logger.error(f"Search task {task_id} failed: {e}")
+            task = task_registry.get(task_id)
+            if task is not None:
+                task.log(f"Search failed: {error}")
+                task.finish("failed")
+        finally:
+            self._release(task_id)
+            try:
+                update_search_task_status(task_id, status, error)
+            except Exception as e:
+                logger.error(f"Failed to record final state of search task {task_id}: {e}")
+            try:
+                self._dispatch()
+            finally:
+                close_thread_connection()  # This thread is done; don't keep its connection pooled
+
+
+# Main Instance
+search_scheduler = SearchScheduler()
@@ -1,119 +1,178 @@
 # Simulation Service — 'What-If' Analysis Engine.
 # Calculates how adding specific skills impacts a user's market match score.
 
+# 1. The search's normalized float32 [global | skill] job matrix comes from job_matrix_cache
+#    (SQLite is only read on the first what-if after a restart / eviction).
+# 2. The profile's stored global vector is reused; only the new skill string is encoded.
+# 3. All jobs are rescored with a single matrix-vector product. Averages and reach are taken
+#    over every job of the search (search.total_jobs), as before; jobs without vectors add 0 to the sums.
+# 4. rank_skill_candidates: every "profile + one candidate skill" string is encoded in one
+#    encode_batch call and scored in one GEMM, giving a ranked marginal-value table.
+
 
 import logging
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Optional
 
-from app.db.crud import get_profile, get_job_vectors_by_search, get_jobs_by_search
-from app.services.vector_service import generate_user_vectors, calculate_match_score
+from app.db.crud import get_profile
+from app.services.job_matrix_cache import job_matrix_cache
+from app.services.vector_service import (
+    build_skill_string, encode_document, score_job_matrix, score_skill_variants, vector_engine,
+)
 
 logger = logging.getLogger(__name__)
 
+HIGH_MATCH_SCORE = 60   # "High match" threshold used by the what-if stats
+TOP_IMPROVEMENTS = 10
+MAX_SKILL_CANDIDATES = 100
+
+
+def _new_skills(original_skills: List[str], added_skills: List[str]) -> List[str]:
+    # Case-insensitive dedup: only truly new skills, in request order
+    existing_lower = {s.lower() for s in original_skills}
+    new_skills = []
+    for skill in added_skills:
+        if skill.lower() not in existing_lower:
+            new_skills.append(skill)
+            existing_lower.add(skill.lower())
+    return new_skills
+
+
+def _profile_global_vector(profile: Dict[str, Any]) -> np.ndarray:
+    # Cached resume embedding; encoded on the fly only for profiles that were never embedded.
+    global_vector = profile.get("global_vector")
+    if global_vector is None or len(global_vector) == 0:
+        global_vector = encode_document(profile.get("raw_text", ""))
+    return global_vector
+
 
 def simulate_skill_impact(
     search_id: str,
     profile_id: str,
     added_skills: List[str]
 ) -> Dict[str, Any]:
-   
+
     logger.info(f"Simulating impact of adding {added_skills} for search {search_id}")
 
-    # 1. Fetch original profile
     profile = get_profile(profile_id)
     if not profile:
         raise ValueError("Profile not found")
 
-    # 2. Combine skills
     original_skills = profile.get("confirmed_skills", [])
-    # Case-insensitive dedup
-    existing_lower = {s.lower() for s in original_skills}
-    new_skills = []
-    
-    # Only add truly new skills
-    for skill in added_skills:
-        if skill.lower() not in existing_lower:
-            new_skills.append(skill)
-            existing_lower.add(skill.lower())
-    
+    new_skills = _new_skills(original_skills, added_skills)
     if not new_skills:
         return {"error": "All skills already exist in profile", "delta": 0}
 
-    simulated_skills = original_skills + new_skills
+    search = job_matrix_cache.get(search_id)
+    if len(search) == 0:
+        return {"error": "No cached job vectors found for this search", "delta": 0}
+    count = search.total_jobs
+
+    # The only encode per what-if call: the augmented skill string
+    user_vectors = {
+        "global_vector": _profile_global_vector(profile),
+        "skill_vector": vector_engine.encode(build_skill_string(original_skills + new_skills)),
+    }
+    new_scores = score_job_matrix(user_vectors, search.job_matrix)
+    old_scores = search.match_scores
 
-    # 3. Generate NEW User Vectors
-    
-    augmented_text = profile.get("raw_text", "") + "\n\n" + ", ".join(new_skills)
-    
-    new_vectors = generate_user_vectors(augmented_text, simulated_skills)
+    deltas = new_scores - old_scores
+    improved = np.flatnonzero(deltas > 0)
+    top = improved[np.argsort(-deltas[improved], kind="stable")][:TOP_IMPROVEMENTS]
 
-    # 4. Fetch Job Vectors (Cached)
-    job_vectors = get_job_vectors_by_search(search_id)
-    if not job_vectors:
-        return {"error": "No cached job vectors found for this search", "delta": 0}
-    
-    # Map for quick lookup
-    vec_map = {v["id"]: v for v in job_vectors}
-
-    # 5. Fetch Original Jobs (for metadata & old scores)
-    original_jobs = get_jobs_by_search(search_id)
-    
-    improved_jobs = []
-    total_old_score = 0
-    total_new_score = 0
-    old_high_match = 0
-    new_high_match = 0
-    
-    for job in original_jobs:
-        job_id = job.get("id")
-        old_score = job.get("match_score", 0)
-        
-        # Get vectors
-        vecs = vec_map.get(job_id)
-        if not vecs:
-            continue
-            
-        # Prepare job dict for calculator
-        # Calculator expects 'jd_global_vector' keys
-        job_for_calc = {
-            "jd_global_vector": vecs["global_vector"],
-            "jd_skill_vector": vecs["skill_vector"]
-        }
-        
-        # Calculate NEW score
-        new_score = calculate_match_score(new_vectors, job_for_calc)
-        
-        # Stats
-        total_old_score += old_score
-        total_new_score += new_score
-        
-        if old_score >= 60: old_high_match += 1
-        if new_score >= 60: new_high_match += 1
-        
-        if new_score > old_score:
-            improved_jobs.append({
-                "id": job_id,
-                "title": job.get("title"),
-                "company": job.get("company"),
-                "old_score": old_score,
-                "new_score": new_score,
-                "delta": round(new_score - old_score, 1)
-            })
-
-    count = len(original_jobs)
-    if count == 0:
-        return {"error": "No jobs found", "delta": 0}
-
-    # 6. Sort by improvement
-    improved_jobs.sort(key=lambda x: x["delta"], reverse=True)
+    old_high_match = int(np.count_nonzero(old_scores >= HIGH_MATCH_SCORE))
+    new_high_match = int(np.count_nonzero(new_scores >= HIGH_MATCH_SCORE))
 
     return {
-        "original_avg_score": round(total_old_score / count, 1),
-        "new_avg_score": round(total_new_score / count, 1),
-        "score_delta": round((total_new_score - total_old_score) / count, 1),
+        "original_avg_score": round(float(old_scores.sum()) / count, 1),
+        "new_avg_score": round(float(new_scores.sum()) / count, 1),
+        "score_delta": round(float(deltas.sum()) / count, 1),
         "original_reach": round((old_high_match / count) * 100, 1),
         "new_reach": round((new_high_match / count) * 100, 1),
         "reach_delta": round(((new_high_match - old_high_match) / count) * 100, 1),
-        "jobs_improved": len(improved_jobs),
-        "top_improvements": improved_jobs[:10]  # Top 10 gainers
+        "jobs_improved": int(improved.size),
+        "top_improvements": [
+            {
+                "id": int(search.ids[i]),
+                "title": search.titles[i],
+                "company": search.companies[i],
+                "old_score": float(old_scores[i]),
+                "new_score": float(new_scores[i]),
+                "delta": round(float(deltas[i]), 1),
+            }
+            for i in top
+        ],
+    }
+
+
+def _analytics_skill_candidates(search_id: str) -> List[str]:
+    # The search's most in-demand skills (analytics top_skills), most common first.
+    from app.services.analytics_service import get_analytics_from_db, get_materialized_analytics
+
+    analytics = get_materialized_analytics(search_id)
+    if analytics is None:
+        analytics = get_analytics_from_db(search_id)
+    return [item["name"] for item in analytics.get("top_skills", [])]
+
+
+def rank_skill_candidates(
+    search_id: str,
+    profile_id: str,
+    candidate_skills: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+
+    # Marginal value of each candidate skill on its own: reach / average-score deltas
+    # of "profile + that skill" over the search's jobs, best first.
+    # Without candidates, the search's top skills the profile doesn't have are ranked.
+
+    profile = get_profile(profile_id)
+    if not profile:
+        raise ValueError("Profile not found")
+
+    source = "request" if candidate_skills else "analytics"
+    if not candidate_skills:
+        candidate_skills = _analytics_skill_candidates(search_id)
+
+    original_skills = profile.get("confirmed_skills", [])
+    candidates = _new_skills(original_skills, candidate_skills)[:MAX_SKILL_CANDIDATES]
+    if not candidates:
+        return {"error": "All candidate skills already exist in profile", "candidates_source": source, "ranking": []}
+
+    search = job_matrix_cache.get(search_id)
+    if len(search) == 0:
+        return {"error": "No cached job vectors found for this search", "candidates_source": source, "ranking": []}
+    count = search.total_jobs
+
+    # One encode_batch for every augmented skill string, one GEMM for every score
+    skill_vectors = vector_engine.encode_batch(
+        [build_skill_string(original_skills + [skill]) for skill in candidates]
+    )
+    new_scores = score_skill_variants(_profile_global_vector(profile), skill_vectors, search.job_matrix)
+    old_scores = search.match_scores
+
+    deltas = new_scores - old_scores                       # (k, n_jobs)
+    avg_deltas = deltas.sum(axis=1) / count
+    old_high_match = int(np.count_nonzero(old_scores >= HIGH_MATCH_SCORE))
+    new_high_match = np.count_nonzero(new_scores >= HIGH_MATCH_SCORE, axis=1)
+    improved = np.count_nonzero(deltas > 0, axis=1)
+
+    # Best first: reach gained, then average score gained
+    order = np.lexsort((-avg_deltas, -new_high_match))
+
+    return {
+        "candidates_source": source,
+        "total_jobs": count,
+        "original_avg_score": round(float(old_scores.sum()) / count, 1),
+        "original_reach": round((old_high_match / count) * 100, 1),
+        "ranking": [
+            {
+                "skill": candidates[i],
+                "new_avg_score": round(float(new_scores[i].sum()) / count, 1),
+                "score_delta": round(float(avg_deltas[i]), 1),
+                "new_reach": round((int(new_high_match[i]) / count) * 100, 1),
+                "reach_delta": round(((int(new_high_match[i]) - old_high_match) / count) * 100, 1),
+                "jobs_improved": int(improved[i]),
+            }
+            for i in order
+        ],
     }
@@ -0,0 +1,338 @@
+# Streaming Pipeline — enrich, embed and score jobs while the scrapers are still running.
+
+# 1. Scraper workers hand each job to IncrementalScorer.submit() as soon as it is parsed.
+# 2. A consumer thread drains the queue in micro-batches (size- or time-bounded).
+# 3. Each micro-batch is enriched, batch-encoded and scored against the user vectors.
+# 4. snapshot() exposes the live ranking; finalize() returns the full scored result set
+#    in the same shape as score_jobs_against_user(keep_vectors=True).
+# 5. iter_task_events() turns a task into a resumable SSE stream of deltas
+#    (new log lines, per-portal progress, newly scored jobs).
+# 6. Cross-portal duplicates are merged on submit (dedup_service), before any NER / encoding.
+# 7. Once finalized, a task swaps its scorer for a StreamSummary (counters + top jobs), so
+#    finished tasks waiting out their TTL don't hold every job and the dedup index.
+
+
+import json
+import time
+import queue
+import asyncio
+import logging
+import threading
+import numpy as np
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional, Tuple
+
+from app.core.config import settings
+from app.services.job_service import enrich_job_listings
+from app.services.dedup_service import JobDeduplicator
+
+logger = logging.getLogger(__name__)
+
+_CLOSE = object()  # Queue sentinel: no more jobs will be submitted
+
+
+class IncrementalScorer:
+
+    # Accumulates scraped jobs and keeps them scored as they arrive.
+    # Without user vectors, jobs are only enriched (the ranking stays in arrival order).
+
+    def __init__(
+        self,
+        user_vectors: Optional[Dict[str, Any]] = None,
+        extraction_mode: Optional[str] = None,
+        batch_size: int = settings.STREAM_BATCH_SIZE,
+        max_wait: float = settings.STREAM_MAX_WAIT_SECONDS,
+        dedup: bool = settings.DEDUP_ENABLED,
+    ):
+        self.user_vectors = user_vectors
+        self.extraction_mode = extraction_mode
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        # Parallel, append-only state (row i describes jobs[i])
+        self.jobs: List[Dict[str, Any]] = []
+        self._global_rows: List[np.ndarray] = []
+        self._skill_rows: List[np.ndarray] = []
+        self._scores: List[np.ndarray] = []
+
+        self.dedup = JobDeduplicator() if dedup else None
+        self.submitted = 0
+        self.duplicates = 0
+        self.scoring_error: Optional[str] = None
+        self.first_result_seconds: Optional[float] = None
+        self._started_at = time.monotonic()
+
+    # Producer side
+
+    def start(self) -> "IncrementalScorer":
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._consume, name="stream-scorer", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, portal: str, job: Dict[str, Any]):
+        # Signature matches ScraperRuntime's on_job(portal, job) callback.
+        entry = self.dedup.fingerprint(job) if self.dedup is not None else None
+        with self._lock:
+            self.submitted += 1
+            # Merging touches the kept job, which readers iterate under this lock
+            if entry is not None and self.dedup.add(entry) is not None:
+                self.duplicates += 1
+                return
+        self._queue.put(job)
+
+    def close(self):
+        # Stop accepting jobs and wait until everything submitted has been processed.
+        self._queue.put(_CLOSE)
+        if self._thread is not None:
+            self._thread.join()
+
+    # Consumer side
+
+    def _consume(self):
+        closed = False
+        while not closed:
+            item = self._queue.get()
+            if item is _CLOSE:
+                break
+            batch = [item]
+
+            # Collect more jobs until the batch is full or the wait budget is spent
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _CLOSE:
+                    closed = True
+                    break
+                batch.append(item)
+
+            try:
+                self._process(batch)
+            except Exception as e:
+                # Never drop scraped jobs: keep them unscored
+                logger.error(f"Streaming batch of {len(batch)} jobs failed: {e}")
+                with self._lock:
+                    self.jobs.extend(batch)
+                    self.scoring_error = self.scoring_error or str(e)
+
+    def _process(self, batch: List[Dict[str, Any]]):
+        batch = enrich_job_listings(batch, mode=self.extraction_mode)
+
+        global_vectors = skill_vectors = scores = None
+        if self.user_vectors is not None and self.scoring_error is None:
+            try:
+                from app.services.vector_service import encode_job_matrices, build_job_matrix, score_job_matrix
+                global_vectors, skill_vectors = encode_job_matrices(batch)
+                if self.dedup is not None and self.dedup.embedding_threshold > 0:
+                    with self._lock:
+                        keep = self.dedup.merge_by_embedding(batch, global_vectors)
+                        self.duplicates += int((~keep).sum())
+                    batch = [job for job, kept in zip(batch, keep) if kept]
+                    global_vectors, skill_vectors = global_vectors[keep], skill_vectors[keep]
+                scores = score_job_matrix(self.user_vectors, build_job_matrix(global_vectors, skill_vectors))
+                for job, score in zip(batch, scores.tolist()):
+                    job["match_score"] = score
+            except Exception as e:
+                # Same policy as the batch pipeline: keep going with unscored results
+                logger.error(f"Scoring failed (continuing unscored): {e}")
+                self.scoring_error = str(e)
+                global_vectors = skill_vectors = scores = None
+
+        with self._lock:
+            self.jobs.extend(batch)
+            if scores is not None:
+                self._global_rows.append(global_vectors)
+                self._skill_rows.append(skill_vectors)
+                self._scores.append(scores)
+            if self.first_result_seconds is None:
+                self.first_result_seconds = round(time.monotonic() - self._started_at, 2)
+
+    # Readers
+
+    def _ranked(self) -> Dict[str, Any]:
+        # Caller must hold the lock. Ranking order, scores and summary over self.jobs.
+        from app.services.vector_service import summarize_scores
+        if self.scoring_error is not None or not self._scores:
+            return {"order": list(range(len(self.jobs))), "scores": None, "summary": {}}
+        scores = np.concatenate(self._scores)
+        return {
+            "order": np.argsort(-scores, kind="stable").tolist(),
+            "scores": scores,
+            "summary": summarize_scores(scores),
+        }
+
+    def snapshot(self, limit: int = 20) -> Dict[str, Any]:
+        # Current top-`limit` jobs plus running score summary (safe to call any time).
+        with self._lock:
+            ranked = self._ranked()
+            top = [
+                {k: v for k, v in self.jobs[i].items() if not k.startswith("jd_")}
+                for i in ranked["order"][:limit]
+            ]
+            return {
+                "jobs_scraped": self.submitted,
+                "jobs_processed": len(self.jobs),
+                "duplicates_merged": self.duplicates,
+                "first_result_seconds": self.first_result_seconds,
+                "jobs": top,
+                **ranked["summary"],
+            }
+
+    def jobs_since(self, offset: int) -> Tuple[int, List[Dict[str, Any]]]:
+        # Jobs processed after `offset` (arrival order) and the new offset.
+        with self._lock:
+            new_jobs = [
+                {k: v for k, v in job.items() if not k.startswith("jd_")}
+                for job in self.jobs[offset:]
+            ]
+            return offset + len(new_jobs), new_jobs
+
+    def progress(self) -> Dict[str, Any]:
+        # Counters only (no job payloads) — cheap enough to send on every tick.
+        with self._lock:
+            ranked_summary = self._ranked()["summary"]
+            return {
+                "jobs_scraped": self.submitted,
+                "jobs_processed": len(self.jobs),
+                "duplicates_merged": self.duplicates,
+                "first_result_seconds": self.first_result_seconds,
+                **ranked_summary,
+            }
+
+    def finalize(self) -> Dict[str, Any]:
+        # Close the stream and return {"jobs", **summary} with jd_* vectors attached.
+        self.close()
+        with self._lock:
+            ranked = self._ranked()
+            if ranked["scores"] is not None and self._global_rows:
+                global_vectors = np.vstack(self._global_rows)
+                skill_vectors = np.vstack(self._skill_rows)
+                for i, job in enumerate(self.jobs):
+                    job["jd_global_vector"] = global_vectors[i]
+                    job["jd_skill_vector"] = skill_vectors[i]
+                # The caller owns the vectors now; don't keep a second copy alive in the registry
+                self._global_rows, self._skill_rows = [], []
+            jobs = [self.jobs[i] for i in ranked["order"]]
+
+        if ranked["summary"]:
+            logger.info(
+                f"Streaming scoring complete: {len(jobs)} jobs, first result after "
+                f"{self.first_result_seconds}s, Market Reach={ranked['summary']['market_reach']}%"
+            )
+        return {"jobs": jobs, **ranked["summary"]}
+
+    def summary(self, top_n: int = settings.STREAM_SUMMARY_TOP_N) -> "StreamSummary":
+        # Compact, detached copy of the final state (call after finalize()).
+        snapshot = self.snapshot(limit=top_n)
+        return StreamSummary(snapshot.pop("jobs"), snapshot)
+
+
+class StreamSummary:
+
+    # Read-only stand-in for a finished IncrementalScorer: same reader API, bounded size.
+    # The full result set lives in the results file / DB, not here.
+
+    def __init__(self, top_jobs: List[Dict[str, Any]], counters: Dict[str, Any]):
+        self.top_jobs = top_jobs
+        self.counters = counters
+
+    def snapshot(self, limit: int = 20) -> Dict[str, Any]:
+        return {**self.counters, "jobs": self.top_jobs[:limit]}
+
+    def jobs_since(self, offset: int) -> Tuple[int, List[Dict[str, Any]]]:
+        # Arrival order isn't kept: jobs not streamed before finalize() are only in the final results.
+        return max(offset, self.counters["jobs_processed"]), []
+
+    def progress(self) -> Dict[str, Any]:
+        return dict(self.counters)
+
+
+def _sse(event: str, data: Any, event_id: Optional[str] = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def parse_event_id(event_id: Optional[str]) -> Tuple[int, int]:
+    # "<log offset>:<job offset>" -> (log_offset, job_offset); anything else restarts at 0.
+    try:
+        log_offset, job_offset = (event_id or "").split(":")
+        return max(0, int(log_offset)), max(0, int(job_offset))
+    except ValueError:
+        return 0, 0
+
+
+async def iter_task_events(
+    get_task: Callable[[], Optional[Any]],
+    log_offset: int = 0,
+    job_offset: int = 0,
+    poll_interval: float = settings.STREAM_POLL_INTERVAL_SECONDS,
+    heartbeat_interval: float = 15.0,
+) -> AsyncIterator[str]:
+
+    # Server-sent events for one task. Only deltas are sent:
+    #   log      -> {"offset", "lines"}   new log lines since the last event
+    #   jobs     -> {"offset", "jobs"}    newly scored jobs (arrival order)
+    #   progress -> per-portal counters + running score summary (only when changed)
+    #   done     -> final status; the stream ends after it
+    # Every log/jobs event carries id "<log offset>:<job offset>", so a client
+    # reconnecting with Last-Event-ID resumes exactly where it left off.
+
+    last_progress = None
+    last_sent = time.monotonic()
+
+    while True:
+        task = get_task()
+        if task is None:
+            yield _sse("done", {"status": "not_found"})
+            return
+
+        # Read the status first so the final drain below can't miss late deltas
+        finished = task.is_finished
+        sent = False
+        lines, next_offset = task.logs.since(log_offset)
+        log_offset = next_offset
+        if lines:
+            yield _sse("log", {"offset": log_offset, "lines": lines}, f"{log_offset}:{job_offset}")
+            sent = True
+
+        if task.stream is not None:
+            job_offset, new_jobs = task.stream.jobs_since(job_offset)
+            if new_jobs:
+                yield _sse("jobs", {"offset": job_offset, "jobs": new_jobs}, f"{log_offset}:{job_offset}")
+                sent = True
+
+        progress = {"portals": task.portal_progress()}
+        if task.stream is not None:
+            progress.update(task.stream.progress())
+        # Elapsed time ticks on running portals; only resend when the counts change
+        fingerprint = dict(progress, portals={
+            portal: {k: v for k, v in counters.items() if k != "elapsed"}
+            for portal, counters in progress["portals"].items()
+        })
+        if fingerprint != last_progress:
+            last_progress = fingerprint
+            yield _sse("progress", progress)
+            sent = True
+
+        if finished:
+            yield _sse("done", {"status": task.status, **progress}, f"{log_offset}:{job_offset}")
+            return
+
+        now = time.monotonic()
+        if sent:
+            last_sent = now
+        elif now - last_sent >= heartbeat_interval:
+            # SSE comment line keeps proxies from closing an idle connection
+            yield ": keep-alive\n\n"
+            last_sent = now
+
+        await asyncio.sleep(poll_interval)
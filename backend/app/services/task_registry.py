@@ -0,0 +1,200 @@
+# Task Registry — bounded, in-memory state for running and recently finished searches.
+
+# 1. Logs live in a fixed-size ring buffer with absolute offsets (pollers / SSE resume by offset).
+# 2. Per-portal counters (found, detailed, failed, elapsed) instead of parsing log lines.
+# 3. Finished tasks are evicted after TASK_TTL_SECONDS; the registry never exceeds TASK_REGISTRY_MAX_TASKS.
+# 4. to_status() is the compact representation served by /jobs/status.
+
+
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LogBuffer:
+
+    # Ring buffer of log lines. Offsets are absolute (count of lines ever appended),
+    # so a reader's offset stays valid after old lines have been dropped.
+
+    def __init__(self, maxlen: int = settings.TASK_LOG_MAX_LINES):
+        self._lines: deque = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def append(self, line: str):
+        with self._lock:
+            self._lines.append(line)
+            self.total += 1
+
+    def since(self, offset: int = 0) -> Tuple[List[str], int]:
+        # Lines after `offset` that are still retained, and the next offset.
+        with self._lock:
+            first_retained = self.total - len(self._lines)
+            start = max(offset, first_retained) - first_retained
+            return list(self._lines)[start:], self.total
+
+    def __len__(self) -> int:
+        return self.total
+
+
+class PortalProgress:
+
+    # Live counters for one portal of one search.
+
+    __slots__ = ("status", "found", "detailed", "failed", "started_at", "elapsed")
+
+    def __init__(self):
+        self.status = "running"
+        self.found = 0      # Jobs yielded by the scraper
+        self.detailed = 0   # ... of which came with a description
+        self.failed = 0     # ... of which have no usable description
+        self.started_at = time.monotonic()
+        self.elapsed: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = self.elapsed if self.elapsed is not None else time.monotonic() - self.started_at
+        return {
+            "status": self.status,
+            "found": self.found,
+            "detailed": self.detailed,
+            "failed": self.failed,
+            "elapsed": round(elapsed, 1),
+        }
+
+
+class TaskState:
+
+    # Everything the API needs to know about one search task.
+
+    def __init__(self, task_id: str, status: str = "processing"):
+        self.task_id = task_id
+        self.status = status
+        self.logs = LogBuffer()
+        self.portals: Dict[str, PortalProgress] = {}
+        self.stream = None          # IncrementalScorer while the search is live, then a StreamSummary
+        self.results_file: Optional[str] = None
+        self.queue_position: Optional[int] = None  # Set by the search scheduler while queued
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def log(self, line: str):
+        self.logs.append(line)
+
+    # Portal counters (called from scraper worker threads)
+
+    def start_portal(self, portal: str):
+        with self._lock:
+            self.portals[portal] = PortalProgress()
+
+    def record_job(self, portal: str, job: Dict[str, Any]):
+        with self._lock:
+            progress = self.portals.setdefault(portal, PortalProgress())
+            progress.found += 1
+            description = job.get("description")
+            if description and description != "N/A":
+                progress.detailed += 1
+            else:
+                progress.failed += 1
+
+    def finish_portal(self, portal: str, status: str, elapsed: float):
+        with self._lock:
+            progress = self.portals.setdefault(portal, PortalProgress())
+            progress.status = status
+            progress.elapsed = elapsed
+
+    def portal_progress(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {portal: p.to_dict() for portal, p in self.portals.items()}
+
+    # Lifecycle
+
+    @property
+    def is_finished(self) -> bool:
+        return self.finished_at is not None
+
+    def start(self):
+        self.status = "processing"
+        self.queue_position = None
+
+    def finish(self, status: str = "completed"):
+        self.status = status
+        self.finished_at = time.time()
+
+    def to_status(self, log_offset: int = 0) -> Dict[str, Any]:
+        # Compact status: only log lines after `log_offset`, plus counters.
+        lines, next_offset = self.logs.since(log_offset)
+        status = {
+            "task_id": self.task_id,
+            "status": self.status,
+            "logs": lines,
+            "log_offset": next_offset,
+            "portals": self.portal_progress(),
+        }
+        if self.queue_position is not None:
+            status["queue_position"] = self.queue_position
+        if self.stream is not None:
+            status["progress"] = self.stream.progress()
+        return status
+
+
+class TaskRegistry:
+
+    # Thread-safe map of task_id -> TaskState with TTL + size bounds on finished tasks.
+
+    def __init__(self, ttl_seconds: int = settings.TASK_TTL_SECONDS, max_tasks: int = settings.TASK_REGISTRY_MAX_TASKS):
+        self.ttl_seconds = ttl_seconds
+        self.max_tasks = max_tasks
+        self._tasks: "OrderedDict[str, TaskState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, task_id: str, status: str = "processing") -> TaskState:
+        task = TaskState(task_id, status)
+        with self._lock:
+            self._tasks[task_id] = task
+        self.evict_expired()
+        return task
+
+    def get(self, task_id: str) -> Optional[TaskState]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+        if task is not None and task.is_finished and time.time() - task.finished_at > self.ttl_seconds:
+            self.evict_expired()
+            return None
+        return task
+
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def evict_expired(self) -> int:
+        # Drop finished tasks past their TTL, then the oldest finished ones over the size cap.
+        # Running tasks are never evicted.
+        now = time.time()
+        with self._lock:
+            expired = [
+                task_id for task_id, task in self._tasks.items()
+                if task.is_finished and now - task.finished_at > self.ttl_seconds
+            ]
+            overflow = len(self._tasks) - len(expired) - self.max_tasks
+            if overflow > 0:
+                finished = [task_id for task_id, task in self._tasks.items() if task.is_finished and task_id not in expired]
+                expired.extend(finished[:overflow])
+            for task_id in expired:
+                del self._tasks[task_id]
+
+        if expired:
+            logger.info(f"Evicted {len(expired)} finished tasks from the registry ({len(self._tasks)} left).")
+        return len(expired)
+
+
+# Main Instance
+task_registry = TaskRegistry()
@@ -4,22 +4,27 @@
 
 # 1. Generate user profile vectors (global + skill) — called by /embed endpoint.
 # 2. Batch-generate job vectors (global + skill) — called during scraper pipeline.
-# 3. Calculate hybrid match scores (60% Skill + 40% Global).
+# 3. Calculate hybrid match scores (60% Skill + 40% Global) — batched as one matmul.
 # 4. Compute Market Reach score (% of jobs > 70% match).
+# 5. Resumes / job descriptions can be embedded as pooled token windows (EMBED_CHUNKING).
 
 
 import logging
 import numpy as np
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 from ml.embeddings.vectorizer import vector_engine
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+VECTOR_DIM = 384  # all-MiniLM-L6-v2 output dimension
+HIGH_MATCH_THRESHOLD = 70
 
-def cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
+
+def cosine_similarity(vec_a: np.ndarray, vec_b: np.ndarray) -> float:
     """Calculate cosine similarity between two vectors."""
-    a = np.array(vec_a)
-    b = np.array(vec_b)
+    a = np.asarray(vec_a, dtype=np.float32)
+    b = np.asarray(vec_b, dtype=np.float32)
 
     dot = np.dot(a, b)
     norm_a = np.linalg.norm(a)
@@ -31,16 +36,37 @@ def cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
     return float(dot / (norm_a * norm_b))
 
 
-def generate_user_vectors(resume_text: str, confirmed_skills: List[str]) -> Dict[str, List[float]]:
-    # Create skill string (Standardize first to be safe)
+def build_skill_string(skills: List[str]) -> str:
+    # Standardized, comma-joined skill list (the text behind every skill vector).
     from ml.utils.skill_standardizer import standardizer
-    if standardizer and confirmed_skills:
-        confirmed_skills = standardizer.standardize(confirmed_skills)
-        
-    skill_string = ", ".join(confirmed_skills) if confirmed_skills else ""
+    if standardizer and skills:
+        skills = standardizer.standardize(skills)
+    return ", ".join(skills) if skills else ""
+
+
+def encode_documents(texts: List[str]) -> np.ndarray:
+    # Global vectors of long texts (resumes, job descriptions): token-window chunking with
+    # pooling when EMBED_CHUNKING is on, plain (model-truncated) encoding otherwise.
+    if settings.EMBED_CHUNKING:
+        return vector_engine.encode_chunked_batch(
+            texts, max_chunks=settings.EMBED_MAX_CHUNKS, pooling=settings.EMBED_CHUNK_POOLING
+        )
+    return vector_engine.encode_batch(texts)
+
+
+def encode_document(text: str) -> np.ndarray:
+    if not settings.EMBED_CHUNKING:
+        return vector_engine.encode(text)
+    if not vector_engine.clean_text(text):
+        return np.zeros(VECTOR_DIM, dtype=np.float32)
+    return encode_documents([text])[0]
+
+
+def generate_user_vectors(resume_text: str, confirmed_skills: List[str]) -> Dict[str, np.ndarray]:
+    skill_string = build_skill_string(confirmed_skills)
 
     logger.info(f"Generating user vectors ({len(confirmed_skills)} confirmed skills)...")
-    global_vector = vector_engine.encode(resume_text)
+    global_vector = encode_document(resume_text)
     skill_vector = vector_engine.encode(skill_string)
 
     return {
@@ -49,11 +75,9 @@ def generate_user_vectors(resume_text: str, confirmed_skills: List[str]) -> Dict
     }
 
 
-def generate_job_vectors_batch(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    # Batch-generate vectors for all jobs at once (fast).
-    if not jobs:
-        return jobs
-
+def encode_job_matrices(jobs: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    # Batch-encode all jobs at once (fast).
+    # Returns (global, skill) float32 matrices of shape (n, 384), row i = jobs[i].
     from ml.utils.skill_standardizer import standardizer
 
     jd_texts = [job.get("description", "") for job in jobs]
@@ -70,11 +94,20 @@ def generate_job_vectors_batch(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any
             jd_skills_list.append("")
 
     logger.info(f"Batch-encoding {len(jobs)} job descriptions...")
-    global_vectors = vector_engine.encode_batch(jd_texts)
+    global_vectors = encode_documents(jd_texts)
 
     logger.info(f"Batch-encoding {len(jobs)} job skill strings...")
     skill_vectors = vector_engine.encode_batch(jd_skills_list)
 
+    return global_vectors, skill_vectors
+
+
+def generate_job_vectors_batch(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Batch-generate vectors for all jobs and attach them as float32 row views.
+    if not jobs:
+        return jobs
+
+    global_vectors, skill_vectors = encode_job_matrices(jobs)
     for i, job in enumerate(jobs):
         job["jd_global_vector"] = global_vectors[i]
         job["jd_skill_vector"] = skill_vectors[i]
@@ -82,62 +115,152 @@ def generate_job_vectors_batch(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any
     return jobs
 
 
+def stack_vectors(vectors: List[Any], dim: int = VECTOR_DIM) -> np.ndarray:
+    # Stack a list of vectors (ndarrays or lists) into an (n, dim) float32 matrix.
+    # Missing / malformed vectors become zero rows (they score 0 similarity).
+    if vectors and all(isinstance(v, np.ndarray) and v.shape == (dim,) for v in vectors):
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
+    matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+    for i, vec in enumerate(vectors):
+        if vec is not None and len(vec) == dim:
+            matrix[i] = vec
+    return matrix
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    # L2-normalize each row; zero rows stay zero instead of producing NaNs.
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def build_job_matrix(global_vectors: np.ndarray, skill_vectors: np.ndarray) -> np.ndarray:
+    # Concatenate normalized [global | skill] job vectors into one (n, 2*dim) matrix,
+    # so a single matmul against a weighted user vector yields every hybrid score.
+    return np.hstack([_normalize_rows(global_vectors), _normalize_rows(skill_vectors)])
+
+
+def build_user_query(
+    user_vectors: Dict[str, Any],
+    skill_weight: float = 0.6,
+    global_weight: float = 0.4,
+) -> np.ndarray:
+    # Weighted, normalized [global | skill] user vector matching build_job_matrix's layout.
+    user = stack_vectors([user_vectors["global_vector"], user_vectors["skill_vector"]])
+    user = _normalize_rows(user)
+    return np.concatenate([user[0] * global_weight, user[1] * skill_weight])
+
+
+def score_job_matrix(
+    user_vectors: Dict[str, Any],
+    job_matrix: np.ndarray,
+    skill_weight: float = 0.6,
+    global_weight: float = 0.4,
+) -> np.ndarray:
+
+    # Score every job in one matmul.
+    # Score = (Skill Similarity * 0.6) + (Global Similarity * 0.4)
+    # Returns percentages (0-100) rounded to one decimal, as a float array.
+
+    if job_matrix.shape[0] == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    query = build_user_query(user_vectors, skill_weight, global_weight)
+    raw_scores = (job_matrix @ query).astype(np.float64)
+    return np.round(np.clip(raw_scores * 100, 0, 100), 1)
+
+
+def score_skill_variants(
+    global_vector: Any,
+    skill_vectors: np.ndarray,
+    job_matrix: np.ndarray,
+    skill_weight: float = 0.6,
+    global_weight: float = 0.4,
+) -> np.ndarray:
+
+    # Score k alternative skill vectors (same resume) against every job in one GEMM.
+    # Returns a (k, n_jobs) array on the same 0-100 scale as score_job_matrix.
+
+    skill_vectors = _normalize_rows(stack_vectors(list(skill_vectors)))
+    if job_matrix.shape[0] == 0 or skill_vectors.shape[0] == 0:
+        return np.zeros((skill_vectors.shape[0], job_matrix.shape[0]), dtype=np.float64)
+
+    global_part = _normalize_rows(stack_vectors([global_vector]))[0] * global_weight
+    queries = np.hstack([
+        np.broadcast_to(global_part, skill_vectors.shape),
+        skill_vectors * skill_weight,
+    ])
+    raw_scores = (queries @ job_matrix.T).astype(np.float64)
+    return np.round(np.clip(raw_scores * 100, 0, 100), 1)
+
+
+def summarize_scores(scores: np.ndarray) -> Dict[str, Any]:
+    # Market reach / average / high-match counts computed with array ops.
+    total = int(scores.shape[0])
+    if total == 0:
+        return {"market_reach": 0, "average_score": 0, "total_jobs": 0, "high_match_jobs": 0}
+
+    high_match_count = int(np.count_nonzero(scores >= HIGH_MATCH_THRESHOLD))
+    return {
+        "market_reach": round((high_match_count / total) * 100, 1),
+        "average_score": round(float(scores.mean()), 1),
+        "total_jobs": total,
+        "high_match_jobs": high_match_count,
+    }
+
+
 def calculate_match_score(
-    user_vectors: Dict[str, List[float]],
+    user_vectors: Dict[str, np.ndarray],
     job: Dict[str, Any],
     skill_weight: float = 0.6,
     global_weight: float = 0.4,
 ) -> float:
 
-    # Calculate hybrid match score for a single job.
-    # Score = (Skill Similarity * 0.6) + (Global Similarity * 0.4)
-    # Returns a percentage (0-100).
+    # Calculate hybrid match score for a single job (used by /vectors/calculate-score).
+    # Thin wrapper around the batched engine with a one-row job matrix.
 
-    skill_sim = cosine_similarity(
-        user_vectors["skill_vector"],
-        job.get("jd_skill_vector", [0.0] * 384)
-    )
-    global_sim = cosine_similarity(
-        user_vectors["global_vector"],
-        job.get("jd_global_vector", [0.0] * 384)
+    job_matrix = build_job_matrix(
+        stack_vectors([job.get("jd_global_vector")]),
+        stack_vectors([job.get("jd_skill_vector")]),
     )
-
-    raw_score = (skill_sim * skill_weight) + (global_sim * global_weight)
-    return round(max(0, min(100, raw_score * 100)), 1)
+    scores = score_job_matrix(user_vectors, job_matrix, skill_weight, global_weight)
+    return float(scores[0])
 
 
 def score_jobs_against_user(
-    user_vectors: Dict[str, List[float]],
+    user_vectors: Dict[str, np.ndarray],
     jobs: List[Dict[str, Any]],
     keep_vectors: bool = False
 ) -> Dict[str, Any]:
     # 1. Batch-encode all job vectors
-    jobs = generate_job_vectors_batch(jobs)
-
-    # 2. Score each job
-    for job in jobs:
-        job["match_score"] = calculate_match_score(user_vectors, job)
-
-    # 3. Remove raw vectors from output (unless requested)
-    if not keep_vectors:
+    if jobs:
+        global_vectors, skill_vectors = encode_job_matrices(jobs)
+    else:
+        global_vectors = skill_vectors = np.zeros((0, VECTOR_DIM), dtype=np.float32)
+
+    # 2. Score every job in a single matmul
+    job_matrix = build_job_matrix(global_vectors, skill_vectors)
+    scores = score_job_matrix(user_vectors, job_matrix)
+    for job, score in zip(jobs, scores.tolist()):
+        job["match_score"] = score
+
+    # 3. Attach raw vectors (float32 row views) only when requested
+    if keep_vectors:
+        for i, job in enumerate(jobs):
+            job["jd_global_vector"] = global_vectors[i]
+            job["jd_skill_vector"] = skill_vectors[i]
+    else:
         for job in jobs:
             job.pop("jd_global_vector", None)
             job.pop("jd_skill_vector", None)
 
-    # 4. Sort (highest match first)
-    jobs.sort(key=lambda j: j["match_score"], reverse=True)
+    # 4. Sort (highest match first, stable for ties)
+    order = np.argsort(-scores, kind="stable")
+    jobs = [jobs[i] for i in order]
 
     # 5. Market Reach
-    high_match_count = sum(1 for j in jobs if j["match_score"] >= 70)
-    market_reach = round((high_match_count / len(jobs)) * 100, 1) if jobs else 0
-    average_score = round(sum(j["match_score"] for j in jobs) / len(jobs), 1) if jobs else 0
+    summary = summarize_scores(scores)
 
-    logger.info(f"Scoring complete: Market Reach={market_reach}%, Avg={average_score}%")
+    logger.info(f"Scoring complete: Market Reach={summary['market_reach']}%, Avg={summary['average_score']}%")
 
-    return {
-        "jobs": jobs,
-        "market_reach": market_reach,
-        "average_score": average_score,
-        "total_jobs": len(jobs),
-        "high_match_jobs": high_match_count,
-    }
+    return {"jobs": jobs, **summary}
@@ -0,0 +1,162 @@
+# Benchmark — analytics_service.compute_analytics on 10k jobs
+# (compiled + memoized normalizers, single-pass aggregation vs. the legacy seven-pass version).
+
+# Usage (from backend/):  python -m benchmarks.bench_analytics
+# Synthetic jobs drawn from a small pool of titles / locations, like real result sets.
+
+
+import os
+import re
+import sys
+import json
+import time
+import random
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.services import analytics_service
+from app.services.analytics_service import SKILL_NOISE, INDIAN_STATES, CITY_ALIASES, compute_analytics
+
+NUM_JOBS = 10_000
+
+TITLES = [
+    "Data scientist- Bang/Hyd/Chennai-Hybrid-MNC", "Sr. Data Scientist", "Data Science - Data Scientist",
+    "Vice President - Lead Data Scientist (GenAI)", "AIML Engineer", "Jr. ML Engineer", "LLM Engineer",
+    "Senior NLP Engineer (Remote)", "Backend Developer", "Machine Learning Engineer - Python",
+]
+LOCATIONS = [
+    "Bengaluru, Karnataka", "Hyderabad, Chennai, Bengaluru", "Malad West Dely, Mumbai, Maharashtra",
+    "Amravati, Maharashtra (+1 other)", "India", "Gurgaon, Haryana", "Pune", "N/A", "Sector 62, Noida",
+]
+SKILLS = ["Python", "python", "SQL", "Machine Learning", "TensorFlow", "PyTorch", "AWS", "Docker", "ml", "Spark", "NLP", "Pandas"]
+
+
+def make_jobs(n: int):
+    rng = random.Random(0)
+    return [
+        {
+            "title": rng.choice(TITLES),
+            "company": f"Company {rng.randrange(300)}",
+            "location": rng.choice(LOCATIONS),
+            "description": rng.choice(["Remote-first team. ", "Hybrid role. ", "Office based. "]) + "Python and SQL. " * 40,
+            "skills": rng.sample(SKILLS, 5),
+            "match_score": round(rng.uniform(20, 98), 1),
+            "portal": rng.choice(["linkedin", "indeed", "naukri", "glassdoor"]),
+        }
+        for _ in range(n)
+    ]
+
+
+# Legacy implementation (inline pattern strings, one pass per counter)
+
+def legacy_normalize_locations(raw_location):
+    if not raw_location or raw_location == "N/A":
+        return ["Unknown"]
+    cleaned = re.sub(r"\(.*?\)", "", raw_location).strip()
+    parts = [p.strip() for p in cleaned.split(",") if p.strip()]
+    cities = []
+    for part in parts:
+        lower = part.lower().strip()
+        if lower in INDIAN_STATES:
+            continue
+        if lower in CITY_ALIASES:
+            cities.append(CITY_ALIASES[lower])
+        else:
+            if any(noise in lower for noise in ["dely", "west", "east", "north", "south", "sector"]):
+                continue
+            cities.append(part.strip().title())
+    unique = list(dict.fromkeys(cities))
+    return unique if unique else ["Unknown"]
+
+
+def legacy_normalize_title(raw_title):
+    if not raw_title:
+        return "Unknown"
+    title = raw_title.strip()
+    title = re.sub(r"\s*[-–—]\s*(Bang|Hyd|Chennai|Hybrid|MNC|Immediate|Across|Python).*$", "", title, flags=re.IGNORECASE)
+    title = re.sub(r"\(.*?\)", "", title).strip()
+    title = re.sub(r"^(vice\s+president|vp)\s*[-–—]\s*", "", title, flags=re.IGNORECASE).strip()
+    title = re.sub(r"\bSr\.?\s", "Senior ", title, flags=re.IGNORECASE)
+    title = re.sub(r"\bJr\.?\s", "Junior ", title, flags=re.IGNORECASE)
+    title = re.sub(r"\bAI\s*/?\s*ML\b", "AI/ML", title, flags=re.IGNORECASE)
+    title = re.sub(r"\bAIML\b", "AI/ML", title, flags=re.IGNORECASE)
+    title = re.sub(r"^Data\s+Science\s*[-–—]\s*", "", title, flags=re.IGNORECASE).strip()
+    title = re.sub(r"\s+", " ", title).strip()
+    title = re.sub(r"\.\s", " ", title)
+    title = title.rstrip("- .").strip().title()
+    for broken, fixed in (("Ai/Ml", "AI/ML"), ("Ai ", "AI "), ("Ml ", "ML "), ("Llm", "LLM"), ("Nlp", "NLP")):
+        title = title.replace(broken, fixed)
+    return title if title else "Unknown"
+
+
+def legacy_compute_analytics(jobs):
+    from ml.utils.skill_standardizer import standardizer
+
+    skill_counter = Counter()
+    for job in jobs:
+        skills = job.get("skills", [])
+        if isinstance(skills, str):
+            skills = json.loads(skills)
+        if standardizer:
+            skills = standardizer.standardize(skills)
+        for skill in skills:
+            clean = skill.lower().strip()
+            if clean and clean not in SKILL_NOISE and len(clean) > 1:
+                skill_counter[clean] += 1
+
+    location_counter = Counter(city for job in jobs for city in legacy_normalize_locations(job.get("location", "")))
+    company_counter = Counter(
+        job.get("company", "").strip() for job in jobs
+        if job.get("company", "").strip() and job.get("company", "").strip() != "N/A"
+    )
+    role_counter = Counter(
+        t for t in (legacy_normalize_title(job.get("title", "")) for job in jobs) if t and t != "Unknown"
+    )
+    score_counter = Counter(analytics_service._score_bucket(job.get("match_score", 0)) for job in jobs)
+    portal_counter = Counter(job.get("portal", "unknown") for job in jobs)
+    total_score = sum(job.get("match_score", 0) for job in jobs)
+    work_mode_counter = Counter()
+    for job in jobs:
+        text = (job.get("location", "") + " " + job.get("title", "") + " " + job.get("description", "")[:500]).lower()
+        work_mode_counter["Remote" if "remote" in text else "Hybrid" if "hybrid" in text else "On-site"] += 1
+    return skill_counter, location_counter, company_counter, role_counter, score_counter, portal_counter, total_score, work_mode_counter
+
+
+def timed(fn, *args, repeat: int = 3, setup=None) -> float:
+    # Best of `repeat` runs
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def clear_caches():
+    analytics_service._normalize_title_cached.cache_clear()
+    analytics_service._normalize_locations_cached.cache_clear()
+    analytics_service._skill_canonicalizer.cache_clear()
+
+
+def main():
+    jobs = make_jobs(NUM_JOBS)
+    legacy_compute_analytics(jobs[:10])  # Load the skill standardizer outside the timings
+
+    legacy = timed(legacy_compute_analytics, jobs)
+
+    cold = timed(compute_analytics, jobs, setup=clear_caches)
+    warm = timed(compute_analytics, jobs)
+
+    print(f"{NUM_JOBS:,} jobs")
+    print(f"  legacy (7 passes, inline patterns) : {legacy * 1000:8.1f} ms")
+    print(f"  single pass, cold caches           : {cold * 1000:8.1f} ms  ({legacy / cold:.2f}x)")
+    print(f"  single pass, warm caches           : {warm * 1000:8.1f} ms  ({legacy / warm:.2f}x)")
+    print(f"  title cache: {analytics_service._normalize_title_cached.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
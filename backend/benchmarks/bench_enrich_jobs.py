@@ -0,0 +1,67 @@
+# Benchmark — job enrichment: per-job nlp(text) vs. batched nlp.pipe.
+
+# Usage (from backend/):  python -m benchmarks.bench_enrich_jobs [results.json]
+# Uses a scraper results file if given, otherwise 200 synthetic descriptions.
+# Requires the spaCy skill model (downloaded from the HF hub on first run).
+
+
+import os
+import sys
+import json
+import copy
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from ml.ner.inference import resume_parser
+from app.services.job_service import extract_skills_from_job, enrich_job_listings
+
+NUM_JOBS = 200
+
+SAMPLE_DESCRIPTION = (
+    "We are looking for a Data Scientist with 3+ years of experience in Python, SQL and "
+    "machine learning. Hands-on experience with pandas, scikit-learn, TensorFlow or PyTorch "
+    "is required. Familiarity with AWS, Docker, Kubernetes and Airflow is a plus. "
+    "You will build dashboards in Tableau or Power BI and work with Spark on large datasets. "
+)
+
+
+def load_jobs(path: str = None):
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        jobs = data.get("jobs", data) if isinstance(data, dict) else data
+    else:
+        jobs = [
+            {"title": f"Data Scientist {i}", "description": SAMPLE_DESCRIPTION * (1 + i % 4)}
+            for i in range(NUM_JOBS)
+        ]
+    for job in jobs:
+        job["skills"] = []  # Force NER on every job
+    return jobs
+
+
+def main():
+    jobs = load_jobs(sys.argv[1] if len(sys.argv) > 1 else None)
+    resume_parser.load_model()
+    print(f"Pipeline: {resume_parser.nlp.pipe_names} (disabled for extraction: {resume_parser._disabled_pipes})")
+
+    sequential_jobs = copy.deepcopy(jobs)
+    start = time.perf_counter()
+    for job in sequential_jobs:
+        extract_skills_from_job(job)
+    sequential = time.perf_counter() - start
+
+    batched_jobs = copy.deepcopy(jobs)
+    start = time.perf_counter()
+    enrich_job_listings(batched_jobs)
+    batched = time.perf_counter() - start
+
+    same = all(a.get("skills") == b.get("skills") for a, b in zip(sequential_jobs, batched_jobs))
+    print(f"{len(jobs)} jobs | per-job: {sequential:.2f}s | nlp.pipe: {batched:.2f}s | "
+          f"speedup {sequential / batched:.2f}x | identical skills: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Benchmark — crud.save_jobs_batch throughput (bulk executemany vs. legacy per-row inserts).
+
+# Usage (from backend/):  python -m benchmarks.bench_save_jobs_batch
+# Runs against a throwaway database in a temp directory.
+
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.db import database, crud
+from app.db.database import transaction, serialize_vector, VECTOR_DIM
+
+SIZES = [100, 1_000, 10_000]
+
+
+def make_jobs(n: int):
+    rng = np.random.default_rng(0)
+    jobs, vectors = [], []
+    for i in range(n):
+        jobs.append({
+            "title": f"Data Scientist {i}",
+            "company": f"Company {i % 50}",
+            "location": "Bengaluru, Karnataka",
+            "description": "Python, SQL and machine learning. " * 40,
+            "skills": ["python", "sql", "pandas"],
+            "link": f"https://example.com/jobs/{i}",
+            "portal": "linkedin",
+            "match_score": round(random.uniform(30, 95), 1),
+            "industry": "IT Services",
+            "skills_source": "ml_extracted",
+        })
+        vectors.append({
+            "global_vector": rng.random(VECTOR_DIM, dtype=np.float32),
+            "skill_vector": rng.random(VECTOR_DIM, dtype=np.float32),
+        })
+    return jobs, vectors
+
+
+def legacy_save_jobs_batch(search_id, jobs, job_vectors):
+    # The pre-bulk implementation: one INSERT + lastrowid + vec INSERT per job.
+    with transaction() as conn:
+        for i, job in enumerate(jobs):
+            cursor = conn.execute(
+                """INSERT INTO jobs (search_id, title, company, location, description, skills, url, portal, match_score, metadata)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    search_id, job.get("title", ""), job.get("company", ""), job.get("location", ""),
+                    job.get("description", ""), json.dumps(job.get("skills", [])),
+                    job.get("link") or job.get("url") or "", job.get("portal", ""), job.get("match_score", 0),
+                    json.dumps({k: v for k, v in job.items() if k not in (
+                        "title", "company", "location", "description", "skills",
+                        "url", "portal", "match_score", "jd_global_vector", "jd_skill_vector"
+                    )}),
+                ),
+            )
+            vecs = job_vectors[i]
+            conn.execute(
+                "INSERT INTO vec_jobs (job_id, global_vector, skill_vector) VALUES (?, ?, ?)",
+                (cursor.lastrowid, serialize_vector(vecs["global_vector"]), serialize_vector(vecs["skill_vector"])),
+            )
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp(prefix="skillfit_bench_")
+    database.DB_DIR = tmp_dir
+    database.DB_PATH = os.path.join(tmp_dir, "skillfit.db")
+    database.init_db()
+
+    print(f"{'jobs':>7} | {'legacy (jobs/s)':>16} | {'bulk (jobs/s)':>14} | speedup")
+    print("-" * 56)
+    for n in SIZES:
+        jobs, vectors = make_jobs(n)
+        crud.save_search(f"legacy-{n}", None, "bench", "", [])
+        crud.save_search(f"bulk-{n}", None, "bench", "", [])
+
+        legacy = timed(legacy_save_jobs_batch, f"legacy-{n}", jobs, vectors)
+        bulk = timed(crud.save_jobs_batch, f"bulk-{n}", jobs, vectors)
+        print(f"{n:>7} | {n / legacy:>16,.0f} | {n / bulk:>14,.0f} | {legacy / bulk:.2f}x")
+
+    database.close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
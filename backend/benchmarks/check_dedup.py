@@ -0,0 +1,117 @@
+# Behavioral check — dedup_service.JobDeduplicator on realistic cross-portal variants.
+# (the same posting as LinkedIn / Naukri / Indeed render it, plus look-alikes that must stay apart)
+
+# Usage (from backend/):  python -m benchmarks.check_dedup
+# Prints one line per case and exits non-zero if any case merges (or fails to merge) wrongly.
+
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from app.services.dedup_service import JobDeduplicator
+
+SHORT_JD = (
+    "We are hiring a data scientist to build forecasting models on retail sales data "
+    "using Python SQL and Spark and present findings to business stakeholders weekly"
+)
+LONG_JD = (
+    "About the role: you will own the end to end machine learning lifecycle for our credit risk "
+    "products, from problem framing and feature engineering to deployment and monitoring. "
+    "You will work closely with product managers, data engineers and the risk team to ship "
+    "models that decide millions of loan applications every month. Responsibilities include "
+    "designing experiments, building training pipelines in Python and Spark, maintaining model "
+    "documentation for regulators, and mentoring two junior scientists. Requirements: four or "
+    "more years of experience in applied machine learning, strong SQL, hands on experience with "
+    "gradient boosting and deep learning frameworks, and clear written communication. Experience "
+    "with AWS SageMaker, Airflow or feature stores is a plus."
+)
+BOILERPLATE = (
+    " We are an equal opportunity employer and value diversity at our company. We do not "
+    "discriminate on the basis of race, religion, gender, age or disability."
+)
+OTHER_JD = (
+    "Join our marketing analytics team to measure campaign performance across channels. You will "
+    "build attribution models, maintain dashboards in Tableau, run A/B tests with the growth team "
+    "and translate results into budget recommendations for regional marketing leads every quarter."
+)
+
+
+def job(portal, title, company, location, description="", link=None):
+    return {
+        "portal": portal,
+        "title": title,
+        "company": company,
+        "location": location,
+        "description": description,
+        "link": link or f"https://{portal}.example/{abs(hash((title, company, location, description))) % 10**8}",
+    }
+
+
+# (name, first job, second job, should merge)
+CASES = [
+    ("title + company suffix variants, same JD",
+     job("linkedin", "Senior Data Scientist", "Acme Analytics Pvt. Ltd.", "Bengaluru, Karnataka", LONG_JD),
+     job("naukri", "Sr. Data Scientist", "Acme Analytics", "Bangalore", LONG_JD),
+     True),
+    ("JD with / without EEO boilerplate",
+     job("linkedin", "Machine Learning Engineer", "Acme Analytics", "Pune", LONG_JD + BOILERPLATE),
+     job("indeed", "ML Engineer - Credit Risk", "Acme Analytics Inc.", "Pune, Maharashtra", LONG_JD),
+     True),
+    ("short JD with two inserted words",
+     job("linkedin", "Data Scientist", "Retailco", "Hyderabad", SHORT_JD),
+     job("naukri", "Data Scientist (Retail)", "RetailCo Limited", "Hyderabad, Telangana",
+         SHORT_JD.replace("sales data", "sales and inventory data")),
+     True),
+    ("no description, same title, other portal, same city",
+     job("linkedin", "Data Engineer", "Acme Analytics", "Chennai"),
+     job("indeed", "Data Engineer", "Acme Analytics Ltd", "Chennai, Tamil Nadu"),
+     True),
+    ("no description, same link",
+     job("google", "Data Engineer", "Acme Analytics", "India", link="https://acme.example/jobs/42"),
+     job("google", "Data Engineer", "Acme Analytics", "India", link="https://acme.example/jobs/42"),
+     True),
+    ("same JD, different offices",
+     job("linkedin", "Senior Data Scientist", "Acme Analytics", "Bengaluru", LONG_JD),
+     job("naukri", "Senior Data Scientist", "Acme Analytics", "Gurgaon, Haryana", LONG_JD),
+     False),
+    ("no description, same portal (two openings)",
+     job("naukri", "Data Engineer", "Acme Analytics", "Chennai", link="https://naukri.example/101"),
+     job("naukri", "Data Engineer", "Acme Analytics", "Chennai", link="https://naukri.example/102"),
+     False),
+    ("no description, no known city",
+     job("linkedin", "Data Engineer", "Acme Analytics", "India"),
+     job("indeed", "Data Engineer", "Acme Analytics", "N/A"),
+     False),
+    ("same title + company, unrelated JD",
+     job("linkedin", "Data Scientist", "Acme Analytics", "Mumbai", LONG_JD),
+     job("indeed", "Data Scientist", "Acme Analytics", "Mumbai", OTHER_JD),
+     False),
+    ("same JD, different company",
+     job("linkedin", "Senior Data Scientist", "Acme Analytics", "Bengaluru", LONG_JD),
+     job("naukri", "Senior Data Scientist", "Globex", "Bengaluru", LONG_JD),
+     False),
+]
+
+
+def run_case(first, second) -> bool:
+    deduplicator = JobDeduplicator(embedding_threshold=0)
+    deduplicator.add(deduplicator.fingerprint(first))
+    return deduplicator.add(deduplicator.fingerprint(second)) is not None
+
+
+def main() -> int:
+    failures = 0
+    for name, first, second, expected in CASES:
+        merged = run_case(dict(first), dict(second))
+        ok = merged == expected
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {'merged' if merged else 'kept  '}  {name}")
+    print(f"\n{len(CASES) - failures}/{len(CASES)} cases as expected")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -63,6 +63,8 @@ export default function Dashboard() {
                     clearInterval(interval);
                     setError("Search failed. Please try again.");
                     setLoading(false);
+                } else if (res.status === 'queued') {
+                    setStatus(`Waiting in queue (position ${res.queue_position ?? 1})...`);
                 } else {
                     if (res.logs && res.logs.length > 0) {
                         const scanLogs = [...res.logs].reverse();
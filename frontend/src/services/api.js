@@ -23,6 +23,7 @@ export const endpoints = {
   confirmSkills: '/profile/embed',
   searchJobs: '/jobs/search',
   getStatus: (taskId) => `/jobs/status/${taskId}`,
+  streamTask: (taskId) => `/jobs/stream/${taskId}`,
   getResults: (taskId) => `/jobs/results/${taskId}`,
   getAnalytics: (taskId) => `/jobs/analytics/${taskId}`,
   simulate: (searchId) => `/jobs/simulate/${searchId}`,
@@ -0,0 +1,132 @@
+# Embedding Cache — content-addressed store for sentence embeddings.
+
+# Keys are sha256(model name + cleaned text), so the same job posting or skill
+# string is only ever encoded once per model. Lookups go through an in-memory
+# LRU first and fall back to a SQLite file stored next to skillfit.db.
+
+
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../data"))
+CACHE_PATH = os.path.join(CACHE_DIR, "embedding_cache.db")
+
+
+class EmbeddingCache:
+    # Two-tier (memory LRU -> SQLite) cache of float32 embeddings.
+
+    def __init__(self, model_name: str, db_path: str = CACHE_PATH, max_memory_items: int = 10000):
+        self.model_name = model_name
+        self.db_path = db_path
+        self.max_memory_items = max_memory_items
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _get_conn(self) -> Optional[sqlite3.Connection]:
+        # Lazily open the SQLite store; on failure the cache degrades to memory-only.
+        if self._conn is not None:
+            return self._conn
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        except Exception as e:
+            logger.error(f"Embedding cache unavailable at {self.db_path}: {e}")
+        return self._conn
+
+    def make_key(self, cleaned_text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{cleaned_text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        # Caller must hold the lock.
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        # Return every cached vector among `keys`; absent keys count as misses.
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            pending = []
+            for key in dict.fromkeys(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self.memory_hits += 1
+                else:
+                    pending.append(key)
+
+            conn = self._get_conn() if pending else None
+            if conn is not None:
+                # Stay well under SQLite's bound-parameter limit.
+                for start in range(0, len(pending), 500):
+                    chunk = pending[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        found[key] = vector
+                        self._remember(key, vector)
+                        self.disk_hits += 1
+
+            self.misses += sum(1 for key in pending if key not in found)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        if not items:
+            return
+        with self._lock:
+            rows = []
+            for key, vector in items.items():
+                vector = np.ascontiguousarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, vector.tobytes()))
+
+            conn = self._get_conn()
+            if conn is None:
+                return
+            try:
+                conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+                conn.commit()
+            except Exception as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_items": len(self._memory),
+            }
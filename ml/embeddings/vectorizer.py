@@ -1,27 +1,83 @@
 # Vector Engine — ML Layer for generating text embeddings.
 
 # Uses 'sentence-transformers/all-MiniLM-L6-v2' (~80MB, 384 dimensions).
+# Long texts can be split on tokenizer boundaries into windows that fit the model
+# (encode_chunked_batch) instead of being silently truncated at max_seq_length.
 
 
 import os
 os.environ["USE_TF"] = "0"  # Prevent transformers from importing TensorFlow
 
 import re
+import time
 import unicodedata
 import logging
 import numpy as np
 from sentence_transformers import SentenceTransformer, CrossEncoder
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+
+from ml.embeddings.cache import EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
 
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+CHUNK_OVERLAP_TOKENS = 32   # Tokens shared by consecutive windows, so a requirement isn't cut in half
+CROSS_ENCODER_CHUNK_TOKENS = 256  # JD window per cross-encoder pair (the rest of 512 is the resume's)
+
+
+def split_token_windows(tokenizer, texts: List[str], window: int, max_chunks: int) -> List[List[str]]:
+
+    # Split each text into at most `max_chunks` pieces of <= `window` tokens, cut on word
+    # boundaries (never inside a word-piece). Texts that already fit stay a single piece.
+    # Pieces are slices of the original text, so they hit the same embedding cache keys.
+
+    try:
+        encoded = tokenizer(texts, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        all_offsets = encoded["offset_mapping"]
+    except Exception as e:
+        logger.warning(f"Tokenizer offsets unavailable, not chunking: {e}")
+        return [[text] for text in texts]
+
+    stride = window - min(CHUNK_OVERLAP_TOKENS, window // 4)
+    chunks = []
+    for text, offsets in zip(texts, all_offsets):
+        n = len(offsets)
+        if n <= window or max_chunks <= 1:
+            chunks.append([text])
+            continue
+
+        def is_word_start(i: int) -> bool:
+            return i == 0 or i >= n or offsets[i][0] != offsets[i - 1][1]
+
+        pieces = []
+        start = 0
+        while start < n and len(pieces) < max_chunks:
+            end = min(start + window, n)
+            while end < n and end > start + 1 and not is_word_start(end):
+                end -= 1
+            pieces.append(text[offsets[start][0]:offsets[end - 1][1]])
+            if end >= n:
+                break
+            start = min(start + stride, end)
+            while start < end and not is_word_start(start):
+                start += 1
+        chunks.append(pieces)
+    return chunks
+
+
 class VectorEngine:
     # wrapper around the Sentence Transformer model.
+    # Embeddings are memoized in a content-addressed EmbeddingCache, so repeated
+    # postings and skill strings skip the encoder entirely.
 
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.model = None
         self._loaded = False
+        self.cache = EmbeddingCache(EMBEDDING_MODEL_NAME) if use_cache else None
+        self.encoded_texts = 0
+        self.encode_seconds = 0.0
 
     def load_model(self):
         # Lazy-load the embedding model.
@@ -30,7 +86,7 @@ class VectorEngine:
 
         try:
             logger.info("Loading embedding model (all-MiniLM-L6-v2)...")
-            self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+            self.model = SentenceTransformer(EMBEDDING_MODEL_NAME)
             self._loaded = True
             logger.info("Embedding model loaded successfully.")
         except Exception as e:
@@ -64,31 +120,100 @@ class VectorEngine:
 
         return text
 
-    def encode(self, text: str) -> List[float]:
-        # Encode a single text string into a 384-dim vector.
+    def _encode_cleaned(self, cleaned: List[str]) -> np.ndarray:
+        # Encode already-cleaned texts, serving repeats from the cache.
+        # Only cache misses are sent to SentenceTransformer.
+        vectors = np.zeros((len(cleaned), 384), dtype=np.float32)
+        if not cleaned:
+            return vectors
+
+        if self.cache is None:
+            return self._run_model(cleaned)
+
+        keys = [self.cache.make_key(t) for t in cleaned]
+        cached = self.cache.get_many(keys)
+
+        # Deduplicate misses so identical texts in one batch are encoded once
+        missing = list(dict.fromkeys(t for t, k in zip(cleaned, keys) if k not in cached))
+        if missing:
+            fresh = self._run_model(missing)
+            new_items = {self.cache.make_key(t): v for t, v in zip(missing, fresh)}
+            self.cache.put_many(new_items)
+            cached.update(new_items)
+
+        for i, key in enumerate(keys):
+            vectors[i] = cached[key]
+        return vectors
+
+    def _run_model(self, texts: List[str]) -> np.ndarray:
+        start = time.perf_counter()
+        vectors = self.model.encode(texts, normalize_embeddings=True, batch_size=32)
+        self.encode_seconds += time.perf_counter() - start
+        self.encoded_texts += len(texts)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def encode(self, text: str) -> np.ndarray:
+        # Encode a single text string into a 384-dim float32 vector.
         self.load_model()
         if not self.model:
-            return [0.0] * 384
+            return np.zeros(384, dtype=np.float32)
 
         cleaned = self.clean_text(text)
         if not cleaned:
-            return [0.0] * 384
+            return np.zeros(384, dtype=np.float32)
 
-        vector = self.model.encode(cleaned, normalize_embeddings=True)
-        return vector.tolist()
+        return self._encode_cleaned([cleaned])[0]
 
-    def encode_batch(self, texts: List[str]) -> List[List[float]]:
-        # Encode multiple texts at once
+    def encode_batch(self, texts: List[str]) -> np.ndarray:
+        # Encode multiple texts at once into an (n, 384) float32 matrix.
         self.load_model()
         if not self.model:
-            return [[0.0] * 384] * len(texts)
+            return np.zeros((len(texts), 384), dtype=np.float32)
 
         cleaned = [self.clean_text(t) for t in texts]
         # Replace empty strings with a placeholder to avoid errors
         cleaned = [t if t else "empty" for t in cleaned]
 
-        vectors = self.model.encode(cleaned, normalize_embeddings=True, batch_size=32)
-        return vectors.tolist()
+        return self._encode_cleaned(cleaned)
+
+    def encode_chunked_batch(self, texts: List[str], max_chunks: int = 4, pooling: str = "max") -> np.ndarray:
+
+        # encode_batch for long texts: each text is split into token windows, every window of
+        # every text is encoded in one pass, and the window vectors are pooled per text
+        # ("max" or "mean") and re-normalized. Texts that fit in one window encode exactly
+        # as with encode_batch. max_chunks bounds the encoder work per text.
+
+        self.load_model()
+        if not self.model or not texts:
+            return np.zeros((len(texts), 384), dtype=np.float32)
+
+        cleaned = [self.clean_text(t) or "empty" for t in texts]
+        window = max(16, self.model.max_seq_length - 2)  # [CLS] + [SEP]
+        chunked = split_token_windows(self.model.tokenizer, cleaned, window, max(1, max_chunks))
+
+        vectors = self._encode_cleaned([piece for pieces in chunked for piece in pieces])
+        counts = np.array([len(pieces) for pieces in chunked])
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        if pooling == "mean":
+            pooled = np.add.reduceat(vectors, starts, axis=0) / counts[:, None]
+        else:
+            pooled = np.maximum.reduceat(vectors, starts, axis=0)
+
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        pooled = np.divide(pooled, norms, out=np.zeros_like(pooled), where=norms > 0)
+        return pooled.astype(np.float32, copy=False)
+
+    def cache_stats(self) -> Dict[str, float]:
+        # Cache hit/miss counters plus an estimate of encoder time saved.
+        stats = self.cache.stats() if self.cache else {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        avg_seconds = self.encode_seconds / self.encoded_texts if self.encoded_texts else 0.0
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        return {
+            **stats,
+            "encoded_texts": self.encoded_texts,
+            "encode_seconds": round(self.encode_seconds, 3),
+            "estimated_seconds_saved": round(hits * avg_seconds, 3),
+        }
 
 
 class CrossEncoderEngine:
@@ -111,28 +236,37 @@ class CrossEncoderEngine:
             logger.error(f"Failed to load Cross-Encoder model: {e}")
             self.model = None
 
-    def predict(self, pairs: List[Tuple[str, str]]) -> List[float]:
+    def predict(self, pairs: List[Tuple[str, str]], max_chunks: int = 1) -> List[float]:
         """
         Score a list of (text1, text2) pairs.
         Returns a list of scores (higher is more similar).
+        With max_chunks > 1, a long text1 is split into token windows instead of being cut
+        at 1500 chars; all windows are scored in one call and each pair keeps its best window.
         """
         self.load_model()
-        if not self.model:
+        if not self.model or not pairs:
             return [0.0] * len(pairs)
 
         # Intelligent Truncation: Standard CE models (like MS-MARCO) have a 512 token limit.
         # If text1 is long, text2 is entirely cut off.
         # We truncate both to a safe length (approx 1000 chars each) to ensure both are seen.
-        processed_pairs = []
-        for t1, t2 in pairs:
+        if max_chunks > 1:
+            firsts = split_token_windows(
+                self.model.tokenizer, [t1 or "" for t1, _ in pairs], CROSS_ENCODER_CHUNK_TOKENS, max_chunks
+            )
+        else:
             # Take first 1500 chars of each side (~300-400 words)
-            p1 = t1[:1500] if t1 else ""
+            firsts = [[t1[:1500] if t1 else ""] for t1, _ in pairs]
+
+        processed_pairs = []
+        for pieces, (_, t2) in zip(firsts, pairs):
             p2 = t2[:1500] if t2 else ""
-            processed_pairs.append((p1, p2))
+            processed_pairs.extend((p1, p2) for p1 in pieces)
+
+        chunk_scores = np.asarray(self.model.predict(processed_pairs), dtype=np.float64)
+        counts = np.array([len(pieces) for pieces in firsts])
+        scores = np.maximum.reduceat(chunk_scores, np.concatenate([[0], np.cumsum(counts)[:-1]]))
 
-        scores = self.model.predict(processed_pairs)
-        
-        import numpy as np
         def sigmoid(x):
             # Calibrated for ms-marco-MiniLM-L-6-v2:
             # -11 (unrelated) -> ~5%
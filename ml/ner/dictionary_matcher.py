@@ -0,0 +1,138 @@
+# Dictionary Matcher — model-free fast path for skill extraction.
+
+# Compiles tech_skills.json + tech_aliases.json into a token trie once, then finds
+# skills with a single left-to-right pass over the text (longest match wins).
+# Matches are returned as canonical names (aliases resolved via tech_aliases.json).
+# Intended for job descriptions, where the scraper already provides structure and
+# loading / running the full spaCy NER model dominates latency.
+
+
+import os
+import re
+import sys
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+if getattr(sys, 'frozen', False):
+    SKILLS_JSON_PATH = os.path.join(sys._MEIPASS, "ml", "ner", "tech_skills.json")
+    ALIASES_JSON_PATH = os.path.join(sys._MEIPASS, "ml", "data", "tech_aliases.json")
+else:
+    SKILLS_JSON_PATH = os.path.join(os.path.dirname(__file__), "tech_skills.json")
+    ALIASES_JSON_PATH = os.path.join(os.path.dirname(__file__), "../data/tech_aliases.json")
+
+# Tokens keep in-word '.', '-', "'" (node.js, scikit-learn, .net) and trailing '+'/'#'
+# (c++, c#). '/' is its own token so "ci/cd" matches while "python/java" yields both.
+TOKEN_RE = re.compile(r"\.?[a-z0-9](?:[a-z0-9_]|[.\-'](?=[a-z0-9]))*[+#]*|/", re.IGNORECASE)
+
+_TERMINAL = "\0"  # Trie key holding the canonical skill for a complete term
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text)
+
+
+class DictionaryMatcher:
+
+    # Token-trie matcher over the skill dictionary.
+    # Very short purely-alphabetic terms ("r", "c", "go", "ai", "py") are ambiguous
+    # in prose, so they only match when written in uppercase ("R", "C", "GO", "AI").
+
+    def __init__(self, skills_path: str = SKILLS_JSON_PATH, aliases_path: str = ALIASES_JSON_PATH):
+        self.skills_path = skills_path
+        self.aliases_path = aliases_path
+        self._trie: Dict[str, dict] = {}
+        self._max_depth = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        # Build the trie once (thread-safe, idempotent).
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+
+            canonical_of: Dict[str, str] = {}
+            try:
+                with open(self.aliases_path, "r", encoding="utf-8") as f:
+                    for item in json.load(f).get("technologies", []):
+                        canonical = item["canonical"].lower().strip()
+                        canonical_of[canonical] = canonical
+                        for alias in item.get("aliases", []):
+                            canonical_of[alias.lower().strip()] = canonical
+            except Exception as e:
+                logger.error(f"Failed to load skill aliases for dictionary matcher: {e}")
+
+            try:
+                with open(self.skills_path, "r", encoding="utf-8") as f:
+                    for term in json.load(f).get("skills", []):
+                        term = term.lower().strip()
+                        canonical_of.setdefault(term, term)
+            except Exception as e:
+                logger.error(f"Failed to load skill dictionary for dictionary matcher: {e}")
+
+            for term, canonical in canonical_of.items():
+                self._add(term, canonical)
+
+            self._loaded = True
+            logger.info(f"Dictionary matcher compiled {len(canonical_of)} terms (max {self._max_depth} tokens).")
+
+    def _add(self, term: str, canonical: str):
+        tokens = [t.lower() for t in tokenize(term)]
+        if not tokens:
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_TERMINAL] = canonical
+        self._max_depth = max(self._max_depth, len(tokens))
+
+    @staticmethod
+    def _is_ambiguous(raw_token: str) -> bool:
+        # Short alphabetic tokens must be uppercase in the source to count.
+        return len(raw_token) <= 2 and raw_token.isalpha() and not raw_token.isupper()
+
+    def match(self, text: str) -> List[str]:
+        # Canonical skills found in `text`, sorted and deduplicated.
+        self.load()
+        if not text:
+            return []
+
+        raw_tokens = tokenize(text)
+        tokens = [t.lower() for t in raw_tokens]
+        found: Set[str] = set()
+
+        i = 0
+        n = len(tokens)
+        while i < n:
+            node = self._trie
+            best: Optional[str] = None
+            best_end = i
+            j = i
+            while j < n and j - i < self._max_depth:
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if _TERMINAL in node and not (j - i == 1 and self._is_ambiguous(raw_tokens[i])):
+                    best, best_end = node[_TERMINAL], j
+
+            if best is not None:
+                found.add(best)
+                i = best_end
+            else:
+                i += 1
+
+        return sorted(found)
+
+    def match_batch(self, texts: List[str]) -> List[List[str]]:
+        return [self.match(text) for text in texts]
+
+
+# Main Instance (compiled lazily on first match)
+dictionary_matcher = DictionaryMatcher()
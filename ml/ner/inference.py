@@ -3,7 +3,7 @@ import json
 import logging
 import spacy
 from huggingface_hub import snapshot_download
-from typing import Dict, List, Any
+from typing import Dict, Iterable, List, Any
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +18,10 @@ else:
 
 SKILLS_JSON_PATH = os.path.join(BASE_DIR, "ml", "ner", "tech_skills.json") if getattr(sys, 'frozen', False) else os.path.join(os.path.dirname(__file__), "tech_skills.json")
 
+# Pipeline components that never contribute to doc.ents — skipped during extraction.
+# (tok2vec / transformer stay enabled: the NER component listens to them.)
+UNUSED_PIPES = {"tagger", "parser", "lemmatizer", "attribute_ruler", "morphologizer", "senter", "textcat"}
+
 
 
 class TwoLayerExtractor:
@@ -31,6 +35,7 @@ class TwoLayerExtractor:
     def __init__(self):
         self.nlp = None
         self._model_loaded = False
+        self._disabled_pipes: List[str] = []
 
     def load_model(self):
         if self._model_loaded:
@@ -45,6 +50,8 @@ class TwoLayerExtractor:
             # 2. Add the Dictionary Layer
             logger.info("Loading Skill Dictionary...")
             self._attach_dictionary_layer()
+
+            self._disabled_pipes = [name for name in self.nlp.pipe_names if name in UNUSED_PIPES]
             
             self._model_loaded = True
             logger.info("Model loaded successfully.")
@@ -84,24 +91,54 @@ class TwoLayerExtractor:
             "experience": self._find_experience(text)
         }
 
+    def extract_skills_batch(
+        self,
+        texts: Iterable[str],
+        batch_size: int = 32,
+        n_process: int = 1,
+    ) -> List[List[str]]:
+        # Batch skill extraction via nlp.pipe (skills only, no experience regexes).
+        # Returns one sorted skill list per input text, in order.
+        self.load_model()
+        texts = list(texts)
+        if not self.nlp:
+            return [[] for _ in texts]
+
+        try:
+            docs = self.nlp.pipe(
+                texts,
+                batch_size=batch_size,
+                n_process=n_process,
+                disable=self._disabled_pipes,
+            )
+            return [self._skills_from_doc(doc) for doc in docs]
+        except Exception as e:
+            # One bad document shouldn't sink the whole batch
+            logger.warning(f"Batch extraction failed ({e}); falling back to per-document.")
+            return [self._run_pipeline(text) for text in texts]
+
     def _run_pipeline(self, text: str) -> List[str]:
         if not self.nlp: return []
 
         try:
-            doc = self.nlp(text)
-            skills = set()
+            doc = self.nlp(text, disable=self._disabled_pipes)
+            return self._skills_from_doc(doc)
+        except Exception:
+            return []
+
+    @staticmethod
+    def _skills_from_doc(doc) -> List[str]:
+        skills = set()
 
-            for ent in doc.ents:
-                if ent.label_ in ["SKILL", "SKILLS", "PRODUCT", "ORG"]:
+        for ent in doc.ents:
+            if ent.label_ in ["SKILL", "SKILLS", "PRODUCT", "ORG"]:
+            
+                clean = ent.text.strip().strip(".,;:()")
                 
-                    clean = ent.text.strip().strip(".,;:()")
-                    
-                    if len(clean) >= 2 and not clean.replace(" ", "").isdigit():
-                        skills.add(clean)
+                if len(clean) >= 2 and not clean.replace(" ", "").isdigit():
+                    skills.add(clean)
 
-            return sorted(skills, key=str.lower)
-        except Exception:
-            return []
+        return sorted(skills, key=str.lower)
 
     def _find_experience(self, text: str) -> Dict[str, Any]:
         #Not Using Anymore
@@ -1,9 +1,9 @@
-import json
 import sys
-import time
-import random
 import re
-from playwright.sync_api import sync_playwright
+from browser_pool import get_browser_pool
+from scraper_output import JobWriter
+
+DETAIL_CONCURRENCY = 3  # Detail pages open at once in this search's browser context
 
 def strip_html(text):
     if not text:
@@ -94,29 +94,61 @@ JS_EXTRACT_DETAILS = """() => {
 }"""
 
 
-def scrape_glassdoor(keyword, location, limit=10, filename="glassdoor.json"):
+async def _load_search_page(page, url):
+    # Search page on a pooled page; returns what happened so the caller can log it
+    result = {"navigated": True, "challenge": None, "blocked": False, "jobs": []}
+    try:
+        await page.goto(url, wait_until="networkidle", timeout=30000)
+    except Exception:
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        except Exception:
+            result["navigated"] = False
+            return result
+
+    await page.wait_for_timeout(3000)
+
+    title = await page.title()
+    if "security" in title.lower() or "captcha" in title.lower():
+        result["challenge"] = title
+        # Give the Cloudflare challenge 10s to resolve
+        await page.wait_for_timeout(10000)
+        if "security" in (await page.title()).lower():
+            result["blocked"] = True
+            return result
+
+    result["jobs"] = await page.evaluate(JS_EXTRACT_LINKS)
+    return result
+
+
+async def _load_details_page(page, job):
+    await page.goto(job["link"], wait_until="domcontentloaded", timeout=20000)
+    await page.wait_for_timeout(2000)
+    return await page.evaluate(JS_EXTRACT_DETAILS)
+
+
+def _job_data(job, description="N/A", industry="N/A"):
+    return {
+        "title": job["title"],
+        "company": clean_company(job["company"]),
+        "location": job["location"],
+        "link": job["link"],
+        "description": description,
+        "skills": [],
+        "industry": industry
+    }
+
+
+def scrape_glassdoor(keyword, location, limit=10, filename="glassdoor.ndjson", on_job=None):
     formatted_kw = keyword.lower().replace(" ", "-")
     search_url = f"https://www.glassdoor.co.in/Job/{location.lower()}-{formatted_kw}-jobs-SRCH_IL.0,{len(location)}_IN115_KO{len(location)+1},{len(location)+1+len(formatted_kw)}.htm"
     fallback_url = f"https://www.glassdoor.co.in/Job/jobs.htm?sc.keyword={keyword.replace(' ', '+')}&locKeyword={location}"
 
     job_links = []
     seen = set()
-    browser = None
-    pw = None
-
-    try:
-        pw = sync_playwright().start()
-        browser = pw.chromium.launch(
-            headless=False,
-            args=["--window-position=-2400,-2400", "--disable-blink-features=AutomationControlled"]
-        )
-        context = browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        context.add_init_script("Object.defineProperty(navigator, 'webdriver', { get: () => undefined });")
-        page = context.new_page()
 
+    # Warm shared browser (this search only gets its own isolated context); one NDJSON line per job
+    with get_browser_pool().session() as session, JobWriter(filename) as out:
         print("=" * 50)
         print("Glassdoor Job Scraper (Playwright)")
         print("=" * 50)
@@ -128,28 +160,17 @@ def scrape_glassdoor(keyword, location, limit=10, filename="glassdoor.json"):
                 break
 
             print(f"    Trying: {url[:80]}...")
-            try:
-                page.goto(url, wait_until="networkidle", timeout=30000)
-            except:
-                try:
-                    page.goto(url, wait_until="domcontentloaded", timeout=30000)
-                except:
-                    print("    ⚠ Navigation failed")
-                    continue
-
-            page.wait_for_timeout(3000)
-
-            title = page.title()
-            if "security" in title.lower() or "captcha" in title.lower():
-                print(f"    ⚠ Cloudflare challenge: '{title}'")
-                print("    Waiting 10s for challenge to resolve...")
-                page.wait_for_timeout(10000)
-                title = page.title()
-                if "security" in title.lower():
-                    print("    ⚠ Still blocked. Trying next URL...")
+            result = session.run(_load_search_page, url)
+            if not result["navigated"]:
+                print("    ⚠ Navigation failed")
+                continue
+            if result["challenge"]:
+                print(f"    ⚠ Cloudflare challenge: '{result['challenge']}'")
+                if result["blocked"]:
+                    print("    ⚠ Still blocked after 10s. Trying next URL...")
                     continue
 
-            jobs = page.evaluate(JS_EXTRACT_LINKS)
+            jobs = result["jobs"]
             if jobs:
                 print(f"    ✓ Found {len(jobs)} jobs")
                 for job in jobs:
@@ -174,68 +195,42 @@ def scrape_glassdoor(keyword, location, limit=10, filename="glassdoor.json"):
         print(f"[2/2] Scraping details from each listing...")
         all_jobs = []
 
-        for i, job in enumerate(job_links):
-            print(f"  ({i+1}/{len(job_links)}) {job['title']} @ {clean_company(job['company'])}")
+        def emit(job_data):
+            print(f"  ({len(all_jobs) + 1}/{len(job_links)}) {job_data['title']} @ {job_data['company']}")
+            all_jobs.append(job_data)
+            out.write(job_data)
+            if on_job:
+                on_job(job_data)
 
+        # Listings whose ld+json already carries a full description need no detail page
+        needs_details = []
+        for job in job_links:
             desc = strip_html(job.get("description", ""))
             if desc and desc != "N/A" and len(desc) > 100:
-                job_data = {
-                    "title": job["title"],
-                    "company": clean_company(job["company"]),
-                    "location": job["location"],
-                    "link": job["link"],
-                    "description": desc,
-                    "skills": [],
-                    "industry": "N/A"
-                }
+                emit(_job_data(job, desc))
             else:
-                time.sleep(random.uniform(2, 5))
-                try:
-                    page.goto(job["link"], wait_until="domcontentloaded", timeout=20000)
-                    page.wait_for_timeout(2000)
-                    details = page.evaluate(JS_EXTRACT_DETAILS)
-                    job_data = {
-                        "title": job["title"],
-                        "company": clean_company(job["company"]),
-                        "location": job["location"],
-                        "link": job["link"],
-                        "description": strip_html(details.get("description", "N/A")),
-                        "skills": [],
-                        "industry": details.get("industry", "N/A")
-                    }
-                except Exception as e:
-                    print(f"    ⚠ Failed: {e}")
-                    job_data = {
-                        "title": job["title"],
-                        "company": clean_company(job["company"]),
-                        "location": job["location"],
-                        "link": job["link"],
-                        "description": "N/A",
-                        "skills": [],
-                        "industry": "N/A"
-                    }
+                needs_details.append(job)
 
-            all_jobs.append(job_data)
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(all_jobs, f, indent=4, ensure_ascii=False)
+        # The rest are opened concurrently in this search's context, in completion order
+        for job, details, error in session.map_pages(_load_details_page, needs_details, concurrency=DETAIL_CONCURRENCY):
+            if error is not None:
+                print(f"    ⚠ Failed: {job['title']}: {error}")
+                emit(_job_data(job))
+            else:
+                emit(_job_data(job, strip_html(details.get("description", "N/A")), details.get("industry", "N/A")))
 
         print(f"\n✅ Scraped {len(all_jobs)} jobs!")
-        print(f"💾 Saved to {filename}")
+        if filename:
+            print(f"💾 Saved to {filename}")
         return all_jobs
 
-    finally:
-        if browser:
-            browser.close()
-        if pw:
-            pw.stop()
-
 
 if __name__ == "__main__":
     if len(sys.argv) > 2:
         query = sys.argv[1]
         location = sys.argv[2]
         limit = int(sys.argv[3]) if len(sys.argv) > 3 else 10
-        output_file = sys.argv[4] if len(sys.argv) > 4 else "glassdoor.json"
+        output_file = sys.argv[4] if len(sys.argv) > 4 else "glassdoor.ndjson"
         scrape_glassdoor(query, location, limit, output_file)
     else:
         scrape_glassdoor("Web Developer", "India", limit=10)
@@ -1,19 +1,18 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 import sys
-import time
-import random
 import re
-from fake_useragent import UserAgent
+from scraper_http import get_http_client
+from scraper_output import JobWriter
+
+DETAIL_CONCURRENCY = 3  # Detail pages in flight at once (the per-host rate limit still applies)
 
 def get_headers():
-    ua = UserAgent()
     return {
-        "User-Agent": ua.random,
+        "User-Agent": get_http_client().random_user_agent(),
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
         "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Encoding": "gzip, deflate",
         "Referer": "https://www.google.com/",
         "DNT": "1",
         "Connection": "keep-alive",
@@ -24,25 +23,9 @@ def get_headers():
         "Sec-Fetch-User": "?1",
     }
 
-def fetch_with_retries(session, url, max_retries=3):
-    for attempt in range(max_retries):
-        try:
-            resp = session.get(url, headers=get_headers(), timeout=15)
-            if resp.status_code == 200:
-                return resp
-            elif resp.status_code == 403:
-                print(f"    [403] Blocked. Attempt {attempt+1}/{max_retries}")
-                time.sleep(random.uniform(5, 10))
-            elif resp.status_code == 429:
-                print(f"    [429] Rate limited. Waiting {2**(attempt+2)}s...")
-                time.sleep(2**(attempt+2))
-            else:
-                print(f"    [{resp.status_code}] Unexpected status")
-                return None
-        except requests.RequestException as e:
-            print(f"    [Error] {e}")
-            time.sleep(3)
-    return None
+def fetch_with_retries(url, max_retries=3):
+    # Pooled, rate-limited GET; 403 (soft block) is retried with backoff like 429/5xx
+    return get_http_client().get(url, get_headers(), retry_on=(403,), max_retries=max_retries)
 
 def strip_html(text):
     if not text:
@@ -90,12 +73,7 @@ def extract_job_links(html):
 
     return jobs
 
-def scrape_job_details(session, url):
-    resp = fetch_with_retries(session, url)
-    if not resp:
-        return None
-
-    html = resp.text
+def parse_job_details(html):
     if "captcha" in html.lower() or len(html) < 3000:
         return None
 
@@ -125,8 +103,7 @@ def scrape_job_details(session, url):
         "industry": industry
     }
 
-def scrape_indeed(keyword, location, limit=10, filename="indeed.json"):
-    session = requests.Session()
+def scrape_indeed(keyword, location, limit=10, filename="indeed.ndjson", on_job=None):
     all_jobs = []
     seen = set()
     page = 0
@@ -145,7 +122,7 @@ def scrape_indeed(keyword, location, limit=10, filename="indeed.json"):
         start = page * 10
         url = f"https://in.indeed.com/jobs?q={formatted_kw}&l={formatted_loc}&start={start}"
 
-        resp = fetch_with_retries(session, url)
+        resp = fetch_with_retries(url)
         if not resp:
             break
 
@@ -166,47 +143,51 @@ def scrape_indeed(keyword, location, limit=10, filename="indeed.json"):
 
         print(f"      Found {len(job_links)} unique jobs so far...")
         page += 1
-        time.sleep(random.uniform(3, 6))
 
     print(f"      Total: {len(job_links)} job links\n")
 
     print(f"[2/2] Scraping details from each listing...")
 
-    for i, job in enumerate(job_links):
-        print(f"  ({i+1}/{len(job_links)}) {job['title']} @ {job['company']}")
-        time.sleep(random.uniform(3, 7))
-
-        details = scrape_job_details(session, job["link"])
-        if details:
-            job_data = {
-                "title": job["title"],
-                "company": job["company"],
-                "location": job["location"],
-                "link": job["link"],
-                "description": details["description"],
-                "skills": details["skills"],
-                "industry": details["industry"]
-            }
-        else:
-            job_data = {
-                "title": job["title"],
-                "company": job["company"],
-                "location": job["location"],
-                "link": job["link"],
-                "description": "N/A",
-                "skills": [],
-                "industry": "N/A"
-            }
-            print("      ⚠ Detail page blocked, using search snippet")
-
-        all_jobs.append(job_data)
-
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(all_jobs, f, indent=4, ensure_ascii=False)
+    # Keyed by the card, not the link: cards without an href / jobkey all share one link
+    requests = [(job, job["link"]) for job in job_links]
+    client = get_http_client()
+    # One NDJSON line per job, appended as it is scraped
+    with JobWriter(filename) as out:
+        for i, (job, resp) in enumerate(client.fetch_iter(requests, get_headers, concurrency=DETAIL_CONCURRENCY, retry_on=(403,))):
+            print(f"  ({i+1}/{len(job_links)}) {job['title']} @ {job['company']}")
+
+            details = parse_job_details(resp.text) if resp else None
+            if details:
+                job_data = {
+                    "title": job["title"],
+                    "company": job["company"],
+                    "location": job["location"],
+                    "link": job["link"],
+                    "description": details["description"],
+                    "skills": details["skills"],
+                    "industry": details["industry"]
+                }
+            else:
+                job_data = {
+                    "title": job["title"],
+                    "company": job["company"],
+                    "location": job["location"],
+                    "link": job["link"],
+                    "description": "N/A",
+                    "skills": [],
+                    "industry": "N/A"
+                }
+                print("      ⚠ Detail page blocked, using search snippet")
+
+            all_jobs.append(job_data)
+            out.write(job_data)
+            if on_job:
+                on_job(job_data)
 
     if all_jobs:
         print(f"\n✅ Scraped {len(all_jobs)} jobs!")
-        print(f"💾 Saved to {filename}")
+        if filename:
+            print(f"💾 Saved to {filename}")
     else:
         print("\n❌ No jobs scraped. Indeed blocked the requests.")
 
@@ -217,7 +198,7 @@ if __name__ == "__main__":
         query = sys.argv[1]
         location = sys.argv[2]
         limit = int(sys.argv[3]) if len(sys.argv) > 3 else 10
-        output_file = sys.argv[4] if len(sys.argv) > 4 else "indeed.json"
+        output_file = sys.argv[4] if len(sys.argv) > 4 else "indeed.ndjson"
         scrape_indeed(query, location, limit, output_file)
     else:
         scrape_indeed("Data Scientist", "India", limit=10)
@@ -1,8 +1,8 @@
-import json
 import sys
-import time
-import random
-from playwright.sync_api import sync_playwright
+from browser_pool import get_browser_pool
+from scraper_output import JobWriter
+
+DETAIL_CONCURRENCY = 3  # Detail pages open at once in this search's browser context
 
 JS_EXTRACT = """() => {
     const locEl = document.querySelector('[class*="jhc__loc"]');
@@ -49,7 +49,22 @@ JS_EXTRACT = """() => {
 }"""
 
 
-def scrape_naukri(keyword, location, limit=10, filename="naukri.json"):
+async def _load_search_page(page, url, on_response):
+    page.on("response", on_response)
+    try:
+        await page.goto(url, wait_until="networkidle", timeout=30000)
+    except Exception:
+        pass
+    await page.wait_for_timeout(3000)
+
+
+async def _load_details_page(page, job):
+    await page.goto(job["link"], wait_until="domcontentloaded", timeout=20000)
+    await page.wait_for_timeout(2000)
+    return await page.evaluate(JS_EXTRACT)
+
+
+def scrape_naukri(keyword, location, limit=10, filename="naukri.ndjson", on_job=None):
     formatted_keyword = keyword.lower().replace(" ", "-")
     formatted_location = location.lower().replace(" ", "-")
     search_url = f"https://www.naukri.com/{formatted_keyword}-jobs-in-{formatted_location}"
@@ -57,10 +72,11 @@ def scrape_naukri(keyword, location, limit=10, filename="naukri.json"):
     job_links = []
     seen_ids = set()
 
-    def handle_response(response):
+    # Runs on the browser pool's loop thread while the search page loads
+    async def handle_response(response):
         if "/jobapi/" in response.url and response.status == 200:
             try:
-                data = response.json()
+                data = await response.json()
                 for job in data.get("jobDetails", []):
                     job_id = str(job.get("jobId", ""))
                     if job_id and job_id not in seen_ids and len(job_links) < limit:
@@ -73,76 +89,45 @@ def scrape_naukri(keyword, location, limit=10, filename="naukri.json"):
             except:
                 pass
 
-    browser = None
-    pw = None
-    try:
-        pw = sync_playwright().start()
-        browser = pw.chromium.launch(
-            headless=False,
-            args=["--window-position=-2400,-2400", "--disable-blink-features=AutomationControlled"]
-        )
-        context = browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        context.add_init_script("Object.defineProperty(navigator, 'webdriver', { get: () => undefined });")
-        page = context.new_page()
-        page.on("response", handle_response)
-
+    # Warm shared browser (this search only gets its own isolated context); one NDJSON line per job
+    with get_browser_pool().session() as session, JobWriter(filename) as out:
         print(f"[1/2] Fetching job links from search...")
-        try:
-            page.goto(search_url, wait_until="networkidle", timeout=30000)
-        except:
-            pass
-        page.wait_for_timeout(3000)
+        session.run(_load_search_page, search_url, handle_response)
         print(f"      Found {len(job_links)} unique jobs")
 
         print(f"[2/2] Scraping details from each listing...")
         all_jobs = []
-
-        for i, job in enumerate(job_links):
-            if job["link"] == "N/A":
+        detail_jobs = [job for job in job_links if job["link"] != "N/A"]
+
+        # Detail pages load concurrently in this context; jobs are handed on in completion order
+        for i, (job, details, error) in enumerate(
+            session.map_pages(_load_details_page, detail_jobs, concurrency=DETAIL_CONCURRENCY)
+        ):
+            print(f"  ({i+1}/{len(detail_jobs)}) {job['title']} @ {job['company']}")
+            if error is not None:
+                print(f"    ⚠ Failed: {error}")
                 continue
 
-            print(f"  ({i+1}/{len(job_links)}) {job['title']} @ {job['company']}")
-            time.sleep(random.uniform(2, 5))
-
-            try:
-                page.goto(job["link"], wait_until="domcontentloaded", timeout=20000)
-                page.wait_for_timeout(2000)
-
-                details = page.evaluate(JS_EXTRACT)
-
-                loc = details.get("location", "")
-                if loc and "\n" in loc:
-                    details["location"] = loc.split("\n")[0].strip()
-
-                job_data = {
-                    "title": job["title"],
-                    "company": job["company"],
-                    "location": details.get("location", "N/A"),
-                    "link": job["link"],
-                    "description": details.get("description", "N/A"),
-                    "skills": details.get("skills", []),
-                    "industry": details.get("industry", "N/A")
-                }
-                all_jobs.append(job_data)
-
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(all_jobs, f, indent=4, ensure_ascii=False)
-
-            except Exception as e:
-                print(f"    ⚠ Failed: {e}")
-                continue
+            loc = details.get("location", "")
+            if loc and "\n" in loc:
+                details["location"] = loc.split("\n")[0].strip()
+
+            job_data = {
+                "title": job["title"],
+                "company": job["company"],
+                "location": details.get("location", "N/A"),
+                "link": job["link"],
+                "description": details.get("description", "N/A"),
+                "skills": details.get("skills", []),
+                "industry": details.get("industry", "N/A")
+            }
+            all_jobs.append(job_data)
+            out.write(job_data)
+            if on_job:
+                on_job(job_data)
 
         return all_jobs
 
-    finally:
-        if browser:
-            browser.close()
-        if pw:
-            pw.stop()
-
 
 if __name__ == "__main__":
     print("=" * 50)
@@ -153,11 +138,11 @@ if __name__ == "__main__":
         query = sys.argv[1]
         location = sys.argv[2]
         limit = int(sys.argv[3]) if len(sys.argv) > 3 else 10
-        output_file = sys.argv[4] if len(sys.argv) > 4 else "naukri.json"
+        output_file = sys.argv[4] if len(sys.argv) > 4 else "naukri.ndjson"
         data = scrape_naukri(query, location, limit, output_file)
     else:
         data = scrape_naukri("Web Developer", "India", limit=10)
-        output_file = "naukri.json" # Default filename for the else branch
+        output_file = "naukri.ndjson" # Default filename for the else branch
 
     if data:
         print(f"\n✅ Scraped {len(data)} jobs!")
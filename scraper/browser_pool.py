@@ -0,0 +1,189 @@
+# Shared warm Chromium for the Playwright-based scrapers (Glassdoor, Naukri).
+
+# 1. One browser per process, launched on first use and reused by every search
+#    (relaunched automatically if it crashes / disconnects).
+# 2. Each scrape gets its own isolated BrowserContext (cookies, storage, routes).
+# 3. Images, fonts, media and analytics / ad requests are aborted at the context level.
+# 4. Several pages run concurrently per context (map_pages), results are yielded as they complete.
+#
+# Playwright's sync API is bound to the thread that started it, so the browser lives on
+# a dedicated asyncio loop thread; the (synchronous) scrapers submit small async page
+# functions to it and block on the results from their own worker thread.
+
+
+import asyncio
+import threading
+import concurrent.futures
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+LAUNCH_ARGS = ["--window-position=-2400,-2400", "--disable-blink-features=AutomationControlled"]
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+STEALTH_SCRIPT = "Object.defineProperty(navigator, 'webdriver', { get: () => undefined });"
+
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+BLOCKED_URL_PARTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "connect.facebook", "hotjar.com", "segment.io", "segment.com",
+    "newrelic.com", "nr-data.net", "clarity.ms", "bat.bing.com", "scorecardresearch.com",
+    "adservice.google", "criteo", "taboola", "outbrain",
+)
+
+PAGE_CONCURRENCY = 3  # Pages open at once per context
+
+
+async def _block_heavy_requests(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(part in request.url for part in BLOCKED_URL_PARTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class BrowserPool:
+
+    # Process-wide Chromium on its own event-loop thread; see module header.
+
+    def __init__(self, headless: bool = False):
+        self.headless = headless
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+        self._playwright = None
+        self._browser = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self.launches = 0
+
+    def _call(self, coro: Awaitable) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    # Loop-thread internals
+
+    async def _get_browser(self):
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            if self._browser is None or not self._browser.is_connected():
+                from playwright.async_api import async_playwright
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+                self.launches += 1
+        return self._browser
+
+    async def _new_context(self):
+        browser = await self._get_browser()
+        context = await browser.new_context(viewport={"width": 1920, "height": 1080}, user_agent=USER_AGENT)
+        await context.add_init_script(STEALTH_SCRIPT)
+        await context.route("**/*", _block_heavy_requests)
+        return context
+
+    async def _close(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    # Public (blocking) API
+
+    def warm(self):
+        # Launch the browser now instead of on the first scrape.
+        self._call(self._get_browser())
+
+    def session(self) -> "BrowserSession":
+        return BrowserSession(self)
+
+    def close(self):
+        self._call(self._close())
+
+
+class BrowserSession:
+
+    # One isolated BrowserContext for the duration of a scrape:
+    #     with get_browser_pool().session() as session:
+    #         data = session.run(some_async_page_fn, url)
+
+    def __init__(self, pool: BrowserPool):
+        self.pool = pool
+        self.context = None
+
+    def __enter__(self) -> "BrowserSession":
+        self.context = self.pool._call(self.pool._new_context())
+        return self
+
+    def __exit__(self, *exc):
+        if self.context is not None:
+            try:
+                self.pool._call(self.context.close())
+            except Exception:
+                pass
+            self.context = None
+
+    async def _with_page(self, fn: Callable[..., Awaitable], *args):
+        page = await self.context.new_page()
+        try:
+            return await fn(page, *args)
+        finally:
+            await page.close()
+
+    def run(self, fn: Callable[..., Awaitable], *args) -> Any:
+        # Run `await fn(page, *args)` on a fresh page of this context and return its result.
+        return self.pool._call(self._with_page(fn, *args))
+
+    def map_pages(
+        self,
+        fn: Callable[..., Awaitable],
+        items: Iterable[Any],
+        concurrency: int = PAGE_CONCURRENCY,
+    ) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+
+        # Yield (item, result, error) as each `await fn(page, item)` completes, with at most
+        # `concurrency` pages open. Abandoning the iterator cancels the pages still running.
+
+        pending: List[Any] = list(items)
+        in_flight: Dict["concurrent.futures.Future", Any] = {}
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < concurrency:
+                    item = pending.pop(0)
+                    future = asyncio.run_coroutine_threadsafe(self._with_page(fn, item), self.pool._loop)
+                    in_flight[future] = item
+
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    item = in_flight.pop(future)
+                    try:
+                        yield item, future.result(), None
+                    except Exception as e:
+                        yield item, None, e
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+        return _pool
+
+
+def shutdown_browser_pool():
+    # Close the shared browser (called on backend shutdown).
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        try:
+            pool.close()
+        finally:
+            pool._loop.call_soon_threadsafe(pool._loop.stop)
@@ -3,10 +3,12 @@ import json
 import os
 
 import sys
+from scraper_output import JobWriter
 
 API_KEY = os.environ.get("SERP_API_KEY", "4ac5e3d0d6183ed5928fa7fb48ed99ec6ebbbb6e6194bbfa0b6af00ed104bac6")
 
-def scrape_google_jobs(keyword, location, limit=10, filename="google_jobs.json"):
+def scrape_google_jobs(keyword, location, limit=10, filename="google_jobs.ndjson", on_job=None, api_key=None):
+    api_key = api_key or API_KEY
     print("=" * 50)
     print("Google Jobs Scraper (via SerpAPI)")
     print("=" * 50)
@@ -21,10 +23,12 @@ def scrape_google_jobs(keyword, location, limit=10, filename="google_jobs.json")
         "google_domain": "google.co.in",
         "gl": "in",
         "hl": "en", 
-        "api_key": API_KEY,
+        "api_key": api_key,
     }
     
     page_num = 1
+    # One NDJSON line per job, appended as it is scraped
+    out = JobWriter(filename)
     
     try:
         while len(all_jobs) < limit:
@@ -80,7 +84,7 @@ def scrape_google_jobs(keyword, location, limit=10, filename="google_jobs.json")
                 if description == "N/A" and extensions:
                      description = ", ".join(extensions)
     
-                all_jobs.append({
+                job_data = {
                     "title": title,
                     "company": company,
                     "location": location_str,
@@ -88,12 +92,12 @@ def scrape_google_jobs(keyword, location, limit=10, filename="google_jobs.json")
                     "description": description,
                     "skills": skills,
                     "industry": industry
-                })
+                }
+                all_jobs.append(job_data)
+                out.write(job_data)
+                if on_job:
+                    on_job(job_data)
             
-            # Save incrementally
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(all_jobs, f, indent=4, ensure_ascii=False)
-                
             next_url = data.get("serpapi_pagination", {}).get("next")
             if not next_url:
                 print("    ⚠ No next page available.")
@@ -102,7 +106,7 @@ def scrape_google_jobs(keyword, location, limit=10, filename="google_jobs.json")
             import time
             time.sleep(2) # Avoid rate limits
             current_url = next_url
-            current_params = {"api_key": API_KEY} 
+            current_params = {"api_key": api_key} 
             page_num += 1
             
             if len(all_jobs) >= limit:
@@ -112,11 +116,11 @@ def scrape_google_jobs(keyword, location, limit=10, filename="google_jobs.json")
         print(f"❌ Scraper Error: {e}")
 
     finally:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(all_jobs, f, indent=4, ensure_ascii=False)
+        out.close()
     
         print(f"\n✅ Scraped {len(all_jobs)} jobs!")
-        print(f"💾 Saved to {filename}")
+        if filename:
+            print(f"💾 Saved to {filename}")
         
     return all_jobs
 
@@ -125,7 +129,7 @@ if __name__ == "__main__":
         query = sys.argv[1]
         location = sys.argv[2]
         limit = int(sys.argv[3]) if len(sys.argv) > 3 else 10
-        output_file = sys.argv[4] if len(sys.argv) > 4 else "google_jobs.json"
+        output_file = sys.argv[4] if len(sys.argv) > 4 else "google_jobs.ndjson"
         scrape_google_jobs(query, location, limit, output_file)
     else:
         scrape_google_jobs("Web Developer", "India", limit=20)
@@ -0,0 +1,248 @@
+# Shared HTTP layer for the requests-based scrapers (LinkedIn, Indeed).
+
+# 1. One process-wide httpx.AsyncClient (keep-alive connection pool) running on a
+#    dedicated event-loop thread, so every search reuses the same connections.
+# 2. A token bucket per host caps the request rate across ALL concurrent searches,
+#    replacing the fixed time.sleep() calls between requests.
+# 3. 429 / 5xx / network errors are retried with jittered exponential backoff
+#    (Retry-After is honoured, and a 429 also drains the host's bucket).
+# 4. fetch_iter() fetches many (key, url) pairs with bounded concurrency and yields
+#    results as they complete, so callers can hand jobs on immediately.
+#
+# The scrapers stay synchronous: they call get() / fetch_iter() from their own
+# thread and block on results produced by the loop thread.
+
+
+import os
+import random
+import asyncio
+import threading
+import concurrent.futures
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from fake_useragent import UserAgent
+
+# host -> (requests per second, burst). Override with SCRAPER_RATE_<DOMAIN>="rate,burst",
+# where <DOMAIN> is the registrable domain's name (SCRAPER_RATE_INDEED for in.indeed.com).
+# Defaults match the old fixed sleeps (3-8 s between requests, i.e. ~0.2-0.3 rps per portal);
+# the gain comes from sharing one budget across searches, not from spending more of it.
+HOST_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "www.linkedin.com": (0.25, 2),
+    "in.indeed.com": (0.25, 2),
+}
+DEFAULT_RATE_LIMIT: Tuple[float, int] = (1.0, 2)
+RATE_JITTER_SECONDS = 0.5        # Random extra spacing so request timing isn't perfectly regular
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 2.0
+MAX_BACKOFF_SECONDS = 60.0
+
+POOL_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60)
+DEFAULT_TIMEOUT = httpx.Timeout(15.0, connect=10.0)
+
+
+_SECOND_LEVEL_SUFFIXES = frozenset({"co", "com", "net", "org", "ac", "gov"})  # e.g. "co.uk", "com.au"
+
+
+def _rate_env_name(host: str) -> str:
+    # Named after the registrable domain, not the first label:
+    # "in.indeed.com" -> SCRAPER_RATE_INDEED, "uk.indeed.co.uk" -> SCRAPER_RATE_INDEED.
+    labels = host.lower().split(".")
+    if len(labels) >= 3 and labels[-2] in _SECOND_LEVEL_SUFFIXES:
+        name = labels[-3]
+    else:
+        name = labels[-2] if len(labels) >= 2 else labels[0]
+    return "SCRAPER_RATE_" + name.replace("-", "_").upper()
+
+
+def _configured_rate(host: str) -> Tuple[float, int]:
+    env_name = _rate_env_name(host)
+    override = os.getenv(env_name)
+    if override:
+        try:
+            rate, burst = override.split(",")
+            return float(rate), int(burst)
+        except ValueError:
+            pass
+    return HOST_RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT)
+
+
+class TokenBucket:
+
+    # Async token bucket: `rate` requests per second with bursts up to `burst`.
+    # Only used from the client's event-loop thread.
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        if self.updated_at is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            self._refill(loop.time())
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate + random.uniform(0, RATE_JITTER_SECONDS))
+                self._refill(loop.time())
+            self.tokens -= 1
+
+    def penalize(self):
+        # Server pushed back (429): make everyone on this host wait for a fresh token.
+        self.tokens = min(self.tokens, 0.0)
+
+
+class ScraperHttpClient:
+
+    # Process-wide pooled client; see module header.
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="scraper-http", daemon=True)
+        self._thread.start()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._user_agent: Optional[UserAgent] = None
+
+    # Loop-thread internals
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=POOL_LIMITS, timeout=DEFAULT_TIMEOUT, follow_redirects=True
+            )
+        return self._client
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(*_configured_rate(host))
+        return bucket
+
+    def random_user_agent(self) -> str:
+        # UserAgent() loads its dataset on construction, so build it once.
+        if self._user_agent is None:
+            self._user_agent = UserAgent()
+        return self._user_agent.random
+
+    @staticmethod
+    def _backoff(attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        delay = BACKOFF_BASE_SECONDS * (2 ** attempt)
+        return min(delay * random.uniform(0.5, 1.5), MAX_BACKOFF_SECONDS)
+
+    async def _fetch(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        retry_on: Iterable[int],
+        max_retries: int,
+        log: Callable[[str], None],
+    ) -> Optional[httpx.Response]:
+        host = urlsplit(url).netloc
+        bucket = self._bucket(host)
+        retry_statuses = RETRY_STATUSES.union(retry_on)
+
+        for attempt in range(max_retries):
+            await bucket.acquire()
+            try:
+                response = await self._get_client().get(url, headers=headers)
+            except httpx.HTTPError as e:
+                log(f"  [Error] {e.__class__.__name__}: {e}. Retrying...")
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code == 200:
+                return response
+            if response.status_code not in retry_statuses:
+                return None
+
+            if response.status_code == 429:
+                bucket.penalize()
+            delay = self._backoff(attempt, response)
+            log(f"  [{response.status_code}] Retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+            await asyncio.sleep(delay)
+        return None
+
+    # Public (blocking) API, callable from any thread
+
+    def submit(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        retry_on: Iterable[int] = (),
+        max_retries: int = MAX_RETRIES,
+        log: Callable[[str], None] = print,
+    ) -> "concurrent.futures.Future":
+        return asyncio.run_coroutine_threadsafe(self._fetch(url, headers, retry_on, max_retries, log), self._loop)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> Optional[httpx.Response]:
+        # Rate-limited GET with retries; None if the page could not be fetched.
+        messages = []
+        try:
+            return self.submit(url, headers, log=messages.append, **kwargs).result()
+        finally:
+            for message in messages:
+                print(message)
+
+    def fetch_iter(
+        self,
+        requests: Iterable[Tuple[Any, str]],
+        headers_fn: Callable[[], Dict[str, str]],
+        concurrency: int = 4,
+        **kwargs,
+    ) -> Iterator[Tuple[Any, Optional[httpx.Response]]]:
+
+        # Fetch (key, url) pairs and yield (key, response-or-None) in completion order, with
+        # at most `concurrency` requests in flight. Every pair yields exactly once, even when
+        # several share a URL. Abandoning the iterator (break / exception / cancellation)
+        # cancels everything still pending.
+
+        pending = list(requests)
+        in_flight: Dict["concurrent.futures.Future", Tuple[Any, str]] = {}
+        # Log lines are emitted by the caller's thread so they reach that scraper's log
+        messages = []
+
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < concurrency:
+                    key, url = pending.pop(0)
+                    in_flight[self.submit(url, headers_fn(), log=messages.append, **kwargs)] = (key, url)
+
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                while messages:
+                    print(messages.pop(0))
+                for future in done:
+                    key, url = in_flight.pop(future)
+                    try:
+                        response = future.result()
+                    except Exception as e:
+                        print(f"  [Error] {url}: {e}")
+                        response = None
+                    yield key, response
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+
+_client: Optional[ScraperHttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> ScraperHttpClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ScraperHttpClient()
+        return _client
@@ -0,0 +1,52 @@
+# Append-only NDJSON output for the scrapers.
+
+# 1. One JSON record per line, appended (and flushed) as each job is scraped,
+#    so saving n jobs is O(n) instead of re-dumping the whole list after every job.
+# 2. A crash mid-scrape still leaves every finished line readable.
+# 3. read_jobs(path, offset) tails the file: only complete lines are returned,
+#    together with the byte offset to resume from.
+
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class JobWriter:
+
+    # with JobWriter("linkedin.ndjson") as out:   (or call close() yourself)
+    #     out.write(job_data)
+    # A falsy filename turns the writer into a no-op (in-process runs pass filename=None).
+
+    def __init__(self, filename: Optional[str]):
+        self.filename = filename
+        self.count = 0
+        # Line-buffered: every record reaches the file as soon as it's written
+        self._file = open(filename, "w", encoding="utf-8", buffering=1) if filename else None
+
+    def __enter__(self) -> "JobWriter":
+        return self
+
+    def write(self, job: Dict[str, Any]):
+        if self._file is not None:
+            self._file.write(json.dumps(job, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_jobs(path: str, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    # Records appended after byte `offset`, and the offset after the last complete line.
+    # A partially written trailing line is left for the next call.
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+
+    end = data.rfind(b"\n") + 1
+    jobs = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+    return jobs, offset + end